@@ -58,6 +58,22 @@ from .const import (
     CONF_THERMOSTAT_CLIMATE,
     CONF_THERMOSTAT_VALVE,
     CONF_MAX_ON_PERCENT,
+    CONF_EVENT_PAYLOAD,
+    CONF_OUTDOOR_TEMP_PARAMS,
+    CONF_TEMP_DEBOUNCE_PARAMS,
+    CONF_STARTUP_CONCURRENCY,
+    CONF_WINDOW_AUTO_PARAMS,
+    WINDOW_AUTO_ALGORITHMS,
+    CONF_TEMPERATURE_FILTER_PARAMS,
+    CONF_OPTIMAL_START_PARAMS,
+    CONF_STATE_STORE_PARAMS,
+    CONF_WARM_START_PARAMS,
+    MAX_WARM_START_HISTORY_MIN,
+    FILTER_STAGE_RAW,
+    FILTER_STAGES,
+    EVENT_PAYLOADS,
+    EVENT_PAYLOAD_DEFAULT_KEY,
+    EventType,
 )
 
 from .vtherm_api import VersatileThermostatAPI
@@ -83,6 +99,50 @@ SAFETY_MODE_PARAM_SCHEMA = {
     vol.Required("check_outdoor_sensor"): bool,
 }
 
+EVENT_PAYLOAD_PARAM_SCHEMA = {
+    vol.Optional(key): vol.In(EVENT_PAYLOADS)
+    for key in [EVENT_PAYLOAD_DEFAULT_KEY] + [event_type.value for event_type in EventType]
+}
+
+OUTDOOR_TEMP_PARAM_SCHEMA = {
+    vol.Optional("min_dtemp"): vol.Coerce(float),
+    vol.Optional("min_don_percent"): vol.Coerce(float),
+}
+
+TEMP_DEBOUNCE_PARAM_SCHEMA = {
+    vol.Optional("min_interval_sec"): vol.Coerce(float),
+    vol.Optional("min_dtemp"): vol.Coerce(float),
+}
+
+WINDOW_AUTO_PARAM_SCHEMA = {
+    vol.Optional("algorithm"): vol.In(WINDOW_AUTO_ALGORITHMS),
+    vol.Optional("window_sec"): vol.All(vol.Coerce(float), vol.Range(min=60)),
+}
+
+TEMPERATURE_FILTER_PARAM_SCHEMA = {
+    vol.Optional("stages"): [vol.In(FILTER_STAGES)],
+    vol.Optional("regulation_input"): vol.In([FILTER_STAGE_RAW] + FILTER_STAGES),
+    vol.Optional("spike_max_delta"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional("spike_max_consecutive"): cv.positive_int,
+    vol.Optional("median_size"): vol.All(vol.Coerce(int), vol.Range(min=1, max=15)),
+    vol.Optional("kalman_process_noise"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional("kalman_measurement_noise"): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+}
+
+OPTIMAL_START_PARAM_SCHEMA = {
+    vol.Optional("max_lead_min"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional("forgetting_factor"): vol.All(vol.Coerce(float), vol.Range(min=0.9, max=1)),
+}
+
+STATE_STORE_PARAM_SCHEMA = {
+    vol.Optional("save_delay_sec"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+}
+
+WARM_START_PARAM_SCHEMA = {
+    vol.Optional("history_min"): vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_WARM_START_HISTORY_MIN)),
+    vol.Optional("max_samples"): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+}
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -91,6 +151,15 @@ CONFIG_SCHEMA = vol.Schema(
                 CONF_SHORT_EMA_PARAMS: vol.Schema(EMA_PARAM_SCHEMA),
                 CONF_SAFETY_MODE: vol.Schema(SAFETY_MODE_PARAM_SCHEMA),
                 vol.Optional(CONF_MAX_ON_PERCENT): vol.Coerce(float),
+                vol.Optional(CONF_EVENT_PAYLOAD): vol.Schema(EVENT_PAYLOAD_PARAM_SCHEMA),
+                vol.Optional(CONF_OUTDOOR_TEMP_PARAMS): vol.Schema(OUTDOOR_TEMP_PARAM_SCHEMA),
+                vol.Optional(CONF_TEMP_DEBOUNCE_PARAMS): vol.Schema(TEMP_DEBOUNCE_PARAM_SCHEMA),
+                vol.Optional(CONF_STARTUP_CONCURRENCY): cv.positive_int,
+                vol.Optional(CONF_WINDOW_AUTO_PARAMS): vol.Schema(WINDOW_AUTO_PARAM_SCHEMA),
+                vol.Optional(CONF_TEMPERATURE_FILTER_PARAMS): vol.Schema(TEMPERATURE_FILTER_PARAM_SCHEMA),
+                vol.Optional(CONF_OPTIMAL_START_PARAMS): vol.Schema(OPTIMAL_START_PARAM_SCHEMA),
+                vol.Optional(CONF_STATE_STORE_PARAMS): vol.Schema(STATE_STORE_PARAM_SCHEMA),
+                vol.Optional(CONF_WARM_START_PARAMS): vol.Schema(WARM_START_PARAM_SCHEMA),
             }
         ),
     },
@@ -197,17 +266,41 @@ async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
         entry.data,
     )
 
+    api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
     if entry.data.get(CONF_THERMOSTAT_TYPE) == CONF_THERMOSTAT_CENTRAL_CONFIG:
-        await reload_all_vtherm(hass)
+        await reload_changed_vtherm(hass, entry)
+    elif api is not None and await api.async_update_vtherm_in_place(entry):
+        _LOGGER.info("The VTherm %s have been updated in place", entry.title)
     else:
         await hass.config_entries.async_reload(entry.entry_id)
         # Reload the central boiler list of entities
-        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
         if api is not None:
             await api.reload_central_boiler_entities_list()
             await api.init_vtherm_links(entry.entry_id)
 
 
+async def reload_changed_vtherm(hass: HomeAssistant, central_entry: ConfigEntry):
+    """Handle a change of the central configuration. The VTherms for which the changes
+    can be applied in place are updated, the others are reloaded"""
+    _LOGGER.info("The central configuration have changed: reloading the impacted VTherms")
+
+    api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
+
+    entries_to_reload = [central_entry]
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id == central_entry.entry_id:
+            continue
+        if not await api.async_update_vtherm_in_place(entry):
+            entries_to_reload.append(entry)
+
+    _LOGGER.info("%d config entries will be reloaded", len(entries_to_reload))
+    await asyncio.gather(*[hass.config_entries.async_reload(entry.entry_id) for entry in entries_to_reload])
+    await api.reload_central_boiler_entities_list()
+    # the VTherms updated in place are already started
+    await api.init_vtherm_links(entry_ids={entry.entry_id for entry in entries_to_reload})
+    await api.central_power_manager.start_listening()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
@@ -220,6 +313,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the learned state of a deleted config entry"""
+    api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
+    if api:
+        await api.state_store.async_load()
+        api.state_store.remove(entry.entry_id)
+
+
 # Example migration function
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     """Migrate old entry."""
@@ -247,6 +247,11 @@ class AutoStartStopDetectionAlgorithm:
         """Get the accumulated error value"""
         return self._accumulated_error
 
+    def set_accumulated_error(self, accumulated_error: float):
+        """Restore the accumulated error (capped to the threshold of the level)"""
+        if self._level != AUTO_START_STOP_LEVEL_NONE:
+            self._accumulated_error = min(self._error_threshold, max(-self._error_threshold, accumulated_error))
+
     @property
     def accumulated_error_threshold(self) -> float:
         """Get the accumulated error threshold value"""
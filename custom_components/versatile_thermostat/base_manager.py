@@ -8,8 +8,6 @@ from homeassistant.core import CALLBACK_TYPE, HomeAssistant
 from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData
 
-from .config_schema import *  # pylint: disable=wildcard-import, unused-wildcard-import
-
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -27,6 +25,11 @@ class BaseFeatureManager:
         """Initialize the attributes of the FeatureManager"""
         raise NotImplementedError()
 
+    def update_config(self, entry_infos: ConfigData):
+        """Apply a new configuration to a running FeatureManager (an in place update of the VTherm).
+        The managers which have a runtime state should keep it"""
+        self.post_init(entry_infos)
+
     async def start_listening(self):
         """Start listening the underlying entity"""
         raise NotImplementedError()
@@ -2,7 +2,6 @@
 # pylint: disable=too-many-lines
 # pylint: disable=invalid-name
 """ Implements the VersatileThermostat climate component """
-import math
 import logging
 from typing import Any, Generic
 
@@ -24,6 +23,7 @@ from homeassistant.helpers.device_registry import DeviceInfo, DeviceEntryType
 
 from homeassistant.helpers.event import (
     async_track_state_change_event,
+    async_call_later,
 )
 
 
@@ -55,13 +55,26 @@ from homeassistant.const import (
 from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData, T
 
-from .config_schema import *  # pylint: disable=wildcard-import, unused-wildcard-import
-
 from .vtherm_api import VersatileThermostatAPI
+from .sensor_hub import SensorReading, READING_TEMPERATURE, parse_temperature
+from .control_mailbox import ControlMailbox, serialized_control
 from .underlyings import UnderlyingEntity
 
 from .prop_algorithm import PropAlgorithm
-from .ema import ExponentialMovingAverage
+from .temperature_filter import TemperatureFilterPipeline
+from .temperature_slope import TemperatureSlopeEstimator
+from .decision_trace import (
+    DecisionTrace,
+    REASON_SAFETY,
+    REASON_WINDOW,
+    REASON_POWER,
+    REASON_OFF,
+    REASON_NOT_INITIALIZED,
+    ACTION_NONE,
+    ACTION_START_CYCLE,
+    ACTION_TURN_OFF,
+)
+from .timing_stats import HotPathTimings, timed, VTHERM_HOT_PATHS, TIMING_CONTROL_HEATING, TIMING_UPDATE_ATTRIBUTES
 
 from .base_manager import BaseFeatureManager
 from .feature_presence_manager import FeaturePresenceManager
@@ -69,6 +82,7 @@ from .feature_power_manager import FeaturePowerManager
 from .feature_motion_manager import FeatureMotionManager
 from .feature_window_manager import FeatureWindowManager
 from .feature_safety_manager import FeatureSafetyManager
+from .feature_optimal_start_manager import FeatureOptimalStartManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -112,9 +126,14 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                     "target_temperature_step",
                     "is_used_by_central_boiler",
                     "temperature_slope",
+                    "temperature_long_slope",
+                    "regulation_temperature",
+                    "temperature_filter",
                     "max_on_percent",
                     "have_valve_regulation",
                     "last_change_time_from_vtherm",
+                    "nb_control_executed",
+                    "nb_control_coalesced",
                 }
             )
         )
@@ -122,6 +141,7 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         .union(FeaturePowerManager.unrecorded_attributes)
         .union(FeatureMotionManager.unrecorded_attributes)
         .union(FeatureWindowManager.unrecorded_attributes)
+        .union(FeatureOptimalStartManager.unrecorded_attributes)
     )
 
     def __init__(
@@ -135,6 +155,9 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
 
         super().__init__()
 
+        # The durations of the hot paths. Should be initialized first
+        self._timings = HotPathTimings(VTHERM_HOT_PATHS)
+
         # To remove some silly warning event if code is fixed
         self._enable_turn_on_off_backwards_compatibility = False
 
@@ -188,7 +211,21 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         self._underlyings: list[T] = []
 
         self._ema_temp = None
-        self._ema_algo = None
+        self._temperature_filter: TemperatureFilterPipeline | None = None
+        self._temperature_slope_estimator: TemperatureSlopeEstimator | None = None
+
+        # The last control decisions, exported in the diagnostics
+        self._decision_trace = DecisionTrace()
+
+        # Debounce of the temperature changes
+        self._temp_debounce_min_interval_sec = 0
+        self._temp_debounce_min_dtemp = 0
+        self._last_temp_control_date = None
+        self._last_temp_control_temp = None
+        self._cancel_temp_debounce = None
+
+        # Serializes the control passes
+        self._control_mailbox = ControlMailbox(name)
 
         self._attr_fan_mode = None
 
@@ -200,6 +237,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         # Preset will be initialized from Number entities
         self._presets: dict[str, Any] = {}  # presets
         self._presets_away: dict[str, Any] = {}  # presets_away
+        # The central presets used by the VTherm: number preset_name -> (preset key, is_away)
+        self._central_presets: dict[str, tuple[str, bool]] = {}
+        self._central_config_id: str | None = None
+        # The temperature of the presets by (preset, is_cool, is_away, is_motion). See build_preset_table
+        self._preset_table: dict[tuple[str, bool, bool, bool], float | None] = {}
 
         self._attr_preset_modes: list[str] = []
 
@@ -217,12 +259,14 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         self._motion_manager: FeatureMotionManager = FeatureMotionManager(self, hass)
         self._window_manager: FeatureWindowManager = FeatureWindowManager(self, hass)
         self._safety_manager: FeatureSafetyManager = FeatureSafetyManager(self, hass)
+        self._optimal_start_manager: FeatureOptimalStartManager = FeatureOptimalStartManager(self, hass)
 
         self.register_manager(self._presence_manager)
         self.register_manager(self._power_manager)
         self.register_manager(self._motion_manager)
         self.register_manager(self._window_manager)
         self.register_manager(self._safety_manager)
+        self.register_manager(self._optimal_start_manager)
 
         self.post_init(entry_infos)
 
@@ -235,35 +279,13 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
     ) -> dict[str, Any]:
         """Removes all values from config with are concerned by central_config"""
 
-        def clean_one(cfg, schema: vol.Schema):
-            """Clean one schema"""
-            for key, _ in schema.schema.items():
-                if key in cfg:
-                    del cfg[key]
-
         cfg = config_entry.copy()
         if central_config and central_config.data:
             # Removes config if central is used
-            if cfg.get(CONF_USE_MAIN_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_MAIN_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_TPI_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_TPI_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_WINDOW_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_WINDOW_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_MOTION_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_MOTION_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_POWER_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_POWER_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_PRESENCE_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_PRESENCE_DATA_SCHEMA)
-
-            if cfg.get(CONF_USE_ADVANCED_CENTRAL_CONFIG) is True:
-                clean_one(cfg, STEP_CENTRAL_ADVANCED_DATA_SCHEMA)
+            for use_central_key, keys in CENTRAL_CONFIG_KEYS.items():
+                if cfg.get(use_central_key) is True:
+                    for key in keys:
+                        cfg.pop(key, None)
 
             # take all central config
             entry_infos = central_config.data.copy()
@@ -274,6 +296,55 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
 
         return entry_infos
 
+    def merge_central_config(self, config_entry: ConfigData) -> ConfigData:
+        """Merge the config_entry with the central configuration"""
+        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
+        return self.clean_central_config_doublon(config_entry, api.find_central_configuration())
+
+    def can_update_config_in_place(self, config_entry: ConfigData) -> bool:
+        """True if the changes between the current configuration and config_entry
+        can be applied without recreating the VTherm"""
+        if self._entry_infos is None:
+            return False
+
+        new_entry_infos = self.merge_central_config(config_entry)
+        changed = {key for key in set(self._entry_infos) | set(new_entry_infos) if self._entry_infos.get(key) != new_entry_infos.get(key)}
+        _LOGGER.debug("%s - configuration changes are %s", self, changed)
+
+        # The power sensors are only created when a device power is set
+        if bool(self._entry_infos.get(CONF_DEVICE_POWER)) != bool(new_entry_infos.get(CONF_DEVICE_POWER)):
+            return False
+
+        return changed.issubset(IN_PLACE_UPDATABLE_CONF)
+
+    async def async_update_config_in_place(self, config_entry: ConfigData):
+        """Apply a new configuration without recreating the VTherm, the underlyings and the running cycles.
+        Should only be called if can_update_config_in_place is True"""
+        entry_infos = self.merge_central_config(config_entry)
+        _LOGGER.info("%s - Update the configuration in place with %s", self, entry_infos)
+
+        self._entry_infos = entry_infos
+
+        for manager in self._managers:
+            manager.stop_listening()
+            manager.update_config(entry_infos)
+
+        # the motion presets could have changed
+        self.build_preset_table()
+
+        self._tpi_coef_int = entry_infos.get(CONF_TPI_COEF_INT)
+        self._tpi_coef_ext = entry_infos.get(CONF_TPI_COEF_EXT) if self._ext_temp_sensor_entity_id else 0
+        self._minimal_activation_delay = entry_infos.get(CONF_MINIMAL_ACTIVATION_DELAY)
+        if self._prop_algorithm:
+            self._prop_algorithm.update_parameters(self._tpi_coef_int, self._tpi_coef_ext, self._minimal_activation_delay)
+
+        for manager in self._managers:
+            await manager.start_listening()
+            await manager.refresh_state()
+
+        self.recalculate()
+        await self.async_control_heating(force=True)
+
     def post_init(self, config_entry: ConfigData):
         """Finish the initialization of the thermostat"""
 
@@ -292,6 +363,13 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
 
         self._entry_infos = entry_infos
 
+        # The temperature slope shared by the window detection, the auto-start/stop and the sensors
+        self._temperature_slope_estimator = TemperatureSlopeEstimator(
+            self.name,
+            algorithm=api.window_auto_algorithm,
+            window_sec=api.window_auto_window_sec,
+        )
+
         # Post init all managers
         for manager in self._managers:
             manager.post_init(entry_infos)
@@ -343,6 +421,7 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         # Preset will be initialized from Number entities
         self._presets: dict[str, Any] = {}  # presets
         self._presets_away: dict[str, Any] = {}  # presets_away
+        self._preset_table = {}
 
         # Will be restored if possible
         self._attr_preset_mode = PRESET_NONE
@@ -385,14 +464,13 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         if api is not None and api.short_ema_params:
             short_ema_params = api.short_ema_params
 
-        self._ema_algo = ExponentialMovingAverage(
+        # The filters of the temperature. The EMA temperature is used for the temperature slope calculation
+        self._temperature_filter = TemperatureFilterPipeline.from_config(
             self.name,
-            short_ema_params.get("halflife_sec"),
+            api.temperature_filter_params if api is not None else {},
+            short_ema_params,
             # Needed for time calculation
             get_tz(self._hass),
-            # two digits after the coma for temperature slope calculation
-            short_ema_params.get("precision"),
-            short_ema_params.get("max_alpha"),
         )
 
         self._is_central_mode = not (
@@ -404,6 +482,12 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         )
 
         self._max_on_percent = api.max_on_percent
+        self._outdoor_temp_min_dtemp = api.outdoor_temp_min_dtemp
+        self._outdoor_temp_min_don_percent = api.outdoor_temp_min_don_percent
+        self._temp_debounce_min_interval_sec = api.temp_debounce_min_interval_sec
+        self._temp_debounce_min_dtemp = api.temp_debounce_min_dtemp
+        # The external temperature used by the last calculation
+        self._last_calculated_ext_temp = None
 
         _LOGGER.debug(
             "%s - Creation of a new VersatileThermostat entity: unique_id=%s",
@@ -435,10 +519,12 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             )
 
         if self._ext_temp_sensor_entity_id:
+            # the external sensor is generally shared by all VTherms. Use the hub to listen to it once
+            api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
             self.async_on_remove(
-                async_track_state_change_event(
-                    self.hass,
-                    [self._ext_temp_sensor_entity_id],
+                api.sensor_hub.subscribe(
+                    self._ext_temp_sensor_entity_id,
+                    READING_TEMPERATURE,
                     self._async_ext_temperature_changed,
                 )
             )
@@ -467,6 +553,12 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         for under in self._underlyings:
             under.remove_entity()
 
+        self.dearm_temp_debounce_timer()
+
+        VersatileThermostatAPI.get_vtherm_api(self._hass).unregister_central_preset_dependencies(self)
+        VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_watchdog.unregister(self)
+        VersatileThermostatAPI.get_vtherm_api(self._hass).state_store.unregister(self.unique_id)
+
     async def async_startup(self, central_configuration):
         """Triggered on startup, used to get old state and set internal states
          accordingly. This is triggered by VTherm API"""
@@ -481,12 +573,21 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
 
         await self.get_my_previous_state()
 
+        # restore the learned state persisted at the last stop
+        state_store = VersatileThermostatAPI.get_vtherm_api(self._hass).state_store
+        await state_store.async_load()
+        learned_state = state_store.get(self.unique_id)
+        if learned_state:
+            self.restore_learned_state(learned_state)
+        state_store.register(self.unique_id, self.get_learned_state)
+
         await self.init_presets(central_configuration)
 
         # Initialize all UnderlyingEntities
         self.init_underlyings()
 
         temperature_state = self.hass.states.get(self._temp_sensor_entity_id)
+        await self.async_warm_start(temperature_state)
         if temperature_state and temperature_state.state not in (
             STATE_UNAVAILABLE,
             STATE_UNKNOWN,
@@ -534,12 +635,7 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         if need_write_state:
             self.async_write_ha_state()
             if self._prop_algorithm:
-                self._prop_algorithm.calculate(
-                    self._target_temp,
-                    self._cur_temp,
-                    self._cur_ext_temp,
-                    self._hvac_mode or HVACMode.OFF,
-                )
+                self.calculate_prop_algorithm()
 
         self.hass.create_task(self._check_initial_state())
 
@@ -554,6 +650,47 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         restored
         """
 
+    def get_learned_state(self) -> dict[str, Any]:
+        """The compact record of the learned state which is persisted between restarts.
+        Should be extended in each specific thermostat if necessary"""
+        return {
+            "total_energy": self._total_energy,
+            "ema": self._temperature_filter.ema.state if self._temperature_filter else None,
+            "thermal_model": self._optimal_start_manager.thermal_model.state if self._optimal_start_manager.thermal_model.nb_observations > 0 else None,
+        }
+
+    def restore_learned_state(self, learned_state: dict[str, Any]):
+        """Restore the learned state persisted at the last stop. It is more recent than the state attributes"""
+        if learned_state.get("total_energy") is not None:
+            self._total_energy = learned_state["total_energy"]
+        if learned_state.get("ema") and self._temperature_filter:
+            self._temperature_filter.ema.restore_state(learned_state["ema"], self.now)
+        if learned_state.get("thermal_model"):
+            self._optimal_start_manager.thermal_model.restore_state(learned_state["thermal_model"])
+        _LOGGER.debug("%s - learned state restored: %s", self, learned_state)
+
+    async def async_warm_start(self, temperature_state: State | None) -> int:
+        """Replay the recent history of the temperature sensor in the filters and the slope estimator
+        before the first live measurement. The current state of the sensor is not replayed.
+        Returns the number of replayed samples"""
+        if not self._temperature_filter:
+            return 0
+        samples = await VersatileThermostatAPI.get_vtherm_api(self._hass).warm_start.async_get_samples(self._temp_sensor_entity_id)
+        current_measure = temperature_state.last_changed if temperature_state else None
+        nb_samples = 0
+        for value, measure in samples:
+            if current_measure is not None and measure >= current_measure:
+                break
+            measure = measure.astimezone(self._current_tz)
+            self._temperature_filter.process(value, measure)
+            self._temperature_slope_estimator.add_temp_measurement(self._temperature_filter.output(FILTER_STAGE_EMA), measure)
+            nb_samples += 1
+
+        if nb_samples:
+            self._ema_temp = self._temperature_filter.output(FILTER_STAGE_EMA)
+            _LOGGER.info("%s - warm start with %d samples of %s. The short slope is %s", self, nb_samples, self._temp_sensor_entity_id, self._temperature_slope_estimator.short_slope)
+        return nb_samples
+
     async def get_my_previous_state(self):
         """Try to get my previous state"""
         # Check If we have an old state
@@ -857,6 +994,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         """Get the safety manager"""
         return self._safety_manager
 
+    @property
+    def optimal_start_manager(self) -> FeatureOptimalStartManager | None:
+        """Get the optimal start manager"""
+        return self._optimal_start_manager
+
     @property
     def window_state(self) -> str | None:
         """Get the window_state"""
@@ -892,6 +1034,37 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         """Get the eventual ProportionalAlgorithm"""
         return self._prop_algorithm
 
+    @property
+    def algorithm_cache_stats(self) -> dict[str, dict[str, int]]:
+        """The counters of the memoization of the algorithms"""
+        return {"tpi": self._prop_algorithm.cache_stats} if self._prop_algorithm else {}
+
+    @property
+    def decision_output(self) -> float | None:
+        """The output of the control decision recorded in the decision trace.
+        This is the on_percent. Overridden by the over_climate with the regulated temperature"""
+        return self._prop_algorithm.on_percent if self._prop_algorithm else None
+
+    @property
+    def timings(self) -> HotPathTimings:
+        """The durations of the hot paths of the VTherm"""
+        return self._timings
+
+    @property
+    def decision_trace(self) -> DecisionTrace:
+        """The last control decisions"""
+        return self._decision_trace
+
+    @property
+    def temperature_sensor_entity_id(self) -> str | None:
+        """Get the entity_id of the temperature sensor"""
+        return self._temp_sensor_entity_id
+
+    @property
+    def ext_temperature_sensor_entity_id(self) -> str | None:
+        """Get the entity_id of the external temperature sensor"""
+        return self._ext_temp_sensor_entity_id
+
     @property
     def last_temperature_measure(self) -> datetime | None:
         """Get the last temperature datetime"""
@@ -914,10 +1087,37 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         """
         return self._attr_preset_modes
 
+    @property
+    def regulation_temperature(self) -> float | None:
+        """The temperature used by the regulation. This is the current temperature
+        or the output of a stage of the temperature filter if configured"""
+        if self._temperature_filter is None or self._temperature_filter.regulation_stage == FILTER_STAGE_RAW:
+            return self._cur_temp
+        return self._temperature_filter.regulation_temperature
+
+    @property
+    def temperature_filter(self) -> TemperatureFilterPipeline | None:
+        """The temperature filter pipeline"""
+        return self._temperature_filter
+
+    @property
+    def temperature_slope_estimator(self) -> TemperatureSlopeEstimator | None:
+        """Return the temperature slope estimator"""
+        return self._temperature_slope_estimator
+
     @property
     def last_temperature_slope(self) -> float | None:
         """Return the last temperature slope curve if any"""
-        return self._window_manager.last_slope
+        if not self._temperature_slope_estimator:
+            return None
+        return self._temperature_slope_estimator.short_slope
+
+    @property
+    def last_temperature_long_slope(self) -> float | None:
+        """Return the temperature slope on a long horizon if any"""
+        if not self._temperature_slope_estimator:
+            return None
+        return self._temperature_slope_estimator.long_slope
 
     @property
     def nb_underlying_entities(self) -> int:
@@ -1177,6 +1377,8 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             self._last_temperature_measure = self._last_ext_temperature_measure = (
                 self.now
             )
+            # the sensors are not updated: the watchdog must not see this reset
+            self._safety_manager.update_deadline(is_sensor_measure=False)
 
     def find_preset_temp(self, preset_mode: str):
         """Find the right temperature of a preset considering
@@ -1196,13 +1398,28 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             # the thermostat should be off
         if preset_mode == PRESET_POWER:
             return self._power_manager.power_temperature
+
+        key = (
+            preset_mode,
+            bool(self._ac_mode and self._hvac_mode == HVACMode.COOL),
+            bool(self._presence_manager.is_absence_detected),
+            preset_mode == PRESET_ACTIVITY and bool(self._motion_manager.is_motion_detected),
+        )
+        if key in self._preset_table:
+            return self._preset_table[key]
+        return self.resolve_preset_temp(*key)
+
+    def resolve_preset_temp(self, preset_mode: str, is_cool: bool, is_away: bool, is_motion: bool):
+        """Calculate the temperature of a preset in the given conditions"""
         if preset_mode == PRESET_ACTIVITY:
-            motion_preset = self._motion_manager.get_current_motion_preset()
-            if self._ac_mode and self._hvac_mode == HVACMode.COOL:
+            motion_preset = self._motion_manager.motion_preset if is_motion else self._motion_manager.no_motion_preset
+            if motion_preset is None:
+                return None
+            if is_cool:
                 motion_preset = motion_preset + PRESET_AC_SUFFIX
 
             if motion_preset in self._presets:
-                if self._presence_manager.is_absence_detected:
+                if is_away:
                     return self._presets_away[motion_preset + PRESET_AWAY_SUFFIX]
                 else:
                     return self._presets[motion_preset]
@@ -1210,18 +1427,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 return None
         else:
             # Select _ac presets if in COOL Mode (or over_switch with _ac_mode)
-            if self._ac_mode and self._hvac_mode == HVACMode.COOL:
+            if is_cool:
                 preset_mode = preset_mode + PRESET_AC_SUFFIX
 
-            _LOGGER.info("%s - find preset temp: %s", self, preset_mode)
-
             temp_val = self._presets.get(preset_mode, 0)
-            # if not self._presence_on or self._presence_state in [
-            #     None,
-            #     STATE_ON,
-            #     STATE_HOME,
-            # ]:
-            if self._presence_manager.is_absence_detected:
+            if is_away:
                 # We should return the preset_away temp val but if
                 # preset temp is 0, that means the user don't want to use
                 # the preset so we return 0, even if there is a value is preset_away
@@ -1233,6 +1443,25 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             else:
                 return temp_val
 
+    def build_preset_table(self):
+        """Precalculate the temperature of all presets in all conditions. Should be called
+        each time the presets, the ac_mode or the motion presets change"""
+        table: dict[tuple[str, bool, bool, bool], float | None] = {}
+        presets = list(CONF_PRESETS.keys())
+        if self._motion_manager.is_configured:
+            presets.append(PRESET_ACTIVITY)
+        for preset in presets:
+            for is_cool in ((False, True) if self._ac_mode else (False,)):
+                for is_away in (False, True):
+                    for is_motion in ((False, True) if preset == PRESET_ACTIVITY else (False,)):
+                        try:
+                            table[(preset, is_cool, is_away, is_motion)] = self.resolve_preset_temp(preset, is_cool, is_away, is_motion)
+                        except KeyError:
+                            # no away temperature: the preset is resolved (and fails) at use
+                            pass
+        self._preset_table = table
+        _LOGGER.debug("%s - the preset table is %s", self, table)
+
     def get_preset_away_name(self, preset_mode: str) -> str:
         """Get the preset name in away mode (when presence is off)"""
         return preset_mode + PRESET_AWAY_SUFFIX
@@ -1310,10 +1539,55 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
             return
 
+        # EMA and window auto detection are always updated with the new sample
         dearm_window_auto = await self._async_update_temp(new_state)
+
+        if self.is_temp_control_debounced():
+            return dearm_window_auto
+
+        await self._async_temperature_control()
+        return dearm_window_auto
+
+    async def _async_temperature_control(self, _=None):
+        """Recalculate and control the VTherm after a temperature change"""
+        self.dearm_temp_debounce_timer()
+        self._last_temp_control_date = self.now
+        self._last_temp_control_temp = self._cur_temp
         self.recalculate()
         await self.async_control_heating(force=False)
-        return dearm_window_auto
+
+    def is_temp_control_debounced(self) -> bool:
+        """Check if the control after a temperature change should be deferred.
+        The control is done immediately if the min interval is elapsed or if
+        the temperature have changed more than min_dtemp since the last control.
+        Else a timer is armed at the end of the interval so that the last value
+        is always processed (trailing edge). Return True if the control is deferred"""
+        if not self._temp_debounce_min_interval_sec or self._last_temp_control_date is None:
+            return False
+
+        elapsed_sec = (self.now - self._last_temp_control_date).total_seconds()
+        if elapsed_sec >= self._temp_debounce_min_interval_sec:
+            return False
+
+        if (
+            self._temp_debounce_min_dtemp
+            and self._cur_temp is not None
+            and self._last_temp_control_temp is not None
+            and abs(self._cur_temp - self._last_temp_control_temp) >= self._temp_debounce_min_dtemp
+        ):
+            return False
+
+        if self._cancel_temp_debounce is None:
+            delay_sec = self._temp_debounce_min_interval_sec - elapsed_sec
+            _LOGGER.debug("%s - temperature control is deferred for %.1f sec", self, delay_sec)
+            self._cancel_temp_debounce = async_call_later(self._hass, delay_sec, self._async_temperature_control)
+        return True
+
+    def dearm_temp_debounce_timer(self):
+        """Dearm the eventual pending temperature control"""
+        if self._cancel_temp_debounce:
+            self._cancel_temp_debounce()
+            self._cancel_temp_debounce = None
 
     @callback
     async def _async_last_seen_temperature_changed(self, event: Event):
@@ -1341,7 +1615,8 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 self._last_temperature_measure,
             )
 
-            # try to restart if we were in safety mode
+            # re-arm the safety deadline and try to restart if we were in safety mode
+            self._safety_manager.update_deadline()
             if self._safety_manager.is_safety_detected:
                 await self._safety_manager.refresh_state()
 
@@ -1354,21 +1629,53 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 err,
             )
 
-    async def _async_ext_temperature_changed(self, event: Event):
-        """Handle external temperature of the sensor changes."""
-        new_state: State = event.data.get("new_state")
+    async def _async_ext_temperature_changed(self, event: Event, reading: SensorReading = None):
+        """Handle external temperature of the sensor changes.
+        reading is given by the sensor hub which have already parsed the new state"""
+        if reading is None:
+            reading = SensorReading.from_event(event, READING_TEMPERATURE)
         _LOGGER.debug(
             "%s - external Temperature changed. Event.new_state is %s",
             self,
-            new_state,
+            reading.new_state,
         )
-        if new_state is None or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        if not reading.is_available:
+            return
+
+        await self._async_update_ext_temp(reading.new_state, reading.value)
+
+        # The external temperature is not used by the algorithm or has not significantly changed.
+        # It will be taken into account by the next calculation
+        if not self.is_ext_temp_recalculation_needed:
+            _LOGGER.debug("%s - no recalculation needed for the external temperature %s", self, self._cur_ext_temp)
             return
 
-        await self._async_update_ext_temp(new_state)
+        old_on_percent = self._prop_algorithm.on_percent if self._prop_algorithm else None
         self.recalculate()
+
+        if old_on_percent is not None and abs(self._prop_algorithm.on_percent - old_on_percent) < self._outdoor_temp_min_don_percent:
+            _LOGGER.debug(
+                "%s - on_percent change (%.2f -> %.2f) is under the threshold. The control is deferred to the next cycle",
+                self,
+                old_on_percent,
+                self._prop_algorithm.on_percent,
+            )
+            return
+
         await self.async_control_heating(force=False)
 
+    @property
+    def is_ext_temp_recalculation_needed(self) -> bool:
+        """True if a change of the external temperature should recalculate the algorithm.
+        With the TPI algorithm, this is only the case when tpi_coef_ext is not 0 and the change is significant"""
+        if self._prop_algorithm is None:
+            return True
+
+        if not self._tpi_coef_ext or self._cur_ext_temp is None:
+            return False
+
+        return self._last_calculated_ext_temp is None or abs(self._cur_ext_temp - self._last_calculated_ext_temp) >= self._outdoor_temp_min_dtemp
+
     @callback
     async def _check_initial_state(self):
         """Prevent the device from keep running if HVAC_MODE_OFF."""
@@ -1388,17 +1695,13 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
     async def _async_update_temp(self, state: State):
         """Update thermostat with latest state from sensor."""
         try:
-            cur_temp = float(state.state)
-            if math.isnan(cur_temp) or math.isinf(cur_temp):
-                raise ValueError(f"Sensor has illegal state {state.state}")
-            self._cur_temp = cur_temp
+            self._cur_temp = parse_temperature(state)
 
             self._last_temperature_measure = self.get_state_date_or_now(state)
 
-            # calculate the smooth_temperature with EMA calculation
-            self._ema_temp = self._ema_algo.calculate_ema(
-                self._cur_temp, self._last_temperature_measure
-            )
+            # calculate the filtered temperatures. The smooth_temperature is the output of the EMA stage
+            self._temperature_filter.process(self._cur_temp, self._last_temperature_measure)
+            self._ema_temp = self._temperature_filter.output(FILTER_STAGE_EMA)
 
             _LOGGER.debug(
                 "%s - After setting _last_temperature_measure %s, "
@@ -1408,7 +1711,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 state.last_changed.astimezone(self._current_tz),
             )
 
-            # try to restart if we were in safety mode
+            self._temperature_slope_estimator.add_temp_measurement(self._ema_temp, self._last_temperature_measure)
+            self._optimal_start_manager.add_temperature_measurement()
+
+            # re-arm the safety deadline and try to restart if we were in safety mode
+            self._safety_manager.update_deadline()
             if self._safety_manager.is_safety_detected:
                 await self._safety_manager.refresh_state()
 
@@ -1419,13 +1726,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             _LOGGER.error("Unable to update temperature from sensor: %s", ex)
 
     @callback
-    async def _async_update_ext_temp(self, state: State):
-        """Update thermostat with latest state from sensor."""
+    async def _async_update_ext_temp(self, state: State, cur_ext_temp: float = None):
+        """Update thermostat with latest state from sensor.
+        cur_ext_temp is the already parsed value of the state if available"""
         try:
-            cur_ext_temp = float(state.state)
-            if math.isnan(cur_ext_temp) or math.isinf(cur_ext_temp):
-                raise ValueError(f"Sensor has illegal state {state.state}")
-            self._cur_ext_temp = cur_ext_temp
+            self._cur_ext_temp = cur_ext_temp if cur_ext_temp is not None else parse_temperature(state)
             self._last_ext_temperature_measure = self.get_state_date_or_now(state)
 
             _LOGGER.debug(
@@ -1436,7 +1741,8 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 state.last_changed.astimezone(self._current_tz),
             )
 
-            # try to restart if we were in safety mode
+            # re-arm the safety deadline and try to restart if we were in safety mode
+            self._safety_manager.update_deadline()
             if self._safety_manager.is_safety_detected:
                 await self._safety_manager.refresh_state()
         except ValueError as ex:
@@ -1580,8 +1886,11 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         should have found the underlying climate to be operational"""
         return True
 
+    @serialized_control
+    @timed(TIMING_CONTROL_HEATING)
     async def async_control_heating(self, force=False, _=None) -> bool:
-        """The main function used to run the calculation at each cycle"""
+        """The main function used to run the calculation at each cycle.
+        The calls are serialized: a call during a running pass is merged into a pending one"""
 
         _LOGGER.debug(
             "%s - Checking new cycle. hvac_mode=%s, safety_state=%s, preset_mode=%s",
@@ -1591,14 +1900,19 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             self._attr_preset_mode,
         )
 
+        # the learned state have changed. It will be saved with the next batch
+        VersatileThermostatAPI.get_vtherm_api(self._hass).state_store.async_schedule_save()
+
         # check auto_window conditions
-        await self._window_manager.manage_window_auto(in_cycle=True)
+        self._temperature_slope_estimator.check_age_last_measurement(self._ema_temp, self.now)
+        await self._window_manager.manage_window_auto()
 
         # In over_climate mode, if the underlying climate is not initialized,
         # try to initialize it
         if not self.is_initialized:
             if not self.init_underlyings():
                 # still not found, we an stop here
+                self.record_decision(REASON_NOT_INITIALIZED)
                 return False
 
         # Check overpowering condition
@@ -1608,6 +1922,7 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         safety: bool = await self._safety_manager.refresh_state()
         if safety and self.is_over_climate:
             _LOGGER.debug("%s - End of cycle (safety and over climate)", self)
+            self.record_decision()
             return True
 
         # Stop here if we are off
@@ -1616,6 +1931,9 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             # A security to force stop heater if still active
             if self.is_device_active:
                 await self.async_underlying_entity_turn_off()
+                self.record_decision(action=ACTION_TURN_OFF)
+            else:
+                self.record_decision()
             return True
 
         for under in self._underlyings:
@@ -1626,10 +1944,34 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 self._prop_algorithm.on_percent if self._prop_algorithm else None,
                 force,
             )
+        # the start of cycle of an over_climate sends nothing. Its action is set after the regulation
+        self.record_decision(action=ACTION_NONE if self.is_over_climate else ACTION_START_CYCLE)
 
         self.update_custom_attributes()
         return True
 
+    def record_decision(self, reasons: int = 0, action: int = ACTION_NONE):
+        """Record the decision of the current cycle in the decision trace with the reasons
+        given by the state of the managers"""
+        if self._safety_manager.is_safety_detected:
+            reasons |= REASON_SAFETY
+        if self._window_manager.is_window_detected:
+            reasons |= REASON_WINDOW
+        if self._power_manager.is_overpowering_detected:
+            reasons |= REASON_POWER
+        if self._hvac_mode == HVACMode.OFF:
+            reasons |= REASON_OFF
+        self._decision_trace.record(
+            self.now,
+            self._hvac_mode,
+            self.regulation_temperature,
+            self._cur_ext_temp,
+            self._target_temp,
+            self.decision_output,
+            reasons,
+            action,
+        )
+
     def recalculate(self):
         """A utility function to force the calculation of a the algo and
         update the custom attributes and write the state.
@@ -1637,12 +1979,24 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         """
         raise NotImplementedError()
 
+    def calculate_prop_algorithm(self):
+        """Calculate the proportional algorithm with the current temperatures.
+        The external temperature used is kept to know if a change needs a recalculation"""
+        self._prop_algorithm.calculate(
+            self._target_temp,
+            self.regulation_temperature,
+            self._cur_ext_temp,
+            self._hvac_mode or HVACMode.OFF,
+        )
+        self._last_calculated_ext_temp = self._cur_ext_temp
+
     def incremente_energy(self):
         """increment the energy counter if device is active
         Should be overridden by super class
         """
         raise NotImplementedError()
 
+    @timed(TIMING_UPDATE_ATTRIBUTES)
     def update_custom_attributes(self):
         """Update the custom extra attributes for the entity"""
 
@@ -1694,6 +2048,9 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
             "ema_temp": self._ema_temp,
             "is_used_by_central_boiler": self.is_used_by_central_boiler,
             "temperature_slope": round(self.last_temperature_slope or 0, 3),
+            "temperature_long_slope": round(self.last_temperature_long_slope or 0, 3),
+            "regulation_temperature": self.regulation_temperature,
+            "temperature_filter": self._temperature_filter.stats if self._temperature_filter else None,
             "hvac_off_reason": self.hvac_off_reason,
             "max_on_percent": self._max_on_percent,
             "have_valve_regulation": self.have_valve_regulation,
@@ -1704,6 +2061,8 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 if self._last_change_time_from_vtherm is not None
                 else None
             ),
+            "nb_control_executed": self._control_mailbox.nb_executed,
+            "nb_control_coalesced": self._control_mailbox.nb_coalesced,
         }
 
         for manager in self._managers:
@@ -1781,6 +2140,7 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 self._presets[preset] = temperature
             if self._presence_manager.is_configured and temperature_away is not None:
                 self._presets_away[self.get_preset_away_name(preset)] = temperature_away
+            self.build_preset_table()
         else:
             _LOGGER.warning(
                 "%s - No preset %s configured for this thermostat. "
@@ -1849,6 +2209,30 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         if await self._window_manager.set_window_bypass(window_bypass):
             self.update_custom_attributes()
 
+    async def service_set_optimal_start(self, preset: str | None = None, start_time: datetime | None = None):
+        """Called by a service call:
+        service: versatile_thermostat.set_optimal_start
+        data:
+            preset: comfort
+            start_time: "2024-01-01 07:00:00"
+        target:
+            entity_id: climate.thermostat_1
+        Without preset the scheduled preset is cancelled
+        """
+        _LOGGER.info(
+            "%s - Calling service_set_optimal_start, preset: %s, start_time: %s",
+            self,
+            preset,
+            start_time,
+        )
+        if preset is None or start_time is None:
+            self._optimal_start_manager.cancel_scheduled_preset()
+        else:
+            if start_time.tzinfo is None:
+                start_time = start_time.replace(tzinfo=self._current_tz)
+            await self._optimal_start_manager.schedule_preset(preset, start_time)
+        self.update_custom_attributes()
+
     def send_event(self, event_type: EventType, data: dict):
         """Send an event"""
         send_vtherm_event(self._hass, event_type=event_type, entity=self, data=data)
@@ -1861,8 +2245,9 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
 
         presets: dict[str, Any] = {}
         presets_away: dict[str, Any] = {}
+        central_presets: dict[str, tuple[str, bool]] = {}
 
-        def calculate_presets(items, use_central_conf_key):
+        def calculate_presets(items, use_central_conf_key, is_away=False):
             presets: dict[str, Any] = {}
             config_id = self._unique_id
             if (
@@ -1872,6 +2257,8 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                 config_id = central_config.entry_id
 
             for key, preset_name in items:
+                if config_id != self._unique_id:
+                    central_presets[preset_name] = (key, is_away)
                 _LOGGER.debug("looking for key=%s, preset_name=%s", key, preset_name)
                 value = vtherm_api.get_temperature_number_value(
                     config_id=config_id, preset_name=preset_name
@@ -1901,13 +2288,56 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
                     else CONF_PRESETS_AWAY.items()
                 ),
                 CONF_USE_PRESENCE_CENTRAL_CONFIG,
+                True,
             )
 
         # aggregate all available presets now
         self._presets: dict[str, Any] = presets
         self._presets_away: dict[str, Any] = presets_away
 
-        # Calculate all possible presets
+        # Only the VTherms which uses a central preset will be updated when it changes
+        self._central_presets = central_presets
+        self._central_config_id = central_config.entry_id if central_config else None
+        vtherm_api.register_central_preset_dependencies(self, self._central_config_id, central_presets.keys())
+
+        self.build_preset_table()
+        self.calculate_preset_modes()
+
+        # Re-applicate the last preset if any to take change into account
+        if self._attr_preset_mode:
+            await self.async_set_preset_mode_internal(self._attr_preset_mode, True)
+
+    async def update_central_preset(self, preset_name: str) -> bool:
+        """Update the preset which uses the central temperature Number preset_name.
+        The current preset is re-applied only if its temperature have changed.
+        Returns True if the preset value have changed"""
+        if preset_name not in self._central_presets:
+            return False
+
+        key, is_away = self._central_presets[preset_name]
+        value = VersatileThermostatAPI.get_vtherm_api().get_temperature_number_value(config_id=self._central_config_id, preset_name=preset_name)
+        if value is None:
+            value = self._attr_max_temp if self._ac_mode else self._attr_min_temp
+
+        presets = self._presets_away if is_away else self._presets
+        if presets.get(key) == value:
+            return False
+
+        current_preset = self._attr_preset_mode
+        old_temp = self.find_preset_temp(current_preset) if current_preset not in (None, PRESET_NONE) else None
+        presets[key] = value
+        self.build_preset_table()
+        self.calculate_preset_modes()
+        _LOGGER.info("%s - the central preset %s have changed to %s", self, preset_name, value)
+
+        if old_temp is not None and self.find_preset_temp(current_preset) != old_temp:
+            await self.async_set_preset_mode_internal(current_preset, True)
+        self.update_custom_attributes()
+        self.async_write_ha_state()
+        return True
+
+    def calculate_preset_modes(self):
+        """Calculate all possible presets from the presets temperature"""
         self._attr_preset_modes = [PRESET_NONE]
         if len(self._presets):
             self._support_flags = SUPPORT_FLAGS | ClimateEntityFeature.PRESET_MODE
@@ -1926,10 +2356,6 @@ class BaseThermostat(ClimateEntity, RestoreEntity, Generic[T]):
         if self._motion_manager.is_configured:
             self._attr_preset_modes.append(PRESET_ACTIVITY)
 
-        # Re-applicate the last preset if any to take change into account
-        if self._attr_preset_mode:
-            await self.async_set_preset_mode_internal(self._attr_preset_mode, True)
-
     async def async_turn_off(self) -> None:
         await self.async_set_hvac_mode(HVACMode.OFF)
 
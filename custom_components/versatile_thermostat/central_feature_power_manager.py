@@ -1,8 +1,8 @@
 """ Implements a central Power Feature Manager for Versatile Thermostat """
 
+import asyncio
 import logging
 from typing import Any
-from functools import cmp_to_key
 
 from datetime import timedelta
 
@@ -23,6 +23,7 @@ from homeassistant.components.climate import (
 from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData
 from .base_manager import BaseFeatureManager
+from .timing_stats import HotPathTimings, timed, TIMING_CALCULATE_SHEDDING
 
 # circular dependency
 # from .base_thermostat import BaseThermostat
@@ -32,6 +33,15 @@ MIN_DTEMP_SECS = 20
 _LOGGER = logging.getLogger(__name__)
 
 
+def calculate_dtemp(vtherm) -> float:
+    """The difference between the target and the current temperature of a VTherm (a BaseThermostat).
+    +inf if one of them is unknown"""
+    target = vtherm.target_temperature if not vtherm.power_manager.is_overpowering_detected else vtherm.saved_target_temp
+    if vtherm.current_temperature is None or target is None:
+        return float("inf")
+    return target - vtherm.current_temperature
+
+
 class CentralFeaturePowerManager(BaseFeatureManager):
     """A central Power feature manager"""
 
@@ -48,6 +58,8 @@ class CentralFeaturePowerManager(BaseFeatureManager):
         self._power_temp: float = None
         self._cancel_calculate_shedding_call = None
         self._started_vtherm_total_power: float = None
+        # The shedding calculation and the central mode changes are not done at the same time
+        self._shedding_lock = asyncio.Lock()
         # Not used now
         self._last_shedding_date = None
 
@@ -166,6 +178,12 @@ class CentralFeaturePowerManager(BaseFeatureManager):
         if not self.is_configured or self.current_max_power is None or self.current_power is None:
             return
 
+        async with self._shedding_lock:
+            await self._calculate_shedding_locked()
+
+    @timed(TIMING_CALCULATE_SHEDDING)
+    async def _calculate_shedding_locked(self):
+        """The shedding calculation. The shedding lock should be acquired"""
         _LOGGER.debug("-------- Start of calculate_shedding")
         # Find all VTherms
         available_power = self.current_max_power - self.current_power
@@ -261,30 +279,35 @@ class CentralFeaturePowerManager(BaseFeatureManager):
             if vtherm.power_manager.is_configured and vtherm.is_on
         ]
 
-        # sort the result with the min temp difference first. A and B should be BaseThermostat class
-        def cmp_temps(a, b) -> int:
-            diff_a = float("inf")
-            diff_b = float("inf")
-            a_target = a.target_temperature if not a.power_manager.is_overpowering_detected else a.saved_target_temp
-            b_target = b.target_temperature if not b.power_manager.is_overpowering_detected else b.saved_target_temp
-            if a.current_temperature is not None and a_target is not None:
-                diff_a = a_target - a.current_temperature
-            if b.current_temperature is not None and b_target is not None:
-                diff_b = b_target - b.current_temperature
-
-            if diff_a == diff_b:
-                return 0
-            return 1 if diff_a > diff_b else -1
-
-        vtherms.sort(key=cmp_to_key(cmp_temps))
+        # sort the result with the min temp difference first
+        vtherms.sort(key=calculate_dtemp)
         return vtherms
 
+    def sort_by_power_priority(self, vtherms: list) -> list:
+        """Returns the VTherms with power management of the list. The ones which need the
+        most to heat first (the reverse order of the shedding)"""
+        return sorted(
+            [vtherm for vtherm in vtherms if vtherm.power_manager.is_configured],
+            key=calculate_dtemp,
+            reverse=True,
+        )
+
     def add_started_vtherm_total_power(self, started_power: float):
         """Add the power into the _started_vtherm_total_power which holds all VTherm started after
         the last power measurement"""
         self._started_vtherm_total_power += started_power
         _LOGGER.debug("%s - started_vtherm_total_power is now %s", self, self._started_vtherm_total_power)
 
+    @property
+    def timings(self) -> HotPathTimings:
+        """The durations of the central hot paths"""
+        return self._vtherm_api.timings
+
+    @property
+    def shedding_lock(self) -> asyncio.Lock:
+        """The lock which sequences the shedding calculation and the restart of the VTherms"""
+        return self._shedding_lock
+
     @property
     def is_configured(self) -> bool:
         """True if the FeatureManager is fully configured"""
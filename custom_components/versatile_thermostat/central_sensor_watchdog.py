@@ -0,0 +1,224 @@
+# pylint: disable=line-too-long
+""" The central watchdog of the temperature sensors.
+
+    A sensor (the temperature or the outdoor temperature of a VTherm) is stale when no measurement
+    have been received during the safety delay of the VTherms which use it. The sensors are often
+    shared between VTherms so the deadlines are kept by sensor in a min-heap and only one timer is
+    armed for the nearest deadline. When it is reached all the VTherms which use the stale sensors
+    are notified at once.
+"""
+
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CentralSensorWatchdog:
+    """The central watchdog of the temperature sensors"""
+
+    def __init__(self, hass: HomeAssistant, vtherm_api: Any):
+        self._hass: HomeAssistant = hass
+        self._vtherm_api = vtherm_api  # no type due to circular reference
+        # the heap of (deadline, sensor entity_id, delay_min). A deadline is obsolete if the sensor have
+        # been updated since. They are ignored when they are popped
+        self._heap: list[tuple[datetime, str, float]] = []
+        # the deadline of the heap of each (sensor entity_id, delay_min) and the number of obsolete deadlines of the heap.
+        # The heap is rebuilt when more than the half of its deadlines are obsolete
+        self._deadlines: dict[tuple[str, float], datetime] = {}
+        self._nb_obsolete: int = 0
+        self._last_measures: dict[str, datetime] = {}
+        # the VTherms which use a sensor and their safety delay
+        self._dependents: dict[str, dict[Any, float]] = {}
+        # the stale sensors and the datetime of their last measurement
+        self._stale_sensors: dict[str, datetime] = {}
+        self._timer_cancel: CALLBACK_TYPE | None = None
+        self._timer_deadline: datetime | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    def __str__(self):
+        return "CentralSensorWatchdog"
+
+    def report_measurement(self, vtherm: Any, entity_id: str | None, last_measure: datetime | None, delay_min: float | None):
+        """A VTherm have received a measurement of the sensor entity_id (or has been started).
+        The sensor is stale if it is not updated during delay_min"""
+        if entity_id is None or last_measure is None or delay_min is None:
+            return
+
+        dependents = self._dependents.setdefault(entity_id, {})
+        is_new_delay = delay_min not in dependents.values()
+        dependents[vtherm] = delay_min
+
+        # a VTherm can report an older measurement of a shared sensor than another one. The last measure never goes back
+        previous_measure = self._last_measures.get(entity_id)
+        if previous_measure is not None and last_measure < previous_measure:
+            last_measure = previous_measure
+
+        if previous_measure == last_measure and not is_new_delay:
+            return
+
+        if last_measure != previous_measure:
+            self._last_measures[entity_id] = last_measure
+            if self._stale_sensors.pop(entity_id, None) is not None:
+                _LOGGER.info("%s - the sensor %s is updated again", self, entity_id)
+                self._notify_listeners()
+            delays = set(dependents.values())
+        else:
+            delays = {delay_min}
+
+        now = self._vtherm_api.now
+        for delay in delays:
+            deadline = last_measure + timedelta(minutes=delay)
+            if deadline > now:
+                self._push(deadline, entity_id, delay)
+            elif entity_id not in self._stale_sensors:
+                # already too old (at startup for example). The VTherm which reports it does the check itself
+                self._stale_sensors[entity_id] = last_measure
+                self._notify_listeners()
+
+        if self._nb_obsolete > len(self._heap) // 2:
+            self._compact()
+        self._arm_timer()
+
+    def unregister(self, vtherm: Any):
+        """Remove a VTherm from the watchdog"""
+        for entity_id in [entity_id for entity_id, dependents in self._dependents.items() if vtherm in dependents]:
+            dependents = self._dependents[entity_id]
+            del dependents[vtherm]
+            if not dependents:
+                del self._dependents[entity_id]
+                self._last_measures.pop(entity_id, None)
+                if self._stale_sensors.pop(entity_id, None) is not None:
+                    self._notify_listeners()
+
+        if not self._dependents:
+            self._heap = []
+            self._deadlines = {}
+            self._nb_obsolete = 0
+            self._cancel_timer()
+        else:
+            self._compact()
+
+    def register_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Register a callback called when the list of stale sensors change. Returns the function to unregister it"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _is_valid(self, deadline: datetime, entity_id: str, delay: float) -> bool:
+        """True if the deadline of the heap is the current one of the sensor"""
+        last_measure = self._last_measures.get(entity_id)
+        return (
+            last_measure is not None
+            and last_measure + timedelta(minutes=delay) == deadline
+            and delay in self._dependents.get(entity_id, {}).values()
+        )
+
+    def _push(self, deadline: datetime, entity_id: str, delay: float):
+        """Add a deadline in the heap. The previous deadline of the sensor with this delay becomes obsolete"""
+        heapq.heappush(self._heap, (deadline, entity_id, delay))
+        if self._deadlines.get((entity_id, delay)) is not None:
+            self._nb_obsolete += 1
+        self._deadlines[(entity_id, delay)] = deadline
+
+    def _pop(self) -> tuple[datetime, str, float]:
+        """Remove the nearest deadline of the heap"""
+        deadline, entity_id, delay = heapq.heappop(self._heap)
+        if self._deadlines.get((entity_id, delay)) == deadline:
+            del self._deadlines[(entity_id, delay)]
+        elif self._nb_obsolete > 0:
+            self._nb_obsolete -= 1
+        return deadline, entity_id, delay
+
+    def _compact(self):
+        """Remove all the obsolete deadlines of the heap"""
+        self._heap = [entry for entry in self._heap if self._is_valid(*entry)]
+        heapq.heapify(self._heap)
+        self._deadlines = {(entity_id, delay): deadline for deadline, entity_id, delay in self._heap}
+        self._nb_obsolete = 0
+
+    def _arm_timer(self):
+        """Arm the timer for the nearest valid deadline"""
+        while self._heap and not self._is_valid(*self._heap[0]):
+            self._pop()
+
+        deadline = self._heap[0][0] if self._heap else None
+        if deadline == self._timer_deadline and self._timer_cancel:
+            return
+
+        self._cancel_timer()
+        if deadline is None:
+            return
+        self._timer_deadline = deadline
+        delay_sec = max(0.0, (deadline - self._vtherm_api.now).total_seconds())
+        self._timer_cancel = async_call_later(self._hass, timedelta(seconds=delay_sec), self._async_check_deadlines)
+
+    def _cancel_timer(self):
+        """Cancel the timer"""
+        if self._timer_cancel:
+            self._timer_cancel()
+            self._timer_cancel = None
+        self._timer_deadline = None
+
+    async def _async_check_deadlines(self, _=None):
+        """The nearest deadline is reached. Notify all the VTherms which use a stale sensor at once"""
+        self._timer_cancel = None
+        self._timer_deadline = None
+        await self.check_deadlines()
+
+    async def check_deadlines(self):
+        """Find the stale sensors and notify their VTherms"""
+        now = self._vtherm_api.now
+        vtherms_to_notify = []
+        nb_stale_sensors = len(self._stale_sensors)
+        while self._heap and self._heap[0][0] <= now:
+            deadline, entity_id, delay = self._pop()
+            if not self._is_valid(deadline, entity_id, delay):
+                continue
+            self._stale_sensors.setdefault(entity_id, self._last_measures[entity_id])
+            for vtherm, vtherm_delay in self._dependents[entity_id].items():
+                if vtherm_delay == delay and vtherm not in vtherms_to_notify:
+                    vtherms_to_notify.append(vtherm)
+
+        self._arm_timer()
+        if len(self._stale_sensors) != nb_stale_sensors:
+            _LOGGER.warning("%s - the sensors %s are not updated anymore", self, list(self._stale_sensors))
+            self._notify_listeners()
+
+        if not vtherms_to_notify:
+            return
+
+        _LOGGER.info("%s - notifying %d VTherm(s) of stale sensors", self, len(vtherms_to_notify))
+        results = await asyncio.gather(*[vtherm.safety_manager.async_on_stale_sensor() for vtherm in vtherms_to_notify], return_exceptions=True)
+        for vtherm, result in zip(vtherms_to_notify, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("%s - Error while notifying %s of a stale sensor. Error is: %s", self, vtherm, result, exc_info=result)
+
+    def _notify_listeners(self):
+        """Call the listeners of the stale sensors"""
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def stale_sensors(self) -> dict[str, datetime]:
+        """The stale sensors and the datetime of their last measurement"""
+        return self._stale_sensors
+
+    def find_stale_dependents(self) -> list:
+        """The VTherms which use a stale sensor"""
+        vtherms = []
+        for entity_id in self._stale_sensors:
+            for vtherm in self._dependents.get(entity_id, {}):
+                if vtherm not in vtherms:
+                    vtherms.append(vtherm)
+        return vtherms
+
+    @property
+    def next_deadline(self) -> datetime | None:
+        """The nearest deadline"""
+        return self._timer_deadline
@@ -122,7 +122,7 @@ async def async_setup_entry(
         SERVICE_SET_AUTO_REGULATION_MODE,
         {
             vol.Required("auto_regulation_mode"): vol.In(
-                ["None", "Light", "Medium", "Strong", "Slow", "Expert"]
+                ["None", "Light", "Medium", "Strong", "Slow", "Expert", "MPC"]
             ),
         },
         "service_set_auto_regulation_mode",
@@ -137,3 +137,12 @@ async def async_setup_entry(
         },
         "service_set_auto_fan_mode",
     )
+
+    platform.async_register_entity_service(
+        SERVICE_SET_OPTIMAL_START,
+        {
+            vol.Optional("preset"): vol.In(CONF_PRESETS_SELECTIONABLE),
+            vol.Optional("start_time"): cv.datetime,
+        },
+        "service_set_optimal_start",
+    )
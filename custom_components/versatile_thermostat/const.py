@@ -111,6 +111,7 @@ CONF_AUTO_REGULATION_LIGHT = "auto_regulation_light"
 CONF_AUTO_REGULATION_MEDIUM = "auto_regulation_medium"
 CONF_AUTO_REGULATION_STRONG = "auto_regulation_strong"
 CONF_AUTO_REGULATION_EXPERT = "auto_regulation_expert"
+CONF_AUTO_REGULATION_MPC = "auto_regulation_mpc"
 CONF_AUTO_REGULATION_DTEMP = "auto_regulation_dtemp"
 CONF_AUTO_REGULATION_PERIOD_MIN = "auto_regulation_periode_min"
 CONF_AUTO_REGULATION_USE_DEVICE_TEMP = "auto_regulation_use_device_temp"
@@ -145,6 +146,51 @@ CONF_VALVE_4 = "valve_entity4_id"
 CONF_SHORT_EMA_PARAMS = "short_ema_params"
 CONF_SAFETY_MODE = "safety_mode"
 CONF_MAX_ON_PERCENT = "max_on_percent"
+CONF_EVENT_PAYLOAD = "event_payload"
+CONF_OUTDOOR_TEMP_PARAMS = "outdoor_temp_params"
+CONF_TEMP_DEBOUNCE_PARAMS = "temperature_debounce_params"
+CONF_STARTUP_CONCURRENCY = "startup_concurrency"
+CONF_WINDOW_AUTO_PARAMS = "window_auto_params"
+CONF_TEMPERATURE_FILTER_PARAMS = "temperature_filter_params"
+CONF_OPTIMAL_START_PARAMS = "optimal_start_params"
+CONF_STATE_STORE_PARAMS = "state_store_params"
+CONF_WARM_START_PARAMS = "warm_start_params"
+
+# The payload policy of the events. The key "default" in the event_payload
+# global param gives the policy for all event types not explicitly listed
+EVENT_PAYLOAD_MINIMAL = "minimal"
+EVENT_PAYLOAD_DELTA = "delta"
+EVENT_PAYLOAD_FULL = "full"
+EVENT_PAYLOADS = [EVENT_PAYLOAD_MINIMAL, EVENT_PAYLOAD_DELTA, EVENT_PAYLOAD_FULL]
+EVENT_PAYLOAD_DEFAULT_KEY = "default"
+DEFAULT_EVENT_PAYLOAD = EVENT_PAYLOAD_MINIMAL
+
+# The max number of VTherms started at the same time
+DEFAULT_STARTUP_CONCURRENCY = 8
+
+# The algorithms of the open window auto detection
+WINDOW_AUTO_ALGORITHM_SLOPE = "slope"
+WINDOW_AUTO_ALGORITHM_REGRESSION = "regression"
+WINDOW_AUTO_ALGORITHMS = [WINDOW_AUTO_ALGORITHM_SLOPE, WINDOW_AUTO_ALGORITHM_REGRESSION]
+
+# The stages of the temperature filter. raw is the unfiltered temperature
+FILTER_STAGE_RAW = "raw"
+FILTER_STAGE_SPIKE = "spike"
+FILTER_STAGE_MEDIAN = "median"
+FILTER_STAGE_EMA = "ema"
+FILTER_STAGE_KALMAN = "kalman"
+FILTER_STAGES = [FILTER_STAGE_SPIKE, FILTER_STAGE_MEDIAN, FILTER_STAGE_EMA, FILTER_STAGE_KALMAN]
+
+# The max time the optimal start can heat in advance of a scheduled preset
+DEFAULT_OPTIMAL_START_MAX_LEAD_MIN = 180
+
+# The delay between two writes of the learned state of the VTherms
+DEFAULT_STATE_STORE_SAVE_DELAY_SEC = 60
+
+# The warm start from the recorder history. It is disabled if history_min is 0
+DEFAULT_WARM_START_HISTORY_MIN = 0
+MAX_WARM_START_HISTORY_MIN = 180
+DEFAULT_WARM_START_MAX_SAMPLES = 120
 
 CONF_USE_MAIN_CENTRAL_CONFIG = "use_main_central_config"
 CONF_USE_TPI_CENTRAL_CONFIG = "use_tpi_central_config"
@@ -183,6 +229,76 @@ TYPE_AUTO_START_STOP_LEVELS = Literal[  # pylint: disable=invalid-name
     AUTO_START_STOP_LEVEL_NONE,
 ]
 
+# The configuration parameters taken from the central configuration when the
+# corresponding "use central config" flag is set. Must be kept in sync with the
+# STEP_CENTRAL_xxx schemas in config_schema (which is only loaded by the config flow)
+CENTRAL_CONFIG_KEYS = {
+    CONF_USE_MAIN_CENTRAL_CONFIG: [
+        CONF_EXTERNAL_TEMP_SENSOR,
+        CONF_TEMP_MIN,
+        CONF_TEMP_MAX,
+        CONF_STEP_TEMPERATURE,
+    ],
+    CONF_USE_TPI_CENTRAL_CONFIG: [
+        CONF_TPI_COEF_INT,
+        CONF_TPI_COEF_EXT,
+    ],
+    CONF_USE_WINDOW_CENTRAL_CONFIG: [
+        CONF_WINDOW_DELAY,
+        CONF_WINDOW_OFF_DELAY,
+        CONF_WINDOW_AUTO_OPEN_THRESHOLD,
+        CONF_WINDOW_AUTO_CLOSE_THRESHOLD,
+        CONF_WINDOW_AUTO_MAX_DURATION,
+        CONF_WINDOW_ACTION,
+    ],
+    CONF_USE_MOTION_CENTRAL_CONFIG: [
+        CONF_MOTION_DELAY,
+        CONF_MOTION_OFF_DELAY,
+        CONF_MOTION_PRESET,
+        CONF_NO_MOTION_PRESET,
+    ],
+    CONF_USE_POWER_CENTRAL_CONFIG: [
+        CONF_POWER_SENSOR,
+        CONF_MAX_POWER_SENSOR,
+        CONF_PRESET_POWER,
+    ],
+    CONF_USE_PRESENCE_CENTRAL_CONFIG: [
+        CONF_PRESENCE_SENSOR,
+    ],
+    CONF_USE_ADVANCED_CENTRAL_CONFIG: [
+        CONF_MINIMAL_ACTIVATION_DELAY,
+        CONF_SAFETY_DELAY_MIN,
+        CONF_SAFETY_MIN_ON_PERCENT,
+        CONF_SAFETY_DEFAULT_ON_PERCENT,
+    ],
+}
+
+# The configuration parameters which can be changed without recreating the VTherm
+# (applied in place through the managers post_init)
+IN_PLACE_UPDATABLE_CONF = [
+    CONF_TPI_COEF_INT,
+    CONF_TPI_COEF_EXT,
+    CONF_MINIMAL_ACTIVATION_DELAY,
+    CONF_SAFETY_DELAY_MIN,
+    CONF_SAFETY_MIN_ON_PERCENT,
+    CONF_SAFETY_DEFAULT_ON_PERCENT,
+    CONF_WINDOW_SENSOR,
+    CONF_WINDOW_DELAY,
+    CONF_WINDOW_OFF_DELAY,
+    CONF_WINDOW_AUTO_OPEN_THRESHOLD,
+    CONF_WINDOW_AUTO_CLOSE_THRESHOLD,
+    CONF_WINDOW_AUTO_MAX_DURATION,
+    CONF_WINDOW_ACTION,
+    CONF_MOTION_SENSOR,
+    CONF_MOTION_DELAY,
+    CONF_MOTION_OFF_DELAY,
+    CONF_MOTION_PRESET,
+    CONF_NO_MOTION_PRESET,
+    CONF_PRESENCE_SENSOR,
+    CONF_DEVICE_POWER,
+    CONF_PRESET_POWER,
+]
+
 HVAC_OFF_REASON_NAME = "hvac_off_reason"
 HVAC_OFF_REASON_MANUAL = "manual"
 HVAC_OFF_REASON_AUTO_START_STOP = "auto_start_stop"
@@ -339,6 +455,7 @@ CONF_AUTO_REGULATION_MODES = [
     CONF_AUTO_REGULATION_STRONG,
     CONF_AUTO_REGULATION_SLOW,
     CONF_AUTO_REGULATION_EXPERT,
+    CONF_AUTO_REGULATION_MPC,
 ]
 
 CONF_THERMOSTAT_TYPES = [
@@ -380,6 +497,7 @@ SERVICE_SET_SAFETY = "set_safety"
 SERVICE_SET_WINDOW_BYPASS = "set_window_bypass"
 SERVICE_SET_AUTO_REGULATION_MODE = "set_auto_regulation_mode"
 SERVICE_SET_AUTO_FAN_MODE = "set_auto_fan_mode"
+SERVICE_SET_OPTIMAL_START = "set_optimal_start"
 
 DEFAULT_SAFETY_MIN_ON_PERCENT = 0.5
 DEFAULT_SAFETY_DEFAULT_ON_PERCENT = 0.1
@@ -491,11 +609,18 @@ class EventType(Enum):
 
 
 def send_vtherm_event(hass, event_type: EventType, entity, data: dict):
-    """Send an event"""
-    _LOGGER.info("%s - Sending event %s with data: %s", entity, event_type, data)
+    """Send an event. The state_attributes of the entity are added to the
+    event data depending on the event_payload policy of the event type:
+    none with minimal, the changed ones with delta and all with full"""
+    from .vtherm_api import VersatileThermostatAPI  # pylint: disable=import-outside-toplevel
+
     data["entity_id"] = entity.entity_id
     data["name"] = entity.name
-    data["state_attributes"] = entity.state_attributes
+    api = VersatileThermostatAPI.get_vtherm_api()
+    state_attributes = api.get_event_state_attributes(event_type, entity) if api else entity.state_attributes
+    if state_attributes is not None:
+        data["state_attributes"] = state_attributes
+    _LOGGER.info("%s - Sending event %s with data: %s", entity, event_type, data)
     hass.bus.fire(event_type.value, data)
 
 
@@ -0,0 +1,119 @@
+# pylint: disable=line-too-long
+""" A mailbox which serializes the control passes of a VTherm """
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ControlMailbox:
+    """A single consumer mailbox for the control passes of a VTherm.
+    At most one pass is running and at most one is pending. The requests received
+    while a pass is running are merged into the pending one (force=True dominates).
+    The inputs are read at execution time, so the pending pass always uses the latest ones"""
+
+    def __init__(self, name: str):
+        """Init the mailbox"""
+        self._name = name
+        self._runner_task: asyncio.Task | None = None
+        self._pending: asyncio.Future | None = None
+        self._pending_force: bool = False
+        self._nb_executed: int = 0
+        self._nb_coalesced: int = 0
+
+    def __str__(self):
+        return f"ControlMailbox-{self._name}"
+
+    async def request(self, execute: Callable[[bool], Awaitable[Any]], force: bool) -> Any:
+        """Request a control pass. Return the result of the pass which includes the request"""
+        if self._runner_task is None:
+            return await self._run(execute, force)
+
+        if self._runner_task is asyncio.current_task():
+            # A nested request from the running pass itself. Waiting for the pending one would deadlock
+            return await execute(force)
+
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().create_future()
+            self._pending_force = force
+        else:
+            self._pending_force = self._pending_force or force
+            self._nb_coalesced += 1
+            _LOGGER.debug("%s - control request coalesced (force=%s)", self, self._pending_force)
+
+        return await asyncio.shield(self._pending)
+
+    async def _run(self, execute: Callable[[bool], Awaitable[Any]], force: bool) -> Any:
+        """Run the requested pass and then all the pending ones"""
+        self._runner_task = asyncio.current_task()
+        try:
+            self._nb_executed += 1
+            try:
+                result = await execute(force)
+            except Exception:
+                await self._drain(execute)
+                raise
+            except BaseException:
+                # the runner is cancelled: the pending pass will never run
+                self._cancel_pending()
+                raise
+            await self._drain(execute)
+            return result
+        finally:
+            self._runner_task = None
+
+    async def _drain(self, execute: Callable[[bool], Awaitable[Any]]):
+        """Execute the pending pass until there is no more"""
+        while self._pending is not None:
+            pending, force = self._pending, self._pending_force
+            self._pending = None
+            self._pending_force = False
+            self._nb_executed += 1
+            try:
+                pending.set_result(await execute(force))
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                pending.set_exception(ex)
+            except BaseException:
+                # the runner is cancelled during the pending pass
+                pending.cancel()
+                self._cancel_pending()
+                raise
+
+    def _cancel_pending(self):
+        """Cancel the pending pass. Its callers get a CancelledError instead of waiting forever"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+            self._pending_force = False
+
+    @property
+    def is_running(self) -> bool:
+        """True if a control pass is running"""
+        return self._runner_task is not None
+
+    @property
+    def nb_executed(self) -> int:
+        """The number of executed control passes"""
+        return self._nb_executed
+
+    @property
+    def nb_coalesced(self) -> int:
+        """The number of control requests merged into a pending one"""
+        return self._nb_coalesced
+
+
+def serialized_control(func):
+    """Decorator which serializes the calls of async_control_heating through the
+    ControlMailbox of the VTherm"""
+
+    @functools.wraps(func)
+    async def wrapper(self, force=False, _=None):
+        mailbox: ControlMailbox = getattr(self, "_control_mailbox", None)
+        if mailbox is None:
+            return await func(self, force, _)
+        return await mailbox.request(lambda merged_force: func(self, merged_force, _), force)
+
+    return wrapper
@@ -0,0 +1,132 @@
+# pylint: disable=line-too-long
+""" The trace of the control decisions of a VTherm.
+
+    Each control cycle records a compact decision in a fixed-size ring buffer: the inputs, the
+    output (the on_percent or the regulated temperature), the action sent to the underlyings and
+    the reasons (safety, window, power, auto-stop, ...). The buffer is made of preallocated arrays
+    so that recording a decision costs no allocation and no formatting. It is only decoded when
+    the diagnostics are downloaded.
+"""
+
+import math
+from array import array
+from datetime import datetime, timezone
+
+DEFAULT_DECISION_TRACE_SIZE = 100
+
+# The reasons of a decision. They are combined in a bit mask
+REASON_SAFETY = 1
+REASON_WINDOW = 2
+REASON_POWER = 4
+REASON_AUTO_STOP = 8
+REASON_OFF = 16
+REASON_NOT_INITIALIZED = 32
+REASON_NAMES = {
+    REASON_SAFETY: "safety",
+    REASON_WINDOW: "window",
+    REASON_POWER: "power",
+    REASON_AUTO_STOP: "auto_stop",
+    REASON_OFF: "off",
+    REASON_NOT_INITIALIZED: "not_initialized",
+}
+
+# The actions sent to the underlyings
+ACTION_NONE = 0
+ACTION_START_CYCLE = 1
+ACTION_TURN_OFF = 2
+ACTION_SET_TEMPERATURE = 3
+ACTION_NAMES = ["none", "start_cycle", "turn_off", "set_temperature"]
+
+# A None float is stored as a NaN
+NONE_VALUE = math.nan
+
+
+def _to_float(value: float | None) -> float:
+    """The stored value of an optional float"""
+    return NONE_VALUE if value is None else float(value)
+
+
+def _from_float(value: float) -> float | None:
+    """The optional float of a stored value"""
+    return None if math.isnan(value) else value
+
+
+class DecisionTrace:
+    """A fixed-size ring buffer of the control decisions of a VTherm"""
+
+    def __init__(self, size: int = DEFAULT_DECISION_TRACE_SIZE):
+        self._size = size
+        self._timestamps = array("d", [NONE_VALUE] * size)
+        self._temperatures = array("d", [NONE_VALUE] * size)
+        self._ext_temperatures = array("d", [NONE_VALUE] * size)
+        self._target_temperatures = array("d", [NONE_VALUE] * size)
+        self._outputs = array("d", [NONE_VALUE] * size)
+        self._reasons = array("B", [0] * size)
+        self._actions = array("B", [ACTION_NONE] * size)
+        self._hvac_modes: list[str | None] = [None] * size
+        # the index of the next record and the number of records
+        self._next: int = 0
+        self._count: int = 0
+
+    def record(
+        self,
+        timestamp: datetime,
+        hvac_mode: str | None,
+        temperature: float | None,
+        ext_temperature: float | None,
+        target_temperature: float | None,
+        output: float | None,
+        reasons: int = 0,
+        action: int = ACTION_NONE,
+    ):
+        """Record a decision. The oldest one is overwritten if the buffer is full"""
+        i = self._next
+        self._timestamps[i] = timestamp.timestamp()
+        self._hvac_modes[i] = hvac_mode
+        self._temperatures[i] = _to_float(temperature)
+        self._ext_temperatures[i] = _to_float(ext_temperature)
+        self._target_temperatures[i] = _to_float(target_temperature)
+        self._outputs[i] = _to_float(output)
+        self._reasons[i] = reasons
+        self._actions[i] = action
+        self._next = (i + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def amend_last(self, output: float | None = None, reasons: int = 0, action: int | None = None):
+        """Complete the last decision. Used when the output is known at the end of the cycle"""
+        if self._count == 0:
+            return
+        i = (self._next - 1) % self._size
+        if output is not None:
+            self._outputs[i] = output
+        self._reasons[i] |= reasons
+        if action is not None:
+            self._actions[i] = action
+
+    def to_list(self) -> list[dict]:
+        """The decoded decisions, oldest first"""
+        decisions = []
+        for n in range(self._count):
+            i = (self._next - self._count + n) % self._size
+            decisions.append(
+                {
+                    "timestamp": datetime.fromtimestamp(self._timestamps[i], tz=timezone.utc).isoformat(),
+                    "hvac_mode": self._hvac_modes[i],
+                    "temperature": _from_float(self._temperatures[i]),
+                    "ext_temperature": _from_float(self._ext_temperatures[i]),
+                    "target_temperature": _from_float(self._target_temperatures[i]),
+                    "output": _from_float(self._outputs[i]),
+                    "reasons": [name for flag, name in REASON_NAMES.items() if self._reasons[i] & flag],
+                    "action": ACTION_NAMES[self._actions[i]],
+                }
+            )
+        return decisions
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """The max number of decisions kept"""
+        return self._size
@@ -0,0 +1,45 @@
+# pylint: disable=line-too-long
+""" The diagnostics of Versatile Thermostat """
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+
+from .vtherm_api import VersatileThermostatAPI
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the diagnostics of a config entry"""
+    api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
+
+    vtherm = next((entity for entity in api.find_all_vtherms() if entity.unique_id == entry.entry_id), None)
+
+    return {
+        "entry": {
+            "title": entry.title,
+            "data": dict(entry.data),
+        },
+        "startup": {
+            "total_duration_sec": api.startup_total_duration,
+            "duration_sec": api.startup_durations.get(vtherm.entity_id) if vtherm else None,
+            "all_durations_sec": dict(sorted(api.startup_durations.items(), key=lambda item: item[1], reverse=True)),
+        },
+        "central_mode": {
+            "total_duration_sec": api.central_mode_total_duration,
+            "duration_sec": api.central_mode_durations.get(vtherm.entity_id) if vtherm else None,
+        },
+        "temperature_filter": (
+            {
+                "stages": vtherm.temperature_filter.stage_names,
+                "regulation_stage": vtherm.temperature_filter.regulation_stage,
+                "stats": vtherm.temperature_filter.stats,
+            }
+            if vtherm and vtherm.temperature_filter
+            else None
+        ),
+        "algorithm_cache": vtherm.algorithm_cache_stats if vtherm else None,
+        "timings": vtherm.timings.as_dict() if vtherm else None,
+        "central_timings": api.timings.as_dict(),
+        "decisions": vtherm.decision_trace.to_list() if vtherm else None,
+    }
@@ -5,6 +5,7 @@ and maybe some others feature"""
 import logging
 import math
 from datetime import datetime, tzinfo
+from typing import Any
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,6 +42,22 @@ class ExponentialMovingAverage:
     def __str__(self) -> str:
         return f"EMA-{self._name}"
 
+    @property
+    def state(self) -> dict[str, Any] | None:
+        """The current EMA and its timestamp"""
+        if self._current_ema is None:
+            return None
+        return {"ema": self._current_ema, "timestamp": self._last_timestamp.isoformat()}
+
+    def restore_state(self, state: dict[str, Any], now: datetime):
+        """Restore the EMA if it is recent enough (less than 2 halflifes before now)"""
+        timestamp = datetime.fromisoformat(state["timestamp"])
+        if not self._halflife or (now - timestamp).total_seconds() > 2 * self._halflife:
+            _LOGGER.debug("%s - the stored EMA of %s is too old. It is not restored", self, timestamp)
+            return
+        self._current_ema = state["ema"]
+        self._last_timestamp = timestamp
+
     def calculate_ema(self, measurement: float, timestamp: datetime) -> float | None:
         """Calculate the new EMA from a new measurement measured at timestamp
         Return the EMA or None if all parameters are not initialized now
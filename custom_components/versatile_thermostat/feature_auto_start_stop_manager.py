@@ -212,6 +212,18 @@ class FeatureAutoStartStopManager(BaseFeatureManager):
                 }
             )
 
+    @property
+    def learned_state(self) -> dict[str, Any] | None:
+        """The state to persist between restarts"""
+        if not self._is_configured or not self._auto_start_stop_algo:
+            return None
+        return {"accumulated_error": self._auto_start_stop_algo.accumulated_error}
+
+    def restore_learned_state(self, state: dict[str, Any]):
+        """Restore the persisted state"""
+        if self._auto_start_stop_algo and state.get("accumulated_error") is not None:
+            self._auto_start_stop_algo.set_accumulated_error(state["accumulated_error"])
+
     @overrides
     @property
     def is_configured(self) -> bool:
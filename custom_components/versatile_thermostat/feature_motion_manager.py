@@ -18,7 +18,6 @@ from homeassistant.core import (
     Event,
 )
 from homeassistant.helpers.event import (
-    async_track_state_change_event,
     EventStateChangedData,
     async_call_later,
 )
@@ -34,6 +33,8 @@ from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData
 
 from .base_manager import BaseFeatureManager
+from .vtherm_api import VersatileThermostatAPI
+from .sensor_hub import SensorReading, READING_STATE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -85,15 +86,23 @@ class FeatureMotionManager(BaseFeatureManager):
             self._is_configured = True
             self._motion_state = STATE_UNKNOWN
 
+    @overrides
+    def update_config(self, entry_infos: ConfigData):
+        """Apply a new configuration in place. The motion state is kept if the sensor is the same"""
+        motion_sensor_entity_id, motion_state = self._motion_sensor_entity_id, self._motion_state
+        self.post_init(entry_infos)
+        if self._is_configured and self._motion_sensor_entity_id == motion_sensor_entity_id:
+            self._motion_state = motion_state
+
     @overrides
     async def start_listening(self):
         """Start listening the underlying entity"""
         if self._is_configured:
             self.stop_listening()
             self.add_listener(
-                async_track_state_change_event(
-                    self.hass,
-                    [self._motion_sensor_entity_id],
+                VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_hub.subscribe(
+                    self._motion_sensor_entity_id,
+                    READING_STATE,
                     self._motion_sensor_changed,
                 )
             )
@@ -133,19 +142,21 @@ class FeatureMotionManager(BaseFeatureManager):
         return ret
 
     @callback
-    async def _motion_sensor_changed(self, event: Event[EventStateChangedData]):
-        """Handle motion sensor changes."""
-        new_state = event.data.get("new_state")
+    async def _motion_sensor_changed(self, event: Event[EventStateChangedData], reading: SensorReading | None = None):
+        """Handle motion sensor changes. reading is the state parsed by the sensor hub"""
+        if reading is None:
+            reading = SensorReading.from_event(event, READING_STATE)
         _LOGGER.info(
-            "%s - Motion changed. Event.new_state is %s, _attr_preset_mode=%s, activity=%s",
+            "%s - Motion changed. New state is %s, _attr_preset_mode=%s, activity=%s",
             self,
-            new_state,
+            reading.new_state,
             self._vtherm.preset_mode,
             PRESET_ACTIVITY,
         )
 
-        if new_state is None or new_state.state not in (STATE_OFF, STATE_ON):
+        if not reading.is_available or reading.value not in (STATE_OFF, STATE_ON):
             return
+        new_value: str = reading.value
 
         # Check delay condition
         async def try_motion_condition(_):
@@ -154,13 +165,13 @@ class FeatureMotionManager(BaseFeatureManager):
             try:
                 delay = (
                     self._motion_delay_sec
-                    if new_state.state == STATE_ON
+                    if new_value == STATE_ON
                     else self._motion_off_delay_sec
                 )
                 long_enough = condition.state(
                     self.hass,
                     self._motion_sensor_entity_id,
-                    new_state.state,
+                    new_value,
                     timedelta(seconds=delay),
                 )
             except ConditionError:
@@ -173,14 +184,14 @@ class FeatureMotionManager(BaseFeatureManager):
                 # Get sensor current state
                 motion_state = self.hass.states.get(self._motion_sensor_entity_id)
                 _LOGGER.debug(
-                    "%s - motion_state=%s, new_state.state=%s",
+                    "%s - motion_state=%s, new_value=%s",
                     self,
                     motion_state.state,
-                    new_state.state,
+                    new_value,
                 )
                 if (
-                    motion_state.state == new_state.state
-                    and new_state.state == STATE_ON
+                    motion_state.state == new_value
+                    and new_value == STATE_ON
                 ):
                     _LOGGER.debug(
                         "%s - the motion sensor is finally 'on' after the delay", self
@@ -191,21 +202,21 @@ class FeatureMotionManager(BaseFeatureManager):
 
             if long_enough:
                 _LOGGER.debug("%s - Motion delay condition is satisfied", self)
-                await self.update_motion_state(new_state.state)
+                await self.update_motion_state(new_value)
             else:
                 await self.update_motion_state(
-                    STATE_ON if new_state.state == STATE_OFF else STATE_OFF
+                    STATE_ON if new_value == STATE_OFF else STATE_OFF
                 )
 
         im_on = self._motion_state == STATE_ON
         delay_running = self._motion_call_cancel is not None
-        event_on = new_state.state == STATE_ON
+        event_on = new_value == STATE_ON
 
         def arm():
             """Arm the timer"""
             delay = (
                 self._motion_delay_sec
-                if new_state.state == STATE_ON
+                if new_value == STATE_ON
                 else self._motion_off_delay_sec
             )
             self._motion_call_cancel = async_call_later(
@@ -0,0 +1,205 @@
+""" Implements the Optimal Start Feature Manager """
+
+# pylint: disable=line-too-long
+
+import logging
+from typing import Any
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, CALLBACK_TYPE
+from homeassistant.helpers.event import async_track_time_interval
+
+from homeassistant.components.climate import HVACMode
+
+from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
+from .commons import ConfigData
+
+from .base_manager import BaseFeatureManager
+from .vtherm_api import VersatileThermostatAPI
+from .thermal_model import ThermalModelEstimator, DEFAULT_FORGETTING_FACTOR
+
+_LOGGER = logging.getLogger(__name__)
+
+# The period of the check of a scheduled preset
+OPTIMAL_START_CHECK_PERIOD = timedelta(minutes=1)
+
+
+class FeatureOptimalStartManager(BaseFeatureManager):
+    """The implementation of the Optimal Start feature.
+    The thermal model of the room is learned from the temperature measurements and the
+    heating power. When a preset is scheduled, the preset is set as late as possible to reach
+    its temperature at the scheduled time"""
+
+    unrecorded_attributes = frozenset(
+        {
+            "thermal_model_observations",
+        }
+    )
+
+    def __init__(self, vtherm: Any, hass: HomeAssistant):
+        """Init of a featureManager"""
+        super().__init__(vtherm, hass)
+        self._thermal_model: ThermalModelEstimator = ThermalModelEstimator(self.name)
+        self._max_lead_min: float = DEFAULT_OPTIMAL_START_MAX_LEAD_MIN
+        self._scheduled_preset: str | None = None
+        self._scheduled_datetime: datetime | None = None
+        self._last_lead_sec: float | None = None
+        self._check_cancel: CALLBACK_TYPE | None = None
+
+    @overrides
+    def post_init(self, entry_infos: ConfigData):
+        """Reinit of the manager"""
+        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
+        forgetting_factor = DEFAULT_FORGETTING_FACTOR
+        if api is not None:
+            self._max_lead_min = api.optimal_start_max_lead_min
+            forgetting_factor = api.thermal_model_forgetting_factor or DEFAULT_FORGETTING_FACTOR
+
+        # keep the learned model when the configuration is updated in place
+        if self._thermal_model.nb_observations == 0:
+            self._thermal_model = ThermalModelEstimator(self.name, forgetting_factor)
+
+    @overrides
+    async def start_listening(self):
+        """Start listening the underlying entity. Nothing to listen: the measurements are given by the VTherm.
+        The periodic check of a scheduled preset is armed again (after an in place update for example)"""
+        if self._scheduled_preset and not self._check_cancel:
+            self._arm_check()
+
+    @overrides
+    def stop_listening(self):
+        """Stop the check of the scheduled preset"""
+        self._cancel_check()
+        super().stop_listening()
+
+    @overrides
+    async def refresh_state(self) -> bool:
+        """Check if the scheduled preset should be set now. Returns True if it has been set"""
+        return await self._check_optimal_start()
+
+    def add_temperature_measurement(self):
+        """Give the last temperature measurement of the VTherm to the thermal model.
+        The model only learns in heating or off. An open window disturbs the measurements"""
+        if self._vtherm.hvac_mode not in (HVACMode.HEAT, HVACMode.OFF) or self._vtherm.window_manager.is_window_detected:
+            self._thermal_model.reset_observation()
+            return
+
+        if self._vtherm.hvac_mode == HVACMode.OFF:
+            power = 0
+        elif self._vtherm.on_percent is not None:
+            power = self._vtherm.on_percent
+        else:
+            # over_climate without valve regulation: the device is on or off
+            power = 1 if self._vtherm.is_device_active else 0
+
+        self._thermal_model.add_measurement(
+            self._vtherm.ema_temperature,
+            self._vtherm.current_outdoor_temperature,
+            power,
+            self._vtherm.last_temperature_measure,
+        )
+
+    async def schedule_preset(self, preset: str, start_datetime: datetime):
+        """Schedule a preset which should be reached at start_datetime"""
+        if preset not in (self._vtherm.preset_modes or []):
+            _LOGGER.warning("%s - the preset %s is not available. The optimal start is ignored", self, preset)
+            return
+
+        _LOGGER.info("%s - the preset %s is scheduled at %s", self, preset, start_datetime)
+        self._scheduled_preset = preset
+        self._scheduled_datetime = start_datetime
+        self._last_lead_sec = None
+
+        self._cancel_check()
+        self._arm_check()
+        await self._check_optimal_start()
+
+    def cancel_scheduled_preset(self):
+        """Cancel the scheduled preset"""
+        self._scheduled_preset = None
+        self._scheduled_datetime = None
+        self._cancel_check()
+
+    def _arm_check(self):
+        """Arm the periodic check of the scheduled preset"""
+        self._check_cancel = async_track_time_interval(self._hass, self._check_optimal_start, OPTIMAL_START_CHECK_PERIOD)
+
+    def _cancel_check(self):
+        """Cancel the periodic check"""
+        if self._check_cancel:
+            self._check_cancel()
+            self._check_cancel = None
+
+    def calculate_lead_sec(self) -> float:
+        """The time in seconds needed to reach the temperature of the scheduled preset at full power.
+        0 if the model is not ready or if the VTherm is not heating. Capped to the max lead"""
+        if not self._scheduled_preset or self._vtherm.hvac_mode != HVACMode.HEAT:
+            return 0
+
+        max_power = self._vtherm.proportional_algorithm.max_on_percent if self._vtherm.proportional_algorithm else None
+        lead_sec = self._thermal_model.time_to_reach(
+            self._vtherm.ema_temperature,
+            self._vtherm.find_preset_temp(self._scheduled_preset),
+            self._vtherm.current_outdoor_temperature,
+            max_power or 1.0,
+        )
+        max_lead_sec = self._max_lead_min * 60
+        if lead_sec is None:
+            # The model is not ready or the target is not reachable
+            return max_lead_sec if self._thermal_model.is_ready else 0
+        return min(lead_sec, max_lead_sec)
+
+    async def _check_optimal_start(self, _=None) -> bool:
+        """Set the scheduled preset if it is time to heat"""
+        if not self._scheduled_preset:
+            return False
+
+        now = self._vtherm.now
+        self._last_lead_sec = self.calculate_lead_sec()
+        if now < self._scheduled_datetime - timedelta(seconds=self._last_lead_sec):
+            return False
+
+        preset = self._scheduled_preset
+        _LOGGER.info(
+            "%s - optimal start of the preset %s scheduled at %s (lead of %.0f min)",
+            self,
+            preset,
+            self._scheduled_datetime,
+            self._last_lead_sec / 60,
+        )
+        self.cancel_scheduled_preset()
+        await self._vtherm.async_set_preset_mode(preset)
+        await self._vtherm.async_control_heating(force=True)
+        return True
+
+    def add_custom_attributes(self, extra_state_attributes: dict[str, Any]):
+        """Add some custom attributes"""
+        extra_state_attributes.update(
+            {
+                "optimal_start_preset": self._scheduled_preset,
+                "optimal_start_datetime": self._scheduled_datetime.isoformat() if self._scheduled_datetime else None,
+                "optimal_start_lead_min": round(self._last_lead_sec / 60, 1) if self._last_lead_sec is not None else None,
+                "thermal_time_constant_hours": self._thermal_model.time_constant_hours,
+                "thermal_heating_gain": self._thermal_model.heating_gain,
+                "thermal_model_observations": self._thermal_model.nb_observations,
+            }
+        )
+
+    @overrides
+    @property
+    def is_configured(self) -> bool:
+        """The thermal model is always learned"""
+        return True
+
+    @property
+    def thermal_model(self) -> ThermalModelEstimator:
+        """The learned thermal model of the room"""
+        return self._thermal_model
+
+    @property
+    def scheduled_preset(self) -> str | None:
+        """The preset waiting for its optimal start"""
+        return self._scheduled_preset
+
+    def __str__(self):
+        return f"OptimalStartManager-{self.name}"
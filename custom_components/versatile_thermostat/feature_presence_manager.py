@@ -19,7 +19,6 @@ from homeassistant.core import (
     Event,
 )
 from homeassistant.helpers.event import (
-    async_track_state_change_event,
     EventStateChangedData,
 )
 
@@ -29,6 +28,8 @@ from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData
 
 from .base_manager import BaseFeatureManager
+from .vtherm_api import VersatileThermostatAPI
+from .sensor_hub import SensorReading, READING_STATE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,9 +68,9 @@ class FeaturePresenceManager(BaseFeatureManager):
         if self._is_configured:
             self.stop_listening()
             self.add_listener(
-                async_track_state_change_event(
-                    self.hass,
-                    [self._presence_sensor_entity_id],
+                VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_hub.subscribe(
+                    self._presence_sensor_entity_id,
+                    READING_STATE,
                     self._presence_sensor_changed,
                 )
             )
@@ -95,20 +96,21 @@ class FeaturePresenceManager(BaseFeatureManager):
         return ret
 
     @callback
-    async def _presence_sensor_changed(self, event: Event[EventStateChangedData]):
-        """Handle presence changes."""
-        new_state = event.data.get("new_state")
+    async def _presence_sensor_changed(self, event: Event[EventStateChangedData], reading: SensorReading | None = None):
+        """Handle presence changes. reading is the state parsed by the sensor hub"""
+        if reading is None:
+            reading = SensorReading.from_event(event, READING_STATE)
         _LOGGER.info(
-            "%s - Presence changed. Event.new_state is %s, _attr_preset_mode=%s, activity=%s",
+            "%s - Presence changed. New state is %s, _attr_preset_mode=%s, activity=%s",
             self,
-            new_state,
+            reading.new_state,
             self._vtherm.preset_mode,
             PRESET_ACTIVITY,
         )
-        if new_state is None:
+        if reading.new_state is None:
             return
 
-        if await self.update_presence(new_state.state):
+        if await self.update_presence(reading.value if reading.is_available else STATE_UNKNOWN):
             await self._vtherm.async_control_heating(force=True)
 
     async def update_presence(self, new_state: str) -> bool:
@@ -4,6 +4,7 @@
 
 import logging
 from typing import Any
+from datetime import datetime, timedelta
 
 from homeassistant.const import (
     STATE_ON,
@@ -25,7 +26,11 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class FeatureSafetyManager(BaseFeatureManager):
-    """The implementation of the Safety feature"""
+    """The implementation of the Safety feature.
+    The instant at which the temperature (or the outdoor temperature) is too old is calculated
+    at each new measurement. Before this deadline the safety cannot start, so the check is a simple
+    comparison. The measurements are reported to the central sensor watchdog which notifies
+    the VTherm when a sensor is stale"""
 
     unrecorded_attributes = frozenset(
         {
@@ -45,6 +50,11 @@ class FeatureSafetyManager(BaseFeatureManager):
         self._safety_min_on_percent = None
         self._safety_default_on_percent = None
         self._safety_state = STATE_UNAVAILABLE
+        self._is_outdoor_checked: bool = True
+        self._deadline: datetime | None = None
+        self._deadline_key: tuple | None = None
+        # the measurement time set by the last reset of the VTherm. It is not a sensor time
+        self._reset_measure: datetime | None = None
 
     @overrides
     def post_init(self, entry_infos: ConfigData):
@@ -69,6 +79,18 @@ class FeatureSafetyManager(BaseFeatureManager):
             self._safety_state = STATE_UNKNOWN
             self._is_configured = True
 
+        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
+        self._is_outdoor_checked = not api or not api.safety_mode or api.safety_mode.get("check_outdoor_sensor") is not False
+        self._deadline_key = None
+
+    @overrides
+    def update_config(self, entry_infos: ConfigData):
+        """Apply a new configuration in place. The safety state is kept"""
+        safety_state = self._safety_state
+        self.post_init(entry_infos)
+        if self._is_configured and safety_state != STATE_UNAVAILABLE:
+            self._safety_state = safety_state
+
     @overrides
     async def start_listening(self):
         """Start listening the underlying entity"""
@@ -76,6 +98,48 @@ class FeatureSafetyManager(BaseFeatureManager):
     @overrides
     def stop_listening(self):
         """Stop listening and remove the eventual timer still running"""
+        self._deadline_key = None
+
+    def update_deadline(self, is_sensor_measure: bool = True):
+        """Calculate the instant at which the last measurements will be too old and report them to
+        the sensor watchdog. Should be called at each new measurement. Nothing is done if the measurements have not changed.
+        is_sensor_measure is False when the measurement times are reset by the VTherm: they are not reported to the watchdog"""
+        if not self._is_configured:
+            return
+
+        last_temperature_measure = self._vtherm.last_temperature_measure
+        last_ext_temperature_measure = self._vtherm.last_ext_temperature_measure
+        key = (last_temperature_measure, last_ext_temperature_measure, self._safety_delay_min)
+        if key == self._deadline_key:
+            return
+        self._deadline_key = key
+
+        if last_temperature_measure is None or last_ext_temperature_measure is None or self._safety_delay_min is None:
+            self._deadline = None
+            return
+
+        current_tz = dt_util.get_time_zone(self._hass.config.time_zone)
+        last_measure = last_temperature_measure.replace(tzinfo=current_tz)
+        last_ext_measure = last_ext_temperature_measure.replace(tzinfo=current_tz)
+        self._deadline = (min(last_measure, last_ext_measure) if self._is_outdoor_checked else last_measure) + timedelta(minutes=self._safety_delay_min)
+        if not is_sensor_measure:
+            self._reset_measure = last_temperature_measure
+            return
+
+        # only the measurements received from the sensors are reported. A sensor not updated since the reset is skipped
+        watchdog = VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_watchdog
+        if last_temperature_measure != self._reset_measure:
+            watchdog.report_measurement(self._vtherm, self._vtherm.temperature_sensor_entity_id, last_measure, self._safety_delay_min)
+        if self._is_outdoor_checked and last_ext_temperature_measure != self._reset_measure:
+            watchdog.report_measurement(self._vtherm, self._vtherm.ext_temperature_sensor_entity_id, last_ext_measure, self._safety_delay_min)
+
+    async def async_on_stale_sensor(self):
+        """Called by the sensor watchdog when a sensor of the VTherm is not updated anymore.
+        Do a control to check the safety"""
+        _LOGGER.debug("%s - the safety deadline %s is reached", self, self._deadline)
+        # A VTherm over_climate is never in safety (issue 99)
+        if self._is_configured and not self._vtherm.is_over_climate:
+            await self._vtherm.async_control_heating()
 
     @overrides
     async def refresh_state(self) -> bool:
@@ -86,7 +150,15 @@ class FeatureSafetyManager(BaseFeatureManager):
             _LOGGER.debug("%s - safety is disabled (or not configured)", self)
             return False
 
+        self.update_deadline()
         now = self._vtherm.now
+
+        # Before the deadline the measurements are recent enough: the safety cannot start
+        if self._safety_state != STATE_ON and self._deadline is not None and now <= self._deadline:
+            if self._safety_state == STATE_UNKNOWN:
+                self._safety_state = STATE_OFF
+            return False
+
         current_tz = dt_util.get_time_zone(self._hass.config.time_zone)
 
         is_safety_detected = self.is_safety_detected
@@ -100,14 +172,8 @@ class FeatureSafetyManager(BaseFeatureManager):
 
         mode_cond = self._vtherm.hvac_mode != HVACMode.OFF
 
-        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api()
-        is_outdoor_checked = (
-            not api.safety_mode
-            or api.safety_mode.get("check_outdoor_sensor") is not False
-        )
-
         temp_cond: bool = delta_temp > self._safety_delay_min or (
-            is_outdoor_checked and delta_ext_temp > self._safety_delay_min
+            self._is_outdoor_checked and delta_ext_temp > self._safety_delay_min
         )
         climate_cond: bool = (
             self._vtherm.is_over_climate
@@ -303,6 +369,11 @@ class FeatureSafetyManager(BaseFeatureManager):
         """Returns the safety state: STATE_ON, STATE_OFF, STATE_UNKWNON, STATE_UNAVAILABLE"""
         return self._safety_state
 
+    @property
+    def deadline(self) -> datetime | None:
+        """Returns the instant at which the last measurements will be too old"""
+        return self._deadline
+
     @property
     def safety_delay_min(self) -> bool:
         """Returns the safety delay min"""
@@ -4,7 +4,7 @@
 
 import logging
 from typing import Any
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from homeassistant.const import (
     STATE_ON,
@@ -18,7 +18,6 @@ from homeassistant.core import (
     Event,
 )
 from homeassistant.helpers.event import (
-    async_track_state_change_event,
     EventStateChangedData,
     async_call_later,
 )
@@ -32,7 +31,9 @@ from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from .commons import ConfigData
 
 from .base_manager import BaseFeatureManager
-from .open_window_algorithm import WindowOpenDetectionAlgorithm
+from .vtherm_api import VersatileThermostatAPI
+from .sensor_hub import SensorReading, READING_STATE
+from .temperature_slope import TemperatureSlopeEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,7 +65,6 @@ class FeatureWindowManager(BaseFeatureManager):
         self._window_auto_close_threshold: float = 0
         self._window_auto_max_duration: int = 0
         self._window_auto_state: bool = False
-        self._window_auto_algo: WindowOpenDetectionAlgorithm = None
         self._is_window_bypass: bool = False
         self._window_action: str = None
         self._window_delay_sec: int | None = 0
@@ -72,6 +72,8 @@ class FeatureWindowManager(BaseFeatureManager):
         self._is_configured: bool = False
         self._is_window_auto_configured: bool = False
         self._window_call_cancel: callable = None
+        # the end of the max duration of an auto detected open window
+        self._window_auto_end: datetime | None = None
 
     @overrides
     def post_init(self, entry_infos: ConfigData):
@@ -80,6 +82,9 @@ class FeatureWindowManager(BaseFeatureManager):
 
         self._window_auto_state = STATE_UNAVAILABLE
         self._window_state = STATE_UNAVAILABLE
+        self._window_auto_end = None
+        self._is_configured = False
+        self._is_window_auto_configured = False
 
         self._window_sensor_entity_id = entry_infos.get(CONF_WINDOW_SENSOR)
         self._window_delay_sec = entry_infos.get(CONF_WINDOW_DELAY)
@@ -113,11 +118,6 @@ class FeatureWindowManager(BaseFeatureManager):
             self._is_window_auto_configured = True
             self._window_auto_state = STATE_UNKNOWN
 
-        self._window_auto_algo = WindowOpenDetectionAlgorithm(
-            alert_threshold=self._window_auto_open_threshold,
-            end_alert_threshold=self._window_auto_close_threshold,
-        )
-
         if self._is_window_auto_configured or (
             use_window_feature
             and self._window_sensor_entity_id is not None
@@ -127,6 +127,20 @@ class FeatureWindowManager(BaseFeatureManager):
             self._is_configured = True
             self._window_state = STATE_UNKNOWN
 
+    @overrides
+    def update_config(self, entry_infos: ConfigData):
+        """Apply a new configuration in place. The window states are kept if the kind of detection is the same"""
+        window_sensor_entity_id, is_window_auto_configured = self._window_sensor_entity_id, self._is_window_auto_configured
+        window_state, window_auto_state, window_auto_end = self._window_state, self._window_auto_state, self._window_auto_end
+        self.post_init(entry_infos)
+        if (
+            self._is_configured
+            and window_state != STATE_UNAVAILABLE
+            and self._window_sensor_entity_id == window_sensor_entity_id
+            and self._is_window_auto_configured == is_window_auto_configured
+        ):
+            self._window_state, self._window_auto_state, self._window_auto_end = window_state, window_auto_state, window_auto_end
+
     @overrides
     async def start_listening(self):
         """Start listening the underlying entity"""
@@ -134,12 +148,16 @@ class FeatureWindowManager(BaseFeatureManager):
             self.stop_listening()
             if self._window_sensor_entity_id:
                 self.add_listener(
-                    async_track_state_change_event(
-                        self.hass,
-                        [self._window_sensor_entity_id],
+                    VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_hub.subscribe(
+                        self._window_sensor_entity_id,
+                        READING_STATE,
                         self._window_sensor_changed,
                     )
                 )
+            # an auto detected open window is still ended after its max duration (after an in place update for example)
+            if self._window_auto_state == STATE_ON and self._window_auto_end is not None:
+                delay_sec = max(0.0, (self._window_auto_end - self._vtherm.now).total_seconds())
+                self._window_call_cancel = async_call_later(self.hass, timedelta(seconds=delay_sec), self._async_window_auto_max_duration_reached)
 
     @overrides
     def stop_listening(self):
@@ -176,14 +194,16 @@ class FeatureWindowManager(BaseFeatureManager):
         return ret
 
     @callback
-    async def _window_sensor_changed(self, event: Event[EventStateChangedData]):
-        """Handle window sensor changes."""
-        new_state = event.data.get("new_state")
-        old_state = event.data.get("old_state")
+    async def _window_sensor_changed(self, event: Event[EventStateChangedData], reading: SensorReading | None = None):
+        """Handle window sensor changes. reading is the state parsed by the sensor hub"""
+        if reading is None:
+            reading = SensorReading.from_event(event, READING_STATE)
+        new_value: str | None = reading.value
+        old_value: str | None = reading.old_state.state if reading.old_state else None
         _LOGGER.info(
-            "%s - Window changed. Event.new_state is %s, _hvac_mode=%s, _saved_hvac_mode=%s",
+            "%s - Window changed. New state is %s, _hvac_mode=%s, _saved_hvac_mode=%s",
             self,
-            new_state,
+            reading.new_state,
             self._vtherm.hvac_mode,
             self._vtherm.saved_hvac_mode,
         )
@@ -194,7 +214,7 @@ class FeatureWindowManager(BaseFeatureManager):
                 long_enough = condition.state(
                     self._hass,
                     self._window_sensor_entity_id,
-                    new_state.state,
+                    new_value,
                     timedelta(seconds=delay),
                 )
             except ConditionError:
@@ -204,12 +224,12 @@ class FeatureWindowManager(BaseFeatureManager):
                 _LOGGER.debug(
                     "Window delay condition is not satisfied. Ignore window event"
                 )
-                self._window_state = old_state.state or STATE_OFF
+                self._window_state = old_value or STATE_OFF
                 return
 
             _LOGGER.debug("%s - Window delay condition is satisfied", self)
 
-            if self._window_state == new_state.state:
+            if self._window_state == new_value:
                 _LOGGER.debug("%s - no change in window state. Forget the event")
                 return
 
@@ -219,14 +239,14 @@ class FeatureWindowManager(BaseFeatureManager):
                     "%s - Window ByPass is activated. Ignore window event", self
                 )
                 # We change tne state but we don't apply the change
-                self._window_state = new_state.state
+                self._window_state = new_value
             else:
-                await self.update_window_state(new_state.state)
+                await self.update_window_state(new_value)
 
             self._vtherm.update_custom_attributes()
 
-        delay = self._window_delay_sec if new_state.state == STATE_ON else self._window_off_delay_sec
-        if new_state is None or old_state is None or new_state.state == old_state.state:
+        delay = self._window_delay_sec if new_value == STATE_ON else self._window_off_delay_sec
+        if not reading.is_available or old_value is None or new_value == old_value:
             return try_window_condition
 
         self.dearm_window_timer()
@@ -326,8 +346,9 @@ class FeatureWindowManager(BaseFeatureManager):
         self._window_state = new_state
         return True
 
-    async def manage_window_auto(self, in_cycle=False) -> callable:
-        """The management of the window auto feature
+    async def manage_window_auto(self) -> callable:
+        """The management of the window auto feature. The temperature slope
+        estimator of the VTherm should have been updated before
         Returns the dearm function used to deactivate the window auto"""
 
         async def dearm_window_auto(_):
@@ -337,35 +358,12 @@ class FeatureWindowManager(BaseFeatureManager):
 
         async def deactivate_window_auto(auto=False):
             """Deactivation of the Window auto state"""
-            _LOGGER.warning(
-                "%s - End auto detection of open window slope=%.3f", self, slope
-            )
-            # Send an event
-            cause = "max duration expiration" if auto else "end of slope alert"
-            self._vtherm.send_event(
-                EventType.WINDOW_AUTO_EVENT,
-                {"type": "end", "cause": cause, "curve_slope": slope},
-            )
-            # Set attributes
-            self._window_auto_state = STATE_OFF
-            await self.update_window_state(self._window_auto_state)
-            # await self.restore_hvac_mode(True)
-
-            self.dearm_window_timer()
+            await self._async_deactivate_window_auto("max duration expiration" if auto else "end of slope alert", slope)
 
-        if not self._window_auto_algo:
+        if not self.temperature_slope_estimator:
             return None
 
-        if in_cycle:
-            slope = self._window_auto_algo.check_age_last_measurement(
-                temperature=self._vtherm.ema_temperature,
-                datetime_now=self._vtherm.now,
-            )
-        else:
-            slope = self._window_auto_algo.add_temp_measurement(
-                temperature=self._vtherm.ema_temperature,
-                datetime_measure=self._vtherm.last_temperature_measure,
-            )
+        slope = self.temperature_slope_estimator.short_slope
 
         _LOGGER.debug(
             "%s - Window auto is on, check the alert. last slope is %.3f",
@@ -381,7 +379,7 @@ class FeatureWindowManager(BaseFeatureManager):
             return None
 
         if (
-            self._window_auto_algo.is_window_open_detected()
+            self.is_window_auto_open_detected()
             and self._window_auto_state in [STATE_UNKNOWN, STATE_OFF]
             and self._vtherm.hvac_mode != HVACMode.OFF
         ):
@@ -411,6 +409,7 @@ class FeatureWindowManager(BaseFeatureManager):
 
             # Arm the end trigger
             self.dearm_window_timer()
+            self._window_auto_end = self._vtherm.now + timedelta(minutes=self._window_auto_max_duration)
             self._window_call_cancel = async_call_later(
                 self.hass,
                 timedelta(minutes=self._window_auto_max_duration),
@@ -418,7 +417,7 @@ class FeatureWindowManager(BaseFeatureManager):
             )
 
         elif (
-            self._window_auto_algo.is_window_close_detected()
+            self.is_window_auto_close_detected()
             and self._window_auto_state == STATE_ON
         ):
             await deactivate_window_auto(False)
@@ -426,6 +425,31 @@ class FeatureWindowManager(BaseFeatureManager):
         # For testing purpose we need to return the inner function
         return dearm_window_auto
 
+    async def _async_deactivate_window_auto(self, cause: str, slope: float | None):
+        """Deactivation of the Window auto state"""
+        _LOGGER.warning(
+            "%s - End auto detection of open window slope=%.3f", self, slope if slope is not None else 0.0
+        )
+        # Send an event
+        self._vtherm.send_event(
+            EventType.WINDOW_AUTO_EVENT,
+            {"type": "end", "cause": cause, "curve_slope": slope},
+        )
+        # Set attributes
+        self._window_auto_state = STATE_OFF
+        self._window_auto_end = None
+        await self.update_window_state(self._window_auto_state)
+        # await self.restore_hvac_mode(True)
+
+        self.dearm_window_timer()
+
+    async def _async_window_auto_max_duration_reached(self, _=None):
+        """The max duration of an auto detected open window is reached after its timer have been armed again"""
+        _LOGGER.info("Unset window auto because MAX_DURATION is exceeded")
+        self._window_call_cancel = None
+        slope = self.temperature_slope_estimator.short_slope if self.temperature_slope_estimator else None
+        await self._async_deactivate_window_auto("max duration expiration", slope)
+
     def add_custom_attributes(self, extra_state_attributes: dict[str, Any]):
         """Add some custom attributes"""
         extra_state_attributes.update(
@@ -544,12 +568,29 @@ class FeatureWindowManager(BaseFeatureManager):
         """Return the window_auto_max_duration"""
         return self._window_auto_max_duration
 
+    @property
+    def temperature_slope_estimator(self) -> TemperatureSlopeEstimator | None:
+        """The shared temperature slope estimator of the VTherm"""
+        return self._vtherm.temperature_slope_estimator
+
+    def is_window_auto_open_detected(self) -> bool:
+        """True if the temperature slope is under (because negative value) the open threshold"""
+        if not self.temperature_slope_estimator or self._window_auto_open_threshold is None:
+            return False
+        return self.temperature_slope_estimator.is_slope_under(-self._window_auto_open_threshold)
+
+    def is_window_auto_close_detected(self) -> bool:
+        """True if the temperature slope is above (cause negative) the close threshold"""
+        if not self.temperature_slope_estimator:
+            return False
+        return self.temperature_slope_estimator.is_slope_over(self._window_auto_close_threshold)
+
     @property
     def last_slope(self) -> float:
         """Return the last slope (in °C/hour)"""
-        if not self._window_auto_algo:
+        if not self.temperature_slope_estimator:
             return None
-        return self._window_auto_algo.last_slope
+        return self.temperature_slope_estimator.short_slope
 
     def __str__(self):
         return f"WindowManager-{self.name}"
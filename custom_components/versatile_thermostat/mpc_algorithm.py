@@ -0,0 +1,208 @@
+# pylint: disable=line-too-long
+""" The model predictive regulation of an over_climate VTherm.
+
+    The room temperature is predicted over a short horizon with the learned first order
+    model of the room (see thermal_model.py) and the outdoor temperature. The underlying
+    climate is modelled as a proportional controller: its heating power is
+        u = (setpoint - T - offset) / PROPORTIONAL_BAND   capped between 0 and 1
+    where offset is the bias of the underlying (its own sensor is often near the radiator).
+
+    The offset is learned from the difference between the predicted and the measured temperature
+    at the next control tick. It also absorbs the other disturbances (sun, occupants) and
+    removes the static error like the integral of a PI.
+
+    Each regulation period a tiny bounded search chooses two setpoints: one for the next
+    period and one for the rest of the horizon. The cost is the squared error to the target,
+    a penalty on the overshoot and a penalty on each setpoint change. Only the first
+    setpoint is sent. The search is at most MAX_NB_CANDIDATES² candidates
+    with a few Euler steps each, so it is cheap enough to run for many VTherms.
+
+    While the model is not learned (or in cooling) the fallback PI regulator is used.
+"""
+
+import logging
+from typing import Any
+
+from .prop_algorithm import quantize, DEFAULT_TARGET_TEMP_STEP, DEFAULT_SENSOR_PRECISION
+from .pi_algorithm import PITemperatureRegulator
+
+_LOGGER = logging.getLogger(__name__)
+
+PROPORTIONAL_BAND = 1.0  # the setpoint offset (°) at which the underlying heats at full power
+SEARCH_STEP = 0.5  # the default step of the candidate setpoints
+MAX_NB_CANDIDATES = 17  # the search is limited to 17 x 17 candidates
+HORIZON_PERIODS = 3  # the prediction horizon as a number of regulation periods
+NB_SUBSTEPS = 5  # the number of Euler steps per regulation period
+
+OVERSHOOT_WEIGHT = 4.0  # an error above the target costs 5 times an error below
+CHANGE_PENALTY = 0.02  # the cost of a setpoint change in °².hour
+OFFSET_GAIN = 0.5  # the part of the prediction error used to correct the offset each tick
+
+
+class MpcTemperatureRegulator:
+    """A model predictive regulator. It has the same interface than the PITemperatureRegulator:
+    - call calculate_regulated_temperature with the internal and external temperature
+    - call set_target_temp when the target temperature change.
+
+    optimal_start_manager gives the learned thermal model of the VTherm
+    """
+
+    def __init__(
+        self,
+        target_temp: float,
+        optimal_start_manager: Any,
+        period_min: float,
+        offset_max: float,
+        fallback: PITemperatureRegulator,
+        step: float = SEARCH_STEP,
+    ):
+        self.target_temp: float = target_temp
+        self.offset_max: float = offset_max
+        self.is_cooling: bool = False
+        self._optimal_start_manager = optimal_start_manager
+        self._period_hours: float = max(period_min or 1, 1) / 60.0
+        self._fallback: PITemperatureRegulator = fallback
+        self._step: float = max(step or SEARCH_STEP, 2 * offset_max / (MAX_NB_CANDIDATES - 1))
+
+        self._last_setpoint: float | None = None
+        self._last_prediction: float | None = None
+        self._next_prediction: float | None = None
+        self._underlying_offset: float = 0
+        self._nb_predictions: int = 0
+
+        # Memoization of the last calculation
+        self._target_temp_step: float = DEFAULT_TARGET_TEMP_STEP
+        self._sensor_precision: float = DEFAULT_SENSOR_PRECISION
+        self._last_inputs: tuple | None = None
+        self._last_result: float | None = None
+        self._nb_cache_hit: int = 0
+        self._nb_cache_miss: int = 0
+
+    def set_resolution(self, target_temp_step: float | None, sensor_precision: float | None = None):
+        """Set the resolution used to compare the inputs of two calculations"""
+        if target_temp_step:
+            self._target_temp_step = target_temp_step
+        if sensor_precision:
+            self._sensor_precision = sensor_precision
+        self._last_inputs = None
+        self._fallback.set_resolution(target_temp_step, sensor_precision)
+
+    @property
+    def accumulated_error(self) -> float:
+        """The accumulated error of the fallback PI"""
+        return self._fallback.accumulated_error
+
+    def reset_accumulated_error(self):
+        """Reset the accumulated error of the fallback PI"""
+        self._fallback.reset_accumulated_error()
+        self._last_inputs = None
+
+    def set_accumulated_error(self, accumulated_error):
+        """Allow to persist and restore the accumulated_error of the fallback PI"""
+        self._fallback.set_accumulated_error(accumulated_error)
+        self._last_inputs = None
+
+    def set_target_temp(self, target_temp):
+        """Set the new target_temp"""
+        self.target_temp = target_temp
+        self._fallback.set_target_temp(target_temp)
+
+    def calculate_regulated_temperature(self, room_temp: float, external_temp: float, is_control_tick: bool = True):
+        """Calculate the setpoint to send for the next period"""
+        model = self._optimal_start_manager.thermal_model if self._optimal_start_manager else None
+        if model is None or not model.is_ready or self.is_cooling:
+            result = self._fallback.calculate_regulated_temperature(room_temp, external_temp, is_control_tick)
+            self._last_setpoint = result
+            return result
+
+        if room_temp is None or external_temp is None:
+            _LOGGER.warning("Temporarily skipping the model predictive regulation while the room or outdoor temperature is unavailable")
+            return self.target_temp
+
+        inputs = (
+            quantize(self.target_temp, self._target_temp_step),
+            quantize(room_temp, self._sensor_precision),
+            quantize(external_temp, self._sensor_precision),
+        )
+        if not is_control_tick and inputs == self._last_inputs:
+            self._nb_cache_hit += 1
+            return self._last_result
+        self._nb_cache_miss += 1
+
+        a = model.state["a"]
+        b = model.state["b"]
+        if is_control_tick and self._next_prediction is not None:
+            self._update_underlying_offset(room_temp - self._next_prediction, b)
+
+        candidates = self._candidates()
+        best = None
+        for first in candidates:
+            first_cost, temperature = self._predict(room_temp, external_temp, first, a, b, 1)
+            if first_cost >= (best[0] if best else float("inf")):
+                continue
+            change_cost = CHANGE_PENALTY if self._last_setpoint is not None and first != self._last_setpoint else 0
+            for second in candidates:
+                rest_cost, final_temperature = self._predict(temperature, external_temp, second, a, b, HORIZON_PERIODS - 1)
+                cost = first_cost + rest_cost + change_cost + (CHANGE_PENALTY if second != first else 0)
+                if best is None or cost < best[0]:
+                    best = (cost, first, temperature, final_temperature)
+
+        _, result, self._next_prediction, self._last_prediction = best
+        self._nb_predictions += 1
+        _LOGGER.debug(
+            "MpcTemperatureRegulator - room: %.2f ext: %.2f target: %.1f offset: %.2f -> setpoint: %.1f predicted: %.2f",
+            room_temp,
+            external_temp,
+            self.target_temp,
+            self._underlying_offset,
+            result,
+            self._last_prediction,
+        )
+
+        self._last_setpoint = result
+        self._last_inputs = inputs
+        self._last_result = result
+        return result
+
+    def _update_underlying_offset(self, prediction_error: float, b: float):
+        """Correct the offset of the underlying with the prediction error of the last period.
+        A room warmer than predicted means the underlying heats more than modelled. It is capped to offset_max"""
+        self._underlying_offset -= OFFSET_GAIN * prediction_error / (b * self._period_hours) * PROPORTIONAL_BAND
+        self._underlying_offset = min(self.offset_max, max(-self.offset_max, self._underlying_offset))
+
+    def _candidates(self) -> list[float]:
+        """The setpoints around the target. On equal costs the current setpoint is kept, else the
+        closest to the target is chosen: this is the most robust when the underlying is saturated"""
+        nb_steps = int(self.offset_max / self._step)
+        candidates = [round(self.target_temp + i * self._step, 1) for i in sorted(range(-nb_steps, nb_steps + 1), key=abs)]
+        if self._last_setpoint in candidates:
+            candidates.remove(self._last_setpoint)
+            candidates.insert(0, self._last_setpoint)
+        return candidates
+
+    def _predict(self, temperature: float, external_temp: float, setpoint: float, a: float, b: float, nb_periods: int) -> tuple[float, float]:
+        """Predict the temperature during nb_periods with a constant setpoint.
+        Returns the cost of the trajectory and the final temperature"""
+        dt = self._period_hours / NB_SUBSTEPS
+        cost = 0.0
+        for _ in range(NB_SUBSTEPS * nb_periods):
+            power = min(1.0, max(0.0, (setpoint - temperature - self._underlying_offset) / PROPORTIONAL_BAND))
+            temperature += (a * (external_temp - temperature) + b * power) * dt
+            error = temperature - self.target_temp
+            cost += error * error * (1 + OVERSHOOT_WEIGHT if error > 0 else 1) * dt
+        return cost, temperature
+
+    @property
+    def predicted_temperature(self) -> float | None:
+        """The temperature predicted at the end of the horizon by the last calculation"""
+        return round(self._last_prediction, 2) if self._last_prediction is not None else None
+
+    @property
+    def underlying_offset(self) -> float:
+        """The learned offset of the underlying in °"""
+        return round(self._underlying_offset, 2)
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """The counters of the memoization"""
+        return {"nb_hit": self._nb_cache_hit, "nb_miss": self._nb_cache_miss, "nb_predictions": self._nb_predictions}
@@ -356,10 +356,9 @@ class CentralConfigTemperatureNumber(
         # persist the value
         self.async_write_ha_state()
 
-        # We have to reload all VTherm for which uses the central configuration
+        # Update only the VTherms which uses this temperature of the central configuration
         api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self.hass)
-        # Update the VTherms which have temperature in central config
-        self.hass.create_task(api.init_vtherm_preset_with_central())
+        self.hass.create_task(api.update_vtherm_preset_with_central(self._config_id, self._preset_name))
 
     def __str__(self):
         return f"VersatileThermostat-{self.name}"
@@ -8,6 +8,7 @@
 """
 
 import logging
+from collections import deque
 from datetime import datetime
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,6 +23,13 @@ MAX_DURATION_MIN = 30  # a fake data point is added in the cycle if last measure
 
 MIN_NB_POINT = 4  # do not calculate slope until we have enough point
 
+# The regression algorithm
+REGRESSION_WINDOW_SEC = 300  # the slope is the least-squares slope of the points of the last 5 min
+REGRESSION_MAX_NB_POINT = 64  # the size of the ring buffer
+REGRESSION_MIN_NB_POINT = 3  # do not calculate slope until we have enough point in the window
+REGRESSION_MIN_SPAN_SEC = 60  # ... and they cover at least this duration
+MAX_ABSCISSA_HOUR = 24  # the origin of the abscissa is moved every day
+
 
 class WindowOpenDetectionAlgorithm:
     """The class that implements the algorithm listed above"""
@@ -118,25 +126,211 @@ class WindowOpenDetectionAlgorithm:
 
     def is_window_open_detected(self) -> bool:
         """True if the last calculated slope is under (because negative value) the _alert_threshold"""
-        if self._alert_threshold is None:
-            return False
-
-        if self._nb_point < MIN_NB_POINT or self._last_slope is None:
+        if self._alert_threshold is None or not self.is_ready:
             return False
 
         return self._last_slope < -self._alert_threshold
 
     def is_window_close_detected(self) -> bool:
         """True if the last calculated slope is above (cause negative) the _end_alert_threshold"""
-        if self._end_alert_threshold is None:
+        if self._end_alert_threshold is None or not self.is_ready:
+            return False
+
+        return self._last_slope >= self._end_alert_threshold
+
+    @property
+    def is_ready(self) -> bool:
+        """True if there is enough points for the last slope to be significant"""
+        return self._nb_point >= MIN_NB_POINT and self._last_slope is not None
+
+    @property
+    def last_slope(self) -> float:
+        """Return the last calculated slope"""
+        return self._last_slope
+
+
+class WindowRegressionDetectionAlgorithm:
+    """Same interface as WindowOpenDetectionAlgorithm but the slope is the least-squares
+    slope of the points received during the last window_sec seconds:
+    - the measurements are filtered with a median of 3 values to reject the isolated aberrant points
+      (so a measurement enters the regression when the next one is received),
+    - the filtered points are kept in a ring buffer and the sums needed by the least-squares
+      slope are updated incrementally when a point enters or leaves the window (O(1) by point),
+    - no fake point is stored: the sensors only report changes, so the last points are kept even
+      if they are older than the window and, in cycle, the last temperature is considered still
+      valid at the time of the check and only used to calculate the slope.
+    So the slope does not depend on the reporting cadence of the sensor"""
+
+    def __init__(
+        self,
+        alert_threshold,
+        end_alert_threshold,
+        window_sec: float = REGRESSION_WINDOW_SEC,
+        max_nb_point: int = REGRESSION_MAX_NB_POINT,
+    ) -> None:
+        """Initalize a new algorithm with the both threshold"""
+        self._alert_threshold: float = alert_threshold
+        self._end_alert_threshold: float = end_alert_threshold
+        self._window_sec: float = window_sec
+        self._max_nb_point: int = max_nb_point
+        self._last_slope: float | None = None
+        self._last_datetime: datetime | None = None
+        # the last 3 raw points (x, temperature) for the median filter
+        self._raw_points: deque = deque(maxlen=3)
+        # the filtered points (x in hours from _origin, temperature)
+        self._points: deque = deque()
+        self._origin: datetime | None = None
+        self._sum_x: float = 0
+        self._sum_y: float = 0
+        self._sum_xx: float = 0
+        self._sum_xy: float = 0
+
+    def _add_point(self, x: float, y: float):
+        """Add a point in the window and update the sums"""
+        self._points.append((x, y))
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_xx += x * x
+        self._sum_xy += x * y
+
+    def _remove_first_point(self):
+        """Remove the oldest point of the window and update the sums"""
+        x, y = self._points.popleft()
+        self._sum_x -= x
+        self._sum_y -= y
+        self._sum_xx -= x * x
+        self._sum_xy -= x * y
+
+    def _to_x(self, datetime_measure: datetime) -> float:
+        """The abscissa of a point in hours, so that the slope is in °/hour"""
+        return (datetime_measure - self._origin).total_seconds() / 3600.0
+
+    def _evict(self, x_now: float):
+        """Remove the points which are out of the window. The last points are always kept
+        because the sensors only report changes: their temperature is still valid"""
+        x_min = x_now - self._window_sec / 3600.0
+        while len(self._points) >= REGRESSION_MIN_NB_POINT and self._points[0][0] < x_min:
+            self._remove_first_point()
+
+    def _rebase(self, datetime_measure: datetime):
+        """Move the origin to datetime_measure and recalculate the sums, so that
+        the abscissa stay small and the rounding errors don't accumulate"""
+        shift = self._to_x(datetime_measure)
+        points = [(x - shift, y) for x, y in self._points]
+        self._raw_points = deque([(x - shift, y) for x, y in self._raw_points], maxlen=3)
+        self._origin = datetime_measure
+        self._points.clear()
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0
+        for x, y in points:
+            self._add_point(x, y)
+
+    def _calculate_slope(self, extra_point: tuple[float, float] | None = None) -> float | None:
+        """The least-squares slope of the points of the window (and of extra_point if given)"""
+        n, sum_x, sum_y, sum_xx, sum_xy = len(self._points), self._sum_x, self._sum_y, self._sum_xx, self._sum_xy
+        first_x = self._points[0][0] if self._points else None
+        last_x = self._points[-1][0] if self._points else None
+        if extra_point is not None:
+            x, y = extra_point
+            n += 1
+            sum_x += x
+            sum_y += y
+            sum_xx += x * x
+            sum_xy += x * y
+            first_x = x if first_x is None else first_x
+            last_x = x
+
+        if n < REGRESSION_MIN_NB_POINT or (last_x - first_x) * 3600.0 < REGRESSION_MIN_SPAN_SEC:
+            return None
+
+        denominator = n * sum_xx - sum_x * sum_x
+        if denominator <= 0:
+            return None
+
+        return round((n * sum_xy - sum_x * sum_y) / denominator, 2)
+
+    def check_age_last_measurement(self, temperature, datetime_now) -> float:
+        """Check the slope at datetime_now. The last temperature is considered
+        still valid and is used to calculate the slope without being stored"""
+        if self._last_datetime is None:
+            return self.add_temp_measurement(temperature, datetime_now)
+
+        if datetime_now <= self._last_datetime:
+            return self._last_slope
+
+        x_now = self._to_x(datetime_now)
+        self._evict(x_now)
+        self._last_slope = self._calculate_slope((x_now, self._raw_points[-1][1]))
+        return self._last_slope
+
+    def add_temp_measurement(self, temperature: float, datetime_measure: datetime, store_date: bool = True) -> float:  # pylint: disable=unused-argument
+        """Add a new temperature measurement
+        returns the last slope
+        """
+        if temperature is None:
+            return self._last_slope
+
+        if self._last_datetime is not None and (datetime_measure - self._last_datetime).total_seconds() <= MIN_DELTA_T_SEC:
+            _LOGGER.debug("The measurement at %s is not after the last one. We don't consider this value", datetime_measure)
+            return self._last_slope
+
+        if self._origin is None:
+            self._origin = datetime_measure
+        elif self._to_x(datetime_measure) > MAX_ABSCISSA_HOUR:
+            self._rebase(datetime_measure)
+
+        x = self._to_x(datetime_measure)
+        self._raw_points.append((x, temperature))
+        self._last_datetime = datetime_measure
+        self._evict(x)
+
+        # The first point is stored as is. Then the stored point is the previous one
+        # with the median of the last 3 values: an isolated aberrant value is never selected
+        if len(self._raw_points) == 1:
+            filtered_point = (x, temperature)
+        elif len(self._raw_points) == 3:
+            filtered_point = (self._raw_points[1][0], sorted(y for _, y in self._raw_points)[1])
+        else:
+            return self._last_slope
+
+        if len(self._points) >= self._max_nb_point:
+            self._remove_first_point()
+        self._add_point(*filtered_point)
+
+        self._last_slope = self._calculate_slope()
+        _LOGGER.debug(
+            "temperature=%.2f filtered=%.2f nb_point=%d slope=%s",
+            temperature,
+            filtered_point[1],
+            len(self._points),
+            self._last_slope,
+        )
+        return self._last_slope
+
+    def is_window_open_detected(self) -> bool:
+        """True if the last calculated slope is under (because negative value) the _alert_threshold"""
+        if self._alert_threshold is None or not self.is_ready:
             return False
 
-        if self._nb_point < MIN_NB_POINT or self._last_slope is None:
+        return self._last_slope < -self._alert_threshold
+
+    def is_window_close_detected(self) -> bool:
+        """True if the last calculated slope is above (cause negative) the _end_alert_threshold"""
+        if self._end_alert_threshold is None or not self.is_ready:
             return False
 
         return self._last_slope >= self._end_alert_threshold
 
+    @property
+    def is_ready(self) -> bool:
+        """True if there is enough points for the last slope to be significant"""
+        return self._last_slope is not None
+
     @property
     def last_slope(self) -> float:
         """Return the last calculated slope"""
         return self._last_slope
+
+    @property
+    def nb_point(self) -> int:
+        """The number of points in the window"""
+        return len(self._points)
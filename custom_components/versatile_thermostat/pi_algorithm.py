@@ -3,6 +3,8 @@
 
 import logging
 
+from .prop_algorithm import quantize, DEFAULT_TARGET_TEMP_STEP, DEFAULT_SENSOR_PRECISION
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -15,6 +17,10 @@ class PITemperatureRegulator:
     - instanciate the class and gives the algorithm parameters: kp, ki, offset_max, stabilization_threshold, accumulated_error_threshold
     - call calculate_regulated_temperature with the internal and external temperature
     - call set_target_temp when the target temperature change.
+
+    A call which is not a control tick (an event between two regulation periods) with the same
+    inputs (at the target step and sensor precision) than the previous calculation returns the
+    last result without advancing the accumulated error.
     """
 
     def __init__(
@@ -36,13 +42,31 @@ class PITemperatureRegulator:
         self.accumulated_error: float = 0
         self.accumulated_error_threshold: float = accumulated_error_threshold
 
+        # Memoization of the last calculation
+        self._target_temp_step: float = DEFAULT_TARGET_TEMP_STEP
+        self._sensor_precision: float = DEFAULT_SENSOR_PRECISION
+        self._last_inputs: tuple | None = None
+        self._last_result: float | None = None
+        self._nb_cache_hit: int = 0
+        self._nb_cache_miss: int = 0
+
+    def set_resolution(self, target_temp_step: float | None, sensor_precision: float | None = None):
+        """Set the resolution used to compare the inputs of two calculations"""
+        if target_temp_step:
+            self._target_temp_step = target_temp_step
+        if sensor_precision:
+            self._sensor_precision = sensor_precision
+        self._last_inputs = None
+
     def reset_accumulated_error(self):
         """Reset the accumulated error"""
         self.accumulated_error = 0
+        self._last_inputs = None
 
     def set_accumulated_error(self, accumulated_error):
         """Allow to persist and restore the accumulated_error"""
         self.accumulated_error = accumulated_error
+        self._last_inputs = None
 
     def set_target_temp(self, target_temp):
         """Set the new target_temp"""
@@ -53,9 +77,11 @@ class PITemperatureRegulator:
         #     self.accumulated_error = 0
 
     def calculate_regulated_temperature(
-        self, room_temp: float, external_temp: float
+        self, room_temp: float, external_temp: float, is_control_tick: bool = True
     ):  # pylint: disable=unused-argument
-        """Calculate a new target_temp given some temperature"""
+        """Calculate a new target_temp given some temperature.
+        is_control_tick should be False when the calculation is triggered by an event between two
+        regulation periods. The accumulated error is then not advanced if the inputs are unchanged"""
         if room_temp is None:
             _LOGGER.warning(
                 "Temporarily skipping the self-regulation algorithm while the configured sensor for room temperature is unavailable"
@@ -67,6 +93,17 @@ class PITemperatureRegulator:
             )
             return self.target_temp
 
+        inputs = (
+            quantize(self.target_temp, self._target_temp_step),
+            quantize(room_temp, self._sensor_precision),
+            quantize(external_temp, self._sensor_precision),
+        )
+        if not is_control_tick and inputs == self._last_inputs:
+            self._nb_cache_hit += 1
+            return self._last_result
+
+        self._nb_cache_miss += 1
+
         # Calculate the error factor (P)
         error = self.target_temp - room_temp
 
@@ -106,4 +143,11 @@ class PITemperatureRegulator:
             result,
         )
 
+        self._last_inputs = inputs
+        self._last_result = result
         return result
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """The counters of the memoization"""
+        return {"nb_hit": self._nb_cache_hit, "nb_miss": self._nb_cache_miss}
@@ -12,6 +12,10 @@ PROPORTIONAL_FUNCTION_TPI = "tpi"
 
 PROPORTIONAL_MIN_DURATION_SEC = 10
 
+# The default resolution used to compare the inputs of two calculations
+DEFAULT_TARGET_TEMP_STEP = 0.1
+DEFAULT_SENSOR_PRECISION = 0.01
+
 FUNCTION_TYPE = [PROPORTIONAL_FUNCTION_ATAN, PROPORTIONAL_FUNCTION_LINEAR]
 
 
@@ -20,6 +24,14 @@ def is_number(value):
     return isinstance(value, (int, float))
 
 
+def quantize(value: float | None, step: float) -> int | None:
+    """Gives the number of step of a value. Two values with the same quantized value
+    are considered as equal by the memoization of the algorithms"""
+    if value is None:
+        return None
+    return round(value / step)
+
+
 class PropAlgorithm:
     """This class aims to do all calculation of the Proportional alogorithm"""
 
@@ -81,14 +93,75 @@ class PropAlgorithm:
         self._default_on_percent = 0
         self._max_on_percent = max_on_percent
 
+        # Memoization of the last calculation
+        self._target_temp_step = DEFAULT_TARGET_TEMP_STEP
+        self._sensor_precision = DEFAULT_SENSOR_PRECISION
+        self._last_inputs = None
+        self._nb_cache_hit = 0
+        self._nb_cache_miss = 0
+
+    def set_resolution(self, target_temp_step: float | None, sensor_precision: float | None = None):
+        """Set the resolution used to compare the inputs of two calculations"""
+        if target_temp_step:
+            self._target_temp_step = target_temp_step
+        if sensor_precision:
+            self._sensor_precision = sensor_precision
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Force the next calculation to be done"""
+        self._last_inputs = None
+
+    def _quantize_inputs(self, target_temp, current_temp, ext_current_temp, hvac_mode) -> tuple:
+        """The key of the memoization"""
+        return (
+            quantize(target_temp, self._target_temp_step),
+            quantize(current_temp, self._sensor_precision),
+            quantize(ext_current_temp, self._sensor_precision),
+            hvac_mode,
+        )
+
+    def is_inputs_unchanged(self, target_temp, current_temp, ext_current_temp, hvac_mode) -> bool:
+        """True if the inputs are the same than the last calculation at the target step
+        and sensor precision. The outputs would then be the same"""
+        return self._last_inputs is not None and self._last_inputs == self._quantize_inputs(target_temp, current_temp, ext_current_temp, hvac_mode)
+
+    def update_parameters(self, tpi_coef_int, tpi_coef_ext, minimal_activation_delay: int):
+        """Update the parameters of the algorithm without loosing its state.
+        The new parameters will be used at the next calculation"""
+        _LOGGER.debug(
+            "%s - Update PropAlgorithm parameters tpi_coef_int: %s, tpi_coef_ext: %s, minimal_activation_delay:%s",
+            self._vtherm_entity_id,
+            tpi_coef_int,
+            tpi_coef_ext,
+            minimal_activation_delay,
+        )
+        if not is_number(tpi_coef_int) or not is_number(tpi_coef_ext) or not is_number(minimal_activation_delay):
+            raise TypeError("TPI parameters are not set correctly. VTherm will not work as expected. Please reconfigure it correctly")
+
+        self._tpi_coef_int = tpi_coef_int
+        self._tpi_coef_ext = tpi_coef_ext
+        self._minimal_activation_delay = minimal_activation_delay
+        self.invalidate_cache()
+
     def calculate(
         self,
         target_temp: float | None,
         current_temp: float | None,
         ext_current_temp: float | None,
         hvac_mode: HVACMode,
-    ):
-        """Do the calculation of the duration"""
+    ) -> bool:
+        """Do the calculation of the duration.
+        Returns False if the inputs are unchanged since the last calculation. The last
+        outputs are then kept without any other side effect"""
+        inputs = self._quantize_inputs(target_temp, current_temp, ext_current_temp, hvac_mode)
+        if inputs == self._last_inputs:
+            self._nb_cache_hit += 1
+            return False
+
+        self._nb_cache_miss += 1
+        self._last_inputs = inputs
+
         if target_temp is None or current_temp is None:
             log = _LOGGER.debug if hvac_mode == HVACMode.OFF else _LOGGER.warning
             log(
@@ -139,6 +212,7 @@ class PropAlgorithm:
             self.on_time_sec,
             self.off_time_sec,
         )
+        return True
 
     def _calculate_internal(self):
         """Finish the calculation to get the on_percent in seconds"""
@@ -194,6 +268,7 @@ class PropAlgorithm:
         )
         self._security = True
         self._default_on_percent = default_on_percent
+        self.invalidate_cache()
         self._calculate_internal()
 
     def unset_safety(self):
@@ -202,6 +277,7 @@ class PropAlgorithm:
             "%s - Proportional Algo - set security to OFF", self._vtherm_entity_id
         )
         self._security = False
+        self.invalidate_cache()
         self._calculate_internal()
 
     @property
@@ -227,3 +303,13 @@ class PropAlgorithm:
     def off_time_sec(self) -> int:
         """Returns the calculated time in sec the heater must be OFF"""
         return int(self._off_time_sec)
+
+    @property
+    def max_on_percent(self) -> float | None:
+        """The max on_percent (None if not limited)"""
+        return self._max_on_percent
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """The counters of the memoization"""
+        return {"nb_hit": self._nb_cache_hit, "nb_miss": self._nb_cache_miss}
@@ -2,6 +2,8 @@
 """ Implements the VersatileThermostat sensors component """
 import logging
 import math
+from datetime import timedelta
+from time import monotonic
 
 from homeassistant.core import HomeAssistant, callback, Event, CoreState, State
 
@@ -22,9 +24,11 @@ from homeassistant.config_entries import ConfigEntry
 
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.device_registry import DeviceInfo, DeviceEntryType
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.event import (
     async_track_state_change_event,
+    async_track_time_interval,
 )
 
 from homeassistant.components.climate import (
@@ -36,6 +40,7 @@ from homeassistant.components.climate import (
 from .base_thermostat import BaseThermostat
 from .vtherm_api import VersatileThermostatAPI
 from .base_entity import VersatileThermostatBaseEntity
+from .timing_stats import VTHERM_HOT_PATHS, CENTRAL_HOT_PATHS, TIMING_CONTROL_HEATING
 from .const import (
     DOMAIN,
     DEVICE_MANUFACTURER,
@@ -56,6 +61,9 @@ from .const import (
 
 THRESHOLD_WATT_KILO = 100
 
+# The update interval of the central hot path timings sensor
+TIMINGS_UPDATE_INTERVAL = timedelta(minutes=1)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -79,16 +87,21 @@ async def async_setup_entry(
     entities = None
 
     if vt_type == CONF_THERMOSTAT_CENTRAL_CONFIG:
+        entities = [
+            StaleSensorsSensor(hass, unique_id, name, entry.data),
+            CentralHotPathTimingsSensor(hass, unique_id, name, entry.data),
+        ]
         if entry.data.get(CONF_USE_CENTRAL_BOILER_FEATURE):
-            entities = [
+            entities.append(
                 NbActiveDeviceForBoilerSensor(hass, unique_id, name, entry.data)
-            ]
+            )
     else:
         entities = [
             LastTemperatureSensor(hass, unique_id, name, entry.data),
             LastExtTemperatureSensor(hass, unique_id, name, entry.data),
             TemperatureSlopeSensor(hass, unique_id, name, entry.data),
             EMATemperatureSensor(hass, unique_id, name, entry.data),
+            HotPathTimingsSensor(hass, unique_id, name, entry.data),
         ]
         if entry.data.get(CONF_DEVICE_POWER):
             entities.append(EnergySensor(hass, unique_id, name, entry.data))
@@ -498,6 +511,7 @@ class TemperatureSlopeSensor(VersatileThermostatBaseEntity, SensorEntity):
         super().__init__(hass, unique_id, entry_infos.get(CONF_NAME))
         self._attr_name = "Temperature slope"
         self._attr_unique_id = f"{self._device_name}_temperature_slope"
+        self._attr_long_slope = None
 
     @callback
     async def async_my_climate_changed(self, event: Event = None):
@@ -511,12 +525,21 @@ class TemperatureSlopeSensor(VersatileThermostatBaseEntity, SensorEntity):
         if math.isnan(last_slope) or math.isinf(last_slope):
             raise ValueError(f"Sensor has illegal state {last_slope}")
 
-        old_state = self._attr_native_value
+        old_state = (self._attr_native_value, self._attr_long_slope)
         self._attr_native_value = round(last_slope, self.suggested_display_precision)
-        if old_state != self._attr_native_value:
+        long_slope = self.my_climate.last_temperature_long_slope
+        self._attr_long_slope = round(long_slope, self.suggested_display_precision) if long_slope is not None else None
+        if old_state != (self._attr_native_value, self._attr_long_slope):
             self.async_write_ha_state()
         return
 
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return additional attributes for the sensor."""
+        return {
+            "long_slope": self._attr_long_slope,
+        }
+
     @property
     def icon(self) -> str | None:
         if self._attr_native_value is None or self._attr_native_value == 0:
@@ -818,3 +841,194 @@ class NbActiveDeviceForBoilerSensor(SensorEntity):
 
     def __str__(self):
         return f"VersatileThermostat-{self.name}"
+
+
+class StaleSensorsSensor(SensorEntity):
+    """The number of temperature sensors which are not updated anymore
+    (see the CentralSensorWatchdog). The stale sensors are in the attributes"""
+
+    _entity_component_unrecorded_attributes = SensorEntity._entity_component_unrecorded_attributes.union(  # pylint: disable=protected-access
+        frozenset({"stale_entity_ids", "last_measures", "affected_vtherms"})
+    )
+
+    def __init__(self, hass: HomeAssistant, unique_id, name, entry_infos) -> None:
+        """Initialize the stale sensors sensor"""
+        self._hass = hass
+        self._config_id = unique_id
+        self._device_name = entry_infos.get(CONF_NAME)
+        self._attr_name = "Stale sensors"
+        self._attr_unique_id = "stale_sensors"
+        self._attr_native_value = 0
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return additional attributes for the sensor."""
+        watchdog = VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_watchdog
+        return {
+            "stale_entity_ids": list(watchdog.stale_sensors),
+            "last_measures": {entity_id: last_measure.isoformat() for entity_id, last_measure in watchdog.stale_sensors.items()},
+            "affected_vtherms": [vtherm.entity_id for vtherm in watchdog.find_stale_dependents()],
+        }
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:thermometer-alert" if self._attr_native_value else "mdi:thermometer-check"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, self._config_id)},
+            name=self._device_name,
+            manufacturer=DEVICE_MANUFACTURER,
+            model=DOMAIN,
+        )
+
+    @property
+    def state_class(self) -> SensorStateClass | None:
+        return SensorStateClass.MEASUREMENT
+
+    @overrides
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+
+        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
+        self.async_on_remove(api.sensor_watchdog.register_listener(self.update_stale_sensors))
+        self.update_stale_sensors()
+
+    @callback
+    def update_stale_sensors(self):
+        """The list of stale sensors have changed"""
+        self._attr_native_value = len(VersatileThermostatAPI.get_vtherm_api(self._hass).sensor_watchdog.stale_sensors)
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    def __str__(self):
+        return f"VersatileThermostat-{self.name}"
+
+
+class HotPathTimingsSensor(VersatileThermostatBaseEntity, SensorEntity):
+    """The mean duration of the control pass of a VTherm. The histograms of
+    all the hot paths are in the attributes. Disabled by default"""
+
+    _entity_component_unrecorded_attributes = SensorEntity._entity_component_unrecorded_attributes.union(frozenset(VTHERM_HOT_PATHS))  # pylint: disable=protected-access
+
+    def __init__(self, hass: HomeAssistant, unique_id, name, entry_infos) -> None:
+        """Initialize the timings sensor"""
+        super().__init__(hass, unique_id, entry_infos.get(CONF_NAME))
+        self._attr_name = "Hot path timings"
+        self._attr_unique_id = f"{self._device_name}_hot_path_timings"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._nb_control_heating = 0
+
+    @callback
+    async def async_my_climate_changed(self, event: Event = None):
+        """Called when my climate have change"""
+        histogram = self.my_climate.timings[TIMING_CONTROL_HEATING]
+        if histogram.count == self._nb_control_heating:
+            return
+
+        self._nb_control_heating = histogram.count
+        self._attr_native_value = round(histogram.mean_ms, self.suggested_display_precision)
+        self._attr_extra_state_attributes = self.my_climate.timings.as_dict()
+        self.async_write_ha_state()
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:timer-outline"
+
+    @property
+    def state_class(self) -> SensorStateClass | None:
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        return UnitOfTime.MILLISECONDS
+
+    @property
+    def suggested_display_precision(self) -> int | None:
+        """Return the suggested number of decimal digits for display."""
+        return 3
+
+
+class CentralHotPathTimingsSensor(SensorEntity):
+    """The part of the time spent in the hot paths of all VTherms and of the central ones
+    during the last minute (in %). The aggregated histograms are in the attributes. Disabled by default"""
+
+    _entity_component_unrecorded_attributes = SensorEntity._entity_component_unrecorded_attributes.union(  # pylint: disable=protected-access
+        frozenset(VTHERM_HOT_PATHS + CENTRAL_HOT_PATHS + ["slowest_vtherms"])
+    )
+
+    def __init__(self, hass: HomeAssistant, unique_id, name, entry_infos) -> None:
+        """Initialize the central timings sensor"""
+        self._hass = hass
+        self._config_id = unique_id
+        self._device_name = entry_infos.get(CONF_NAME)
+        self._attr_name = "Hot path timings"
+        self._attr_unique_id = "hot_path_timings"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._attr_native_value = None
+        self._last_total_sec: float | None = None
+        self._last_update: float | None = None
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:timer-outline"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, self._config_id)},
+            name=self._device_name,
+            manufacturer=DEVICE_MANUFACTURER,
+            model=DOMAIN,
+        )
+
+    @property
+    def state_class(self) -> SensorStateClass | None:
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        return PERCENTAGE
+
+    @property
+    def suggested_display_precision(self) -> int | None:
+        """Return the suggested number of decimal digits for display."""
+        return 3
+
+    @overrides
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+
+        self.async_on_remove(async_track_time_interval(self._hass, self.update_timings, TIMINGS_UPDATE_INTERVAL))
+        self.update_timings()
+
+    @callback
+    def update_timings(self, _=None):
+        """Aggregate the timings of all VTherms"""
+        api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(self._hass)
+        timings = api.aggregate_timings()
+        now = monotonic()
+        # the nested paths are not summed else the same time is counted several times
+        total_sec = timings.outer_total_sec
+        if self._last_update is not None and now > self._last_update:
+            self._attr_native_value = round(max(0.0, total_sec - self._last_total_sec) * 100 / (now - self._last_update), self.suggested_display_precision)
+        self._last_total_sec = total_sec
+        self._last_update = now
+
+        slowest = sorted(api.find_all_vtherms(), key=lambda vtherm: vtherm.timings.outer_total_sec, reverse=True)[:5]
+        self._attr_extra_state_attributes = timings.as_dict() | {
+            "slowest_vtherms": {vtherm.entity_id: round(vtherm.timings.outer_total_sec * 1000, 3) for vtherm in slowest},
+        }
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    def __str__(self):
+        return f"VersatileThermostat-{self.name}"
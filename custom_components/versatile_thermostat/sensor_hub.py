@@ -0,0 +1,175 @@
+# pylint: disable=line-too-long
+""" A central subscription hub for the sensors shared between VTherms """
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, Event, State, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    EventStateChangedData,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The kind of readings. A temperature reading have a float value. A state reading have the raw state as value
+READING_TEMPERATURE = "temperature"
+READING_STATE = "state"
+
+
+def parse_temperature(state: State) -> float:
+    """Parse the state of a temperature sensor. Raise a ValueError if the state is not a valid temperature"""
+    value = float(state.state)
+    if math.isnan(value) or math.isinf(value):
+        raise ValueError(f"Sensor has illegal state {state.state}")
+    return value
+
+
+@dataclass
+class SensorReading:
+    """A typed reading of a sensor, parsed and validated once for all the VTherms"""
+
+    entity_id: str
+    kind: str
+    new_state: State | None
+    old_state: State | None
+    value: Any = None
+    error: str | None = None
+
+    @property
+    def is_available(self) -> bool:
+        """True if the sensor have a known state"""
+        return self.new_state is not None and self.new_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+
+    @property
+    def is_valid(self) -> bool:
+        """True if the sensor is available and the value have been parsed"""
+        return self.is_available and self.error is None
+
+    @classmethod
+    def from_event(cls, event: Event[EventStateChangedData], kind: str):
+        """Build the reading from a state_changed event"""
+        new_state: State = event.data.get("new_state")
+        reading = cls(
+            entity_id=event.data.get("entity_id"),
+            kind=kind,
+            new_state=new_state,
+            old_state=event.data.get("old_state"),
+        )
+        if not reading.is_available:
+            return reading
+
+        if kind == READING_TEMPERATURE:
+            try:
+                reading.value = parse_temperature(new_state)
+            except ValueError as ex:
+                reading.error = str(ex)
+        else:
+            reading.value = new_state.state
+        return reading
+
+
+SensorCallback = Callable[[Event[EventStateChangedData], SensorReading], Awaitable[Any]]
+
+
+@dataclass
+class _SensorSubscription:
+    """All the subscribers of a source entity"""
+
+    remove_listener: CALLBACK_TYPE
+    callbacks: list[tuple[str, SensorCallback]] = field(default_factory=list)
+
+
+class SensorSubscriptionHub:
+    """Holds one HA listener by source entity and fan out the parsed readings
+    to all the dependent VTherms"""
+
+    def __init__(self, hass: HomeAssistant):
+        """Init the hub"""
+        self._hass = hass
+        self._subscriptions: dict[str, _SensorSubscription] = {}
+
+    def __str__(self):
+        return "SensorSubscriptionHub"
+
+    def subscribe(self, entity_id: str, kind: str, sensor_callback: SensorCallback) -> CALLBACK_TYPE:
+        """Subscribe to the changes of entity_id. sensor_callback will be called with
+        the state_changed event and the reading of the given kind.
+        Return the function to call to unsubscribe"""
+        subscription = self._subscriptions.get(entity_id)
+        if subscription is None:
+            subscription = _SensorSubscription(
+                remove_listener=async_track_state_change_event(
+                    self._hass,
+                    [entity_id],
+                    self._async_sensor_changed,
+                )
+            )
+            self._subscriptions[entity_id] = subscription
+            _LOGGER.debug("%s - Start listening to %s", self, entity_id)
+
+        item = (kind, sensor_callback)
+        subscription.callbacks.append(item)
+
+        @callback
+        def unsubscribe():
+            self._unsubscribe(entity_id, item)
+
+        return unsubscribe
+
+    def _unsubscribe(self, entity_id: str, item: tuple[str, SensorCallback]):
+        """Remove a subscriber and stop listening to the entity if this was the last one"""
+        subscription = self._subscriptions.get(entity_id)
+        if subscription is None or item not in subscription.callbacks:
+            return
+
+        subscription.callbacks.remove(item)
+        if not subscription.callbacks:
+            subscription.remove_listener()
+            del self._subscriptions[entity_id]
+            _LOGGER.debug("%s - Stop listening to %s", self, entity_id)
+
+    async def _async_sensor_changed(self, event: Event[EventStateChangedData]):
+        """Parse the new state once by kind and call all the subscribers"""
+        subscription = self._subscriptions.get(event.data.get("entity_id"))
+        if subscription is None:
+            return
+
+        readings: dict[str, SensorReading] = {}
+        calls = []
+        # copy the list because a subscriber could unsubscribe during the call
+        for kind, sensor_callback in list(subscription.callbacks):
+            if kind not in readings:
+                readings[kind] = SensorReading.from_event(event, kind)
+            calls.append(sensor_callback(event, readings[kind]))
+
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.error(
+                    "%s - Error while dispatching the change of %s. Error is: %s",
+                    self,
+                    event.data.get("entity_id"),
+                    result,
+                    exc_info=result,
+                )
+
+    def nb_subscribers(self, entity_id: str) -> int:
+        """The number of subscribers of a source entity"""
+        subscription = self._subscriptions.get(entity_id)
+        return len(subscription.callbacks) if subscription else 0
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """The list of all the source entities listened"""
+        return list(self._subscriptions.keys())
+
+    def stop(self):
+        """Stop listening all the source entities"""
+        for subscription in self._subscriptions.values():
+            subscription.remove_listener()
+        self._subscriptions = {}
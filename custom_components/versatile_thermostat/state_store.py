@@ -0,0 +1,118 @@
+# pylint: disable=line-too-long
+""" The persistent store of the learned state of all VTherms.
+
+    The learned state (the accumulated error of the regulation, the thermal model, the EMA,
+    the energy, ...) is kept in one file for all VTherms in the .storage directory of Home Assistant.
+    Each VTherm registers a function which gives its compact record. The records are collected
+    only when the file is written: a save is asked after each cycle but the writes are
+    delayed by save_delay_sec and batched for all VTherms. The Store writes atomically and
+    the pending save is done when Home Assistant stops.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.learned_state"
+
+
+class VThermStateStore:
+    """The store of the learned state of all VTherms by unique_id"""
+
+    def __init__(self, hass: HomeAssistant, vtherm_api: Any):
+        self._hass: HomeAssistant = hass
+        self._vtherm_api = vtherm_api  # no type due to circular reference
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._records: dict[str, dict[str, Any]] = {}
+        self._providers: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._is_loaded: bool = False
+        self._load_lock = asyncio.Lock()
+        self._is_save_pending: bool = False
+        self._nb_saves: int = 0
+
+    def __str__(self):
+        return "VThermStateStore"
+
+    async def async_load(self):
+        """Load the records if not already done. Should be called before the VTherms are restored"""
+        async with self._load_lock:
+            if self._is_loaded:
+                return
+            data = await self._store.async_load()
+            if isinstance(data, dict):
+                self._records = data.get("vtherms") or {}
+            self._is_loaded = True
+        _LOGGER.debug("%s - %d learned states loaded", self, len(self._records))
+
+        @callback
+        def _async_on_stop(_):
+            """Save the last learned states when Home Assistant stops"""
+            self._is_save_pending = False
+            self.async_schedule_save()
+
+        self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_on_stop)
+
+    def get(self, unique_id: str) -> dict[str, Any] | None:
+        """Get the stored record of a VTherm"""
+        return self._records.get(unique_id)
+
+    def register(self, unique_id: str, provider: Callable[[], dict[str, Any]]):
+        """Register the function which gives the learned state of a VTherm"""
+        self._providers[unique_id] = provider
+
+    def unregister(self, unique_id: str):
+        """Keep the last learned state of a VTherm and stop collecting it"""
+        provider = self._providers.pop(unique_id, None)
+        if provider is not None:
+            self._collect(unique_id, provider)
+            self.async_schedule_save()
+
+    def remove(self, unique_id: str):
+        """Remove the record of a VTherm (its config entry is deleted)"""
+        self._providers.pop(unique_id, None)
+        if self._records.pop(unique_id, None) is not None:
+            self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self):
+        """Ask for a save. It is done after save_delay_sec with all the pending changes"""
+        # never overwrite the file with the records not loaded
+        if self._is_save_pending or not self._is_loaded:
+            return
+        self._is_save_pending = True
+        self._store.async_delay_save(self._data_to_save, self._vtherm_api.state_store_save_delay_sec)
+
+    def _collect(self, unique_id: str, provider: Callable[[], dict[str, Any]]):
+        """Update the record of a VTherm with its provider"""
+        try:
+            self._records[unique_id] = provider()
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            _LOGGER.error("%s - Error while collecting the learned state of %s. Error is: %s", self, unique_id, err, exc_info=err)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Collect the records of all VTherms. Called by the Store when it writes the file"""
+        self._is_save_pending = False
+        for unique_id, provider in self._providers.items():
+            self._collect(unique_id, provider)
+        self._nb_saves += 1
+        return {"vtherms": self._records}
+
+    @property
+    def records(self) -> dict[str, dict[str, Any]]:
+        """The records by VTherm unique_id"""
+        return self._records
+
+    @property
+    def nb_saves(self) -> int:
+        """The number of writes of the file"""
+        return self._nb_saves
@@ -0,0 +1,262 @@
+# pylint: disable=line-too-long
+""" The filter pipeline of the temperature measurements of a VTherm.
+    Each measurement goes through a chain of stages (spike rejection, median, EMA, Kalman).
+    Each stage gets the output of the previous one, keeps a fixed size state and
+    processes a measurement in O(1). A stage can reject a measurement: the following
+    stages are then not called and keep their last output.
+"""
+
+import logging
+import math
+from bisect import bisect_left, insort
+from datetime import datetime, tzinfo
+from time import perf_counter
+from typing import Any
+
+from .const import (
+    FILTER_STAGE_RAW,
+    FILTER_STAGE_SPIKE,
+    FILTER_STAGE_MEDIAN,
+    FILTER_STAGE_EMA,
+    FILTER_STAGE_KALMAN,
+)
+from .ema import ExponentialMovingAverage
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SPIKE_MAX_DELTA = 2.0  # a change of more than 2° between two measurements is a spike
+DEFAULT_SPIKE_MAX_CONSECUTIVE = 2  # ... except if it is confirmed by the following measurements
+DEFAULT_MEDIAN_SIZE = 3
+DEFAULT_KALMAN_PROCESS_NOISE = 0.01  # variance added to the estimation each minute (°²/min)
+DEFAULT_KALMAN_MEASUREMENT_NOISE = 0.04  # variance of the sensor (°²)
+
+
+class FilterStage:
+    """The base class of a stage. Subclasses implement _filter"""
+
+    name: str = None
+
+    def __init__(self):
+        self._last_value: float | None = None
+        self._nb_processed: int = 0
+        self._nb_rejected: int = 0
+        self._total_duration_sec: float = 0
+
+    def _filter(self, value: float, timestamp: datetime) -> float | None:
+        """Filter a value. Returns None if the value is rejected"""
+        raise NotImplementedError()
+
+    def process(self, value: float, timestamp: datetime) -> float | None:
+        """Process a value, update the counters and return the output or None if the value is rejected"""
+        start = perf_counter()
+        output = self._filter(value, timestamp)
+        self._total_duration_sec += perf_counter() - start
+        self._nb_processed += 1
+        if output is None:
+            self._nb_rejected += 1
+        else:
+            self._last_value = output
+        return output
+
+    @property
+    def last_value(self) -> float | None:
+        """The last output of the stage"""
+        return self._last_value
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """The counters of the stage"""
+        return {
+            "nb_processed": self._nb_processed,
+            "nb_rejected": self._nb_rejected,
+            "mean_duration_us": round(self._total_duration_sec / self._nb_processed * 1e6, 2) if self._nb_processed else None,
+        }
+
+
+class SpikeRejectionStage(FilterStage):
+    """Rejects a value which is too far from the last accepted one, except if the
+    next values confirm it (a real change of temperature)"""
+
+    name = FILTER_STAGE_SPIKE
+
+    def __init__(self, max_delta: float = DEFAULT_SPIKE_MAX_DELTA, max_consecutive: int = DEFAULT_SPIKE_MAX_CONSECUTIVE):
+        super().__init__()
+        self._max_delta = max_delta
+        self._max_consecutive = max_consecutive
+        self._nb_consecutive_rejected = 0
+
+    def _filter(self, value: float, timestamp: datetime) -> float | None:
+        if self._last_value is not None and abs(value - self._last_value) > self._max_delta and self._nb_consecutive_rejected < self._max_consecutive:
+            self._nb_consecutive_rejected += 1
+            _LOGGER.debug("%s - value %.2f rejected (last accepted is %.2f)", self.name, value, self._last_value)
+            return None
+
+        self._nb_consecutive_rejected = 0
+        return value
+
+
+class MedianStage(FilterStage):
+    """The median of the last size values. The values are kept in a ring buffer (in arrival order)
+    and in a sorted list of the same size, so that the oldest value is replaced without sorting"""
+
+    name = FILTER_STAGE_MEDIAN
+
+    def __init__(self, size: int = DEFAULT_MEDIAN_SIZE):
+        super().__init__()
+        self._values: list[float] = [0.0] * size
+        self._sorted_values: list[float] = []
+        self._index = 0
+        self._count = 0
+
+    def _filter(self, value: float, timestamp: datetime) -> float | None:
+        if self._count == len(self._values):
+            del self._sorted_values[bisect_left(self._sorted_values, self._values[self._index])]
+        else:
+            self._count += 1
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        insort(self._sorted_values, value)
+        middle = self._count // 2
+        return self._sorted_values[middle] if self._count % 2 == 1 else (self._sorted_values[middle - 1] + self._sorted_values[middle]) / 2
+
+
+class EmaStage(FilterStage):
+    """The Exponential Moving Average"""
+
+    name = FILTER_STAGE_EMA
+
+    def __init__(self, ema: ExponentialMovingAverage):
+        super().__init__()
+        self._ema = ema
+
+    def _filter(self, value: float, timestamp: datetime) -> float | None:
+        return self._ema.calculate_ema(value, timestamp)
+
+    @property
+    def ema(self) -> ExponentialMovingAverage:
+        """The EMA calculation"""
+        return self._ema
+
+
+class KalmanStage(FilterStage):
+    """A 1-D Kalman filter with a random walk model of the temperature"""
+
+    name = FILTER_STAGE_KALMAN
+
+    def __init__(self, process_noise: float = DEFAULT_KALMAN_PROCESS_NOISE, measurement_noise: float = DEFAULT_KALMAN_MEASUREMENT_NOISE):
+        super().__init__()
+        self._process_noise = process_noise
+        self._measurement_noise = measurement_noise
+        self._estimate: float | None = None
+        self._variance: float = measurement_noise
+        self._last_timestamp: datetime | None = None
+
+    def _filter(self, value: float, timestamp: datetime) -> float | None:
+        if self._estimate is None:
+            self._estimate = value
+            self._last_timestamp = timestamp
+            return value
+
+        # predict: the uncertainty grows with the time since the last measurement
+        dt_min = max((timestamp - self._last_timestamp).total_seconds() / 60.0, 0) if timestamp and self._last_timestamp else 1
+        self._variance += self._process_noise * dt_min
+        # update
+        gain = self._variance / (self._variance + self._measurement_noise)
+        self._estimate += gain * (value - self._estimate)
+        self._variance *= 1 - gain
+        self._last_timestamp = timestamp
+        return round(self._estimate, 3)
+
+
+class TemperatureFilterPipeline:
+    """The chain of stages of a VTherm. regulation_stage is the name of the
+    stage which output is used by the regulation (raw means no filter)"""
+
+    def __init__(self, name: str, stages: list[FilterStage], regulation_stage: str = FILTER_STAGE_RAW):
+        self._name = name
+        self._stages = stages
+        self._stages_by_name = {stage.name: stage for stage in stages}
+        self._regulation_stage = regulation_stage if regulation_stage in self._stages_by_name else FILTER_STAGE_RAW
+        self._last_raw: float | None = None
+
+    def __str__(self):
+        return f"TemperatureFilterPipeline-{self._name}"
+
+    @classmethod
+    def from_config(cls, name: str, config: dict, ema_params: dict, timezone: tzinfo):
+        """Build the pipeline from the temperature_filter_params. The EMA stage is always
+        present because the EMA temperature is used by the temperature slope"""
+        stage_names = list(config.get("stages") or [FILTER_STAGE_EMA])
+        if FILTER_STAGE_EMA not in stage_names:
+            stage_names.append(FILTER_STAGE_EMA)
+
+        stages = []
+        for stage_name in stage_names:
+            if stage_name == FILTER_STAGE_SPIKE:
+                stages.append(SpikeRejectionStage(config.get("spike_max_delta", DEFAULT_SPIKE_MAX_DELTA), config.get("spike_max_consecutive", DEFAULT_SPIKE_MAX_CONSECUTIVE)))
+            elif stage_name == FILTER_STAGE_MEDIAN:
+                stages.append(MedianStage(config.get("median_size", DEFAULT_MEDIAN_SIZE)))
+            elif stage_name == FILTER_STAGE_EMA:
+                stages.append(
+                    EmaStage(
+                        ExponentialMovingAverage(
+                            name,
+                            ema_params.get("halflife_sec"),
+                            timezone,
+                            ema_params.get("precision"),
+                            ema_params.get("max_alpha"),
+                        )
+                    )
+                )
+            elif stage_name == FILTER_STAGE_KALMAN:
+                stages.append(KalmanStage(config.get("kalman_process_noise", DEFAULT_KALMAN_PROCESS_NOISE), config.get("kalman_measurement_noise", DEFAULT_KALMAN_MEASUREMENT_NOISE)))
+            else:
+                _LOGGER.warning("%s - unknown temperature filter stage %s. It is ignored", name, stage_name)
+
+        return cls(name, stages, config.get("regulation_input", FILTER_STAGE_RAW))
+
+    def process(self, value: float, timestamp: datetime) -> float | None:
+        """Process a raw measurement through all the stages.
+        Returns the temperature for the regulation"""
+        if value is None or math.isnan(value) or math.isinf(value):
+            return self.regulation_temperature
+
+        self._last_raw = value
+        for stage in self._stages:
+            value = stage.process(value, timestamp)
+            if value is None:
+                break
+        return self.regulation_temperature
+
+    def output(self, stage_name: str) -> float | None:
+        """The last output of a stage"""
+        if stage_name == FILTER_STAGE_RAW:
+            return self._last_raw
+        stage = self._stages_by_name.get(stage_name)
+        return stage.last_value if stage else None
+
+    @property
+    def regulation_stage(self) -> str:
+        """The name of the stage used for the regulation"""
+        return self._regulation_stage
+
+    @property
+    def regulation_temperature(self) -> float | None:
+        """The temperature used by the regulation. The raw one if the stage have no output yet"""
+        value = self.output(self._regulation_stage)
+        return value if value is not None else self._last_raw
+
+    @property
+    def ema(self) -> ExponentialMovingAverage:
+        """The EMA calculation of the EMA stage (always present)"""
+        return self._stages_by_name[FILTER_STAGE_EMA].ema
+
+    @property
+    def stage_names(self) -> list[str]:
+        """The names of the stages in order"""
+        return [stage.name for stage in self._stages]
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """The counters of all the stages"""
+        return {stage.name: stage.stats for stage in self._stages}
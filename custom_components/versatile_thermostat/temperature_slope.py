@@ -0,0 +1,96 @@
+# pylint: disable=line-too-long
+""" The streaming estimator of the temperature slope of a VTherm """
+
+import logging
+import math
+from datetime import datetime
+
+from .const import WINDOW_AUTO_ALGORITHM_REGRESSION, WINDOW_AUTO_ALGORITHM_SLOPE
+from .open_window_algorithm import (
+    WindowOpenDetectionAlgorithm,
+    WindowRegressionDetectionAlgorithm,
+    REGRESSION_WINDOW_SEC,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+LONG_HORIZON_SEC = 1800  # the long horizon slope is calculated on the last 30 min
+LONG_HORIZON_PERIOD_SEC = 30  # ... with at most one measurement every 30 sec
+
+
+class TemperatureSlopeEstimator:
+    """The temperature slope of a VTherm. It is fed once for each temperature measurement
+    by the VTherm and gives:
+    - a short horizon slope, which reacts quickly. It is used by the open window detection, the auto-start/stop and the slope sensor,
+    - a long horizon slope, which is the trend of the temperature over the last 30 min. The measurements
+      are decimated to one by LONG_HORIZON_PERIOD_SEC so that the ring buffer covers the whole horizon
+      whatever the reporting rate of the sensor.
+    All the slopes are in °/hour"""
+
+    def __init__(
+        self,
+        name: str,
+        algorithm: str = WINDOW_AUTO_ALGORITHM_SLOPE,
+        window_sec: float | None = None,
+        long_horizon_sec: float = LONG_HORIZON_SEC,
+    ) -> None:
+        """Init the estimator. algorithm is the algorithm of the short horizon slope"""
+        self._name = name
+        if algorithm == WINDOW_AUTO_ALGORITHM_REGRESSION:
+            self._short_horizon = WindowRegressionDetectionAlgorithm(None, None, window_sec=window_sec or REGRESSION_WINDOW_SEC)
+        else:
+            self._short_horizon = WindowOpenDetectionAlgorithm(None, None)
+        # the points on the border of the window are kept until the next measurement
+        self._long_horizon = WindowRegressionDetectionAlgorithm(
+            None,
+            None,
+            window_sec=long_horizon_sec,
+            max_nb_point=math.ceil(long_horizon_sec / LONG_HORIZON_PERIOD_SEC) + 2,
+        )
+        self._long_horizon_last_datetime: datetime | None = None
+
+    def __str__(self):
+        return f"TemperatureSlopeEstimator-{self._name}"
+
+    def add_temp_measurement(self, temperature: float, datetime_measure: datetime) -> float | None:
+        """Add a new temperature measurement. Returns the short horizon slope"""
+        if temperature is not None and (
+            self._long_horizon_last_datetime is None or (datetime_measure - self._long_horizon_last_datetime).total_seconds() >= LONG_HORIZON_PERIOD_SEC
+        ):
+            self._long_horizon_last_datetime = datetime_measure
+            self._long_horizon.add_temp_measurement(temperature, datetime_measure)
+        slope = self._short_horizon.add_temp_measurement(temperature, datetime_measure)
+        _LOGGER.debug("%s - short slope=%s long slope=%s", self, slope, self.long_slope)
+        return slope
+
+    def check_age_last_measurement(self, temperature: float, datetime_now: datetime) -> float | None:
+        """Update the slopes at datetime_now when no measurement have been received. Returns the short horizon slope"""
+        self._long_horizon.check_age_last_measurement(temperature, datetime_now)
+        return self._short_horizon.check_age_last_measurement(temperature, datetime_now)
+
+    @property
+    def short_slope(self) -> float | None:
+        """The short horizon slope"""
+        return self._short_horizon.last_slope
+
+    @property
+    def long_slope(self) -> float | None:
+        """The long horizon slope"""
+        return self._long_horizon.last_slope
+
+    @property
+    def is_ready(self) -> bool:
+        """True if there is enough measurements for the short horizon slope to be significant"""
+        return self._short_horizon.is_ready
+
+    def is_slope_under(self, threshold: float | None) -> bool:
+        """True if the short horizon slope is significant and under threshold"""
+        if threshold is None or not self.is_ready:
+            return False
+        return self.short_slope < threshold
+
+    def is_slope_over(self, threshold: float | None) -> bool:
+        """True if the short horizon slope is significant and over or equal to threshold"""
+        if threshold is None or not self.is_ready:
+            return False
+        return self.short_slope >= threshold
@@ -0,0 +1,208 @@
+# pylint: disable=line-too-long
+""" An online estimation of the thermal model of a room.
+
+    The room is modelled as a first order RC system:
+        dT/dt = a * (T_ext - T) + b * u
+    where u is the heating power (the on_percent between 0 and 1), 1/a is the thermal
+    time constant in hours and b is the heating gain in °/hour at full power.
+
+    The parameters are learned by a recursive least squares with a forgetting factor.
+    Each observation is the mean slope of the temperature on a period of a few minutes.
+    The memory is O(1): the two parameters and the 2x2 covariance matrix.
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FORGETTING_FACTOR = 0.995  # about 200 observations of memory
+DEFAULT_MIN_PERIOD_SEC = 600  # the period of an observation
+MAX_PERIOD_SEC = 3600  # a longer period without measurement is a gap
+MIN_NB_OBSERVATIONS = 12
+
+# The prior: a time constant of 5 hours and a gain of 2°/h. The initial variance allows the
+# observations to move them quickly
+INITIAL_A = 0.2
+INITIAL_B = 2.0
+INITIAL_VARIANCE = 10.0
+
+
+class ThermalModelEstimator:
+    """The RLS estimator of the RC model of a room"""
+
+    def __init__(
+        self,
+        name: str,
+        forgetting_factor: float = DEFAULT_FORGETTING_FACTOR,
+        min_period_sec: float = DEFAULT_MIN_PERIOD_SEC,
+    ):
+        self._name = name
+        self._forgetting_factor = forgetting_factor
+        self._min_period_sec = min_period_sec
+
+        self._a = INITIAL_A
+        self._b = INITIAL_B
+        # the symmetric covariance matrix [[p11, p12], [p12, p22]]
+        self._p11 = INITIAL_VARIANCE
+        self._p12 = 0.0
+        self._p22 = INITIAL_VARIANCE
+        self._nb_observations = 0
+
+        # the current observation period
+        self._start_datetime: datetime | None = None
+        self._start_temperature: float | None = None
+        self._last_datetime: datetime | None = None
+        self._last_power: float = 0
+        self._power_integral: float = 0
+        self._ext_integral: float = 0
+        self._last_ext_temperature: float | None = None
+
+    def __str__(self):
+        return f"ThermalModelEstimator-{self._name}"
+
+    def reset_observation(self):
+        """Forget the current observation period (after a gap or a disturbance like an open window)"""
+        self._start_datetime = None
+        self._start_temperature = None
+        self._last_datetime = None
+
+    def add_measurement(self, temperature: float | None, ext_temperature: float | None, power: float | None, datetime_measure: datetime) -> bool:
+        """Add a measurement. power is the heating power (between 0 and 1) applied from now to the next measurement.
+        Returns True if a new observation have been used to update the model"""
+        if temperature is None or ext_temperature is None or power is None:
+            self.reset_observation()
+            return False
+
+        power = max(0.0, min(1.0, power))
+
+        if self._start_datetime is None:
+            self._start_observation(temperature, ext_temperature, power, datetime_measure)
+            return False
+        if datetime_measure <= self._last_datetime:
+            return False
+
+        # integrate the power and the external temperature applied since the last measurement
+        dt_sec = (datetime_measure - self._last_datetime).total_seconds()
+        if dt_sec > MAX_PERIOD_SEC:
+            _LOGGER.debug("%s - gap of %.0f sec in the measurements. The observation is restarted", self, dt_sec)
+            self._start_observation(temperature, ext_temperature, power, datetime_measure)
+            return False
+
+        self._power_integral += self._last_power * dt_sec
+        self._ext_integral += (self._last_ext_temperature + ext_temperature) / 2 * dt_sec
+        self._last_datetime = datetime_measure
+        self._last_power = power
+        self._last_ext_temperature = ext_temperature
+
+        period_sec = (datetime_measure - self._start_datetime).total_seconds()
+        if period_sec < self._min_period_sec:
+            return False
+
+        slope = (temperature - self._start_temperature) / period_sec * 3600
+        mean_temperature = (temperature + self._start_temperature) / 2
+        mean_ext_temperature = self._ext_integral / period_sec
+        mean_power = self._power_integral / period_sec
+
+        self._update(mean_ext_temperature - mean_temperature, mean_power, slope)
+        self._start_observation(temperature, ext_temperature, power, datetime_measure)
+        return True
+
+    def _start_observation(self, temperature: float, ext_temperature: float, power: float, datetime_measure: datetime):
+        """Start a new observation period"""
+        self._start_datetime = datetime_measure
+        self._start_temperature = temperature
+        self._last_datetime = datetime_measure
+        self._last_power = power
+        self._last_ext_temperature = ext_temperature
+        self._power_integral = 0
+        self._ext_integral = 0
+
+    def _update(self, x1: float, x2: float, y: float):
+        """The RLS update with the observation y = a * x1 + b * x2"""
+        lam = self._forgetting_factor
+        # P.x
+        px1 = self._p11 * x1 + self._p12 * x2
+        px2 = self._p12 * x1 + self._p22 * x2
+        denominator = lam + x1 * px1 + x2 * px2
+        k1 = px1 / denominator
+        k2 = px2 / denominator
+
+        error = y - (self._a * x1 + self._b * x2)
+        self._a += k1 * error
+        self._b += k2 * error
+
+        # P = (P - k.(P.x)^T) / lambda
+        self._p11 = (self._p11 - k1 * px1) / lam
+        self._p12 = (self._p12 - k1 * px2) / lam
+        self._p22 = (self._p22 - k2 * px2) / lam
+        self._nb_observations += 1
+
+        _LOGGER.debug(
+            "%s - observation x=(%.2f, %.2f) slope=%.2f°/h error=%.2f -> a=%.4f b=%.3f",
+            self,
+            x1,
+            x2,
+            y,
+            error,
+            self._a,
+            self._b,
+        )
+
+    def time_to_reach(self, temperature: float | None, target_temperature: float | None, ext_temperature: float | None, power: float = 1.0) -> float | None:
+        """The time in seconds to heat from temperature to target_temperature with the given power.
+        Returns None if the model is not ready or if the target cannot be reached"""
+        if not self.is_ready or temperature is None or target_temperature is None or ext_temperature is None:
+            return None
+        if target_temperature <= temperature:
+            return 0
+
+        # the temperature tends exponentially to the equilibrium temperature
+        equilibrium = ext_temperature + self._b * power / self._a
+        if target_temperature >= equilibrium:
+            return None
+        return math.log((equilibrium - temperature) / (equilibrium - target_temperature)) / self._a * 3600
+
+    @property
+    def is_ready(self) -> bool:
+        """True if the model have enough observations and physical parameters"""
+        return self._nb_observations >= MIN_NB_OBSERVATIONS and self._a > 0 and self._b > 0
+
+    @property
+    def nb_observations(self) -> int:
+        """The number of observations used"""
+        return self._nb_observations
+
+    @property
+    def time_constant_hours(self) -> float | None:
+        """The thermal time constant of the room in hours"""
+        return round(1 / self._a, 2) if self.is_ready else None
+
+    @property
+    def heating_gain(self) -> float | None:
+        """The heating rate at full power in °/hour (without losses)"""
+        return round(self._b, 3) if self.is_ready else None
+
+    def restore_state(self, state: dict[str, Any]):
+        """Restore the learned parameters (see state)"""
+        self._a = state["a"]
+        self._b = state["b"]
+        self._p11 = state["p11"]
+        self._p12 = state["p12"]
+        self._p22 = state["p22"]
+        self._nb_observations = state["nb_observations"]
+        self.reset_observation()
+
+    @property
+    def state(self) -> dict[str, Any]:
+        """The learned parameters"""
+        return {
+            "a": self._a,
+            "b": self._b,
+            "p11": self._p11,
+            "p12": self._p12,
+            "p22": self._p22,
+            "nb_observations": self._nb_observations,
+        }
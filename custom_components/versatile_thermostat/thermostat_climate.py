@@ -1,6 +1,7 @@
 # pylint: disable=line-too-long, too-many-lines, abstract-method
 """ A climate over climate classe """
 import logging
+from typing import Any
 from datetime import timedelta, datetime
 
 from homeassistant.const import STATE_ON, STATE_UNAVAILABLE, STATE_UNKNOWN
@@ -18,7 +19,11 @@ from homeassistant.components.climate import (
 
 from .commons import round_to_nearest
 from .base_thermostat import BaseThermostat, ConfigData
+from .control_mailbox import serialized_control
+from .timing_stats import timed, TIMING_CONTROL_HEATING, TIMING_RECALCULATE, TIMING_UPDATE_ATTRIBUTES
 from .pi_algorithm import PITemperatureRegulator
+from .mpc_algorithm import MpcTemperatureRegulator
+from .decision_trace import REASON_AUTO_STOP, ACTION_SET_TEMPERATURE
 
 from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
 
@@ -100,12 +105,6 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             )
             self._underlyings.append(under)
 
-        self.choose_auto_regulation_mode(
-            config_entry.get(CONF_AUTO_REGULATION_MODE)
-            if config_entry.get(CONF_AUTO_REGULATION_MODE) is not None
-            else CONF_AUTO_REGULATION_NONE
-        )
-
         self._auto_regulation_dtemp = (
             config_entry.get(CONF_AUTO_REGULATION_DTEMP)
             if config_entry.get(CONF_AUTO_REGULATION_DTEMP) is not None
@@ -117,6 +116,13 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             else 5
         )
 
+        # the period is needed by the model predictive regulation
+        self.choose_auto_regulation_mode(
+            config_entry.get(CONF_AUTO_REGULATION_MODE)
+            if config_entry.get(CONF_AUTO_REGULATION_MODE) is not None
+            else CONF_AUTO_REGULATION_NONE
+        )
+
         self._auto_fan_mode = (
             config_entry.get(CONF_AUTO_FAN_MODE)
             if config_entry.get(CONF_AUTO_FAN_MODE) is not None
@@ -187,10 +193,14 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             force,
         )
 
+        # A control tick is a calculation done once the regulation period is exceeded.
+        # A forced send before (a change of target or of hvac_mode) doesn't advance the PI if the inputs are unchanged
+        is_control_tick = True
         if self._last_regulation_change is not None:
             period = (
                 float((self.now - self._last_regulation_change).total_seconds()) / 60.0
             )
+            is_control_tick = period >= self._auto_regulation_period_min
             if not force and period < self._auto_regulation_period_min:
                 _LOGGER.info(
                     "%s - period (%.1f) min is < %.0f min -> forget the regulation send",
@@ -209,10 +219,14 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         regulation_step = self._auto_regulation_dtemp if self._auto_regulation_dtemp else self._attr_target_temperature_step
         _LOGGER.debug("%s - usage regulation_step: %.2f ", self, regulation_step)
 
-        if self.current_temperature is not None:
+        if isinstance(self._regulation_algo, MpcTemperatureRegulator):
+            # the thermal model is learned in heating only
+            self._regulation_algo.is_cooling = self.hvac_mode == HVACMode.COOL
+
+        if self.regulation_temperature is not None:
             new_regulated_temp = round_to_nearest(
                 self._regulation_algo.calculate_regulated_temperature(
-                    self.current_temperature, self._cur_ext_temp
+                    self.regulation_temperature, self._cur_ext_temp, is_control_tick
                 ),
                 regulation_step,
             )
@@ -382,12 +396,33 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
                     DOMAIN,
                 )
 
+        elif self._auto_regulation_mode == CONF_AUTO_REGULATION_MPC:
+            # The PI medium is used while the thermal model of the room is learned
+            self._regulation_algo = MpcTemperatureRegulator(
+                self.target_temperature,
+                self.optimal_start_manager,
+                self._auto_regulation_period_min,
+                RegulationParamMedium.offset_max,
+                PITemperatureRegulator(
+                    self.target_temperature,
+                    RegulationParamMedium.kp,
+                    RegulationParamMedium.ki,
+                    RegulationParamMedium.k_ext,
+                    RegulationParamMedium.offset_max,
+                    RegulationParamMedium.stabilization_threshold,
+                    RegulationParamMedium.accumulated_error_threshold,
+                ),
+                self._auto_regulation_dtemp or self._attr_target_temperature_step,
+            )
+
         if not self._regulation_algo:
             # A default empty algo (which does nothing)
             self._regulation_algo = PITemperatureRegulator(
                 self.target_temperature, 0, 0, 0, 0, 0.1, 0
             )
 
+        self._regulation_algo.set_resolution(self._attr_target_temperature_step)
+
     def choose_auto_fan_mode(self, auto_fan_mode: str):
         """Choose the correct fan mode depending of the underlying capacities and the configuration"""
 
@@ -461,6 +496,23 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         # Issue 325 - do only once (in post_init and not here)
         # self.choose_auto_regulation_mode(self._auto_regulation_mode)
 
+    @overrides
+    def get_learned_state(self) -> dict[str, Any]:
+        """Add the accumulated error of the regulation and the auto-start/stop"""
+        learned_state = super().get_learned_state()
+        learned_state["regulation_accumulated_error"] = self._regulation_algo.accumulated_error if self._regulation_algo else None
+        learned_state["auto_start_stop"] = self._auto_start_stop_manager.learned_state
+        return learned_state
+
+    @overrides
+    def restore_learned_state(self, learned_state: dict[str, Any]):
+        """Restore the accumulated error of the regulation and the auto-start/stop"""
+        super().restore_learned_state(learned_state)
+        if learned_state.get("regulation_accumulated_error") is not None and self._regulation_algo:
+            self._regulation_algo.set_accumulated_error(learned_state["regulation_accumulated_error"])
+        if learned_state.get("auto_start_stop"):
+            self._auto_start_stop_manager.restore_learned_state(learned_state["auto_start_stop"])
+
     @overrides
     def restore_specific_previous_state(self, old_state: State):
         """Restore my specific attributes from previous state"""
@@ -474,6 +526,7 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             )
 
     @overrides
+    @timed(TIMING_UPDATE_ATTRIBUTES)
     def update_custom_attributes(self):
         """Custom attributes"""
         super().update_custom_attributes()
@@ -498,6 +551,13 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             self._attr_extra_state_attributes["regulation_accumulated_error"] = (
                 self._regulation_algo.accumulated_error
             )
+            if isinstance(self._regulation_algo, MpcTemperatureRegulator):
+                self._attr_extra_state_attributes["regulation_predicted_temperature"] = (
+                    self._regulation_algo.predicted_temperature
+                )
+                self._attr_extra_state_attributes["regulation_underlying_offset"] = (
+                    self._regulation_algo.underlying_offset
+                )
 
         self._attr_extra_state_attributes["auto_fan_mode"] = self.auto_fan_mode
         self._attr_extra_state_attributes["current_auto_fan_mode"] = (
@@ -529,6 +589,7 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         )
 
     @overrides
+    @timed(TIMING_RECALCULATE)
     def recalculate(self):
         """A utility function to force the calculation of a the algo and
         update the custom attributes and write the state
@@ -867,6 +928,8 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         await end_climate_changed(changes)
 
     @overrides
+    @serialized_control
+    @timed(TIMING_CONTROL_HEATING)
     async def async_control_heating(self, force=False, _=None) -> bool:
         """The main function used to run the calculation at each cycle"""
         ret = await super().async_control_heating(force, _)
@@ -874,12 +937,20 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         # Check if we need to auto start/stop the Vtherm
         continu = await self.auto_start_stop_manager.refresh_state()
         if not continu:
+            self._decision_trace.amend_last(reasons=REASON_AUTO_STOP)
             return ret
 
         # Continue the normal async_control_heating
 
         # Send the regulated temperature to the underlyings
+        last_regulation_change = self._last_regulation_change
         await self._send_regulated_temperature()
+        # the action recorded by the base class (a turn off for example) is kept if nothing was sent
+        sent = self._last_regulation_change != last_regulation_change
+        self._decision_trace.amend_last(
+            output=self._regulated_target_temp,
+            action=ACTION_SET_TEMPERATURE if sent else None,
+        )
 
         if self._auto_fan_mode and self._auto_fan_mode != CONF_AUTO_FAN_NONE:
             await self._send_auto_fan_mode()
@@ -911,6 +982,23 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         """Get the regulated target temperature"""
         return self._regulated_target_temp
 
+    @overrides
+    @property
+    def decision_output(self) -> float | None:
+        """The output of the control decision is the regulated temperature"""
+        return self._regulated_target_temp
+
+    @overrides
+    @property
+    def algorithm_cache_stats(self) -> dict[str, dict[str, int]]:
+        """The counters of the memoization of the algorithms"""
+        stats = super().algorithm_cache_stats
+        if isinstance(self._regulation_algo, MpcTemperatureRegulator):
+            stats["mpc"] = self._regulation_algo.cache_stats
+        elif self._regulation_algo:
+            stats["pi"] = self._regulation_algo.cache_stats
+        return stats
+
     @property
     def is_regulated(self) -> bool:
         """Check if the ThermostatOverClimate is regulated"""
@@ -1127,7 +1215,7 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
         """Called by a service call:
         service: versatile_thermostat.set_auto_regulation_mode
         data:
-            auto_regulation_mode: [None | Light | Medium | Strong]
+            auto_regulation_mode: [None | Light | Medium | Strong | Slow | Expert | MPC]
         target:
             entity_id: climate.thermostat_1
         """
@@ -1148,6 +1236,8 @@ class ThermostatOverClimate(BaseThermostat[UnderlyingClimate]):
             self.choose_auto_regulation_mode(CONF_AUTO_REGULATION_SLOW)
         elif auto_regulation_mode == "Expert":
             self.choose_auto_regulation_mode(CONF_AUTO_REGULATION_EXPERT)
+        elif auto_regulation_mode == "MPC":
+            self.choose_auto_regulation_mode(CONF_AUTO_REGULATION_MPC)
         else:
             _LOGGER.warning(
                 "%s - auto_regulation_mode %s is not supported",
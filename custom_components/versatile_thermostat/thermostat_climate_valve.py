@@ -12,6 +12,7 @@ from .underlyings import UnderlyingValveRegulation
 # from .commons import NowClass, round_to_nearest
 from .base_thermostat import ConfigData
 from .thermostat_climate import ThermostatOverClimate
+from .timing_stats import timed, TIMING_RECALCULATE, TIMING_UPDATE_ATTRIBUTES
 from .prop_algorithm import PropAlgorithm
 
 from .const import *  # pylint: disable=wildcard-import, unused-wildcard-import
@@ -84,6 +85,7 @@ class ThermostatOverClimateValve(ThermostatOverClimate):
             self._minimal_activation_delay,
             self.name,
         )
+        self._prop_algorithm.set_resolution(self._attr_target_temperature_step)
 
         offset_list = config_entry.get(CONF_OFFSET_CALIBRATION_LIST, [])
         opening_list = config_entry.get(CONF_OPENING_DEGREE_LIST)
@@ -117,6 +119,7 @@ class ThermostatOverClimateValve(ThermostatOverClimate):
             self._underlyings_valve_regulation.append(under)
 
     @overrides
+    @timed(TIMING_UPDATE_ATTRIBUTES)
     def update_custom_attributes(self):
         """Custom attributes"""
         super().update_custom_attributes()
@@ -173,6 +176,7 @@ class ThermostatOverClimateValve(ThermostatOverClimate):
         )
 
     @overrides
+    @timed(TIMING_RECALCULATE)
     def recalculate(self):
         """A utility function to force the calculation of a the algo and
         update the custom attributes and write the state
@@ -194,12 +198,7 @@ class ThermostatOverClimateValve(ThermostatOverClimate):
                 )
                 return
 
-        self._prop_algorithm.calculate(
-            self._target_temp,
-            self._cur_temp,
-            self._cur_ext_temp,
-            self._hvac_mode or HVACMode.OFF,
-        )
+        self.calculate_prop_algorithm()
 
         new_valve_percent = round(
             max(0, min(self.proportional_algorithm.on_percent, 1)) * 100
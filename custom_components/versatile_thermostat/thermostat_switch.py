@@ -18,6 +18,7 @@ from .const import (
 )
 
 from .base_thermostat import BaseThermostat, ConfigData
+from .timing_stats import timed, TIMING_RECALCULATE, TIMING_UPDATE_ATTRIBUTES
 from .underlyings import UnderlyingSwitch
 from .prop_algorithm import PropAlgorithm
 
@@ -74,6 +75,7 @@ class ThermostatOverSwitch(BaseThermostat[UnderlyingSwitch]):
             self.name,
             max_on_percent=self._max_on_percent,
         )
+        self._prop_algorithm.set_resolution(self._attr_target_temperature_step)
 
         lst_switches = config_entry.get(CONF_UNDERLYING_LIST)
 
@@ -111,6 +113,7 @@ class ThermostatOverSwitch(BaseThermostat[UnderlyingSwitch]):
         self.hass.create_task(self.async_control_heating())
 
     @overrides
+    @timed(TIMING_UPDATE_ATTRIBUTES)
     def update_custom_attributes(self):
         """Custom attributes"""
         super().update_custom_attributes()
@@ -150,17 +153,13 @@ class ThermostatOverSwitch(BaseThermostat[UnderlyingSwitch]):
         )
 
     @overrides
+    @timed(TIMING_RECALCULATE)
     def recalculate(self):
         """A utility function to force the calculation of a the algo and
         update the custom attributes and write the state
         """
         _LOGGER.debug("%s - recalculate all", self)
-        self._prop_algorithm.calculate(
-            self._target_temp,
-            self._cur_temp,
-            self._cur_ext_temp,
-            self._hvac_mode or HVACMode.OFF,
-        )
+        self.calculate_prop_algorithm()
         self.update_custom_attributes()
         # already done bu update_custom_attributes
         # self.async_write_ha_state()
@@ -12,6 +12,7 @@ from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.components.climate import HVACMode
 
 from .base_thermostat import BaseThermostat, ConfigData
+from .timing_stats import timed, TIMING_RECALCULATE, TIMING_UPDATE_ATTRIBUTES
 from .prop_algorithm import PropAlgorithm
 
 from .const import (
@@ -99,6 +100,7 @@ class ThermostatOverValve(BaseThermostat[UnderlyingValve]):  # pylint: disable=a
             self.name,
             max_on_percent=self._max_on_percent,
         )
+        self._prop_algorithm.set_resolution(self._attr_target_temperature_step)
 
         lst_valves = config_entry.get(CONF_UNDERLYING_LIST)
 
@@ -145,6 +147,7 @@ class ThermostatOverValve(BaseThermostat[UnderlyingValve]):  # pylint: disable=a
         )
 
     @overrides
+    @timed(TIMING_UPDATE_ATTRIBUTES)
     def update_custom_attributes(self):
         """Custom attributes"""
         super().update_custom_attributes()
@@ -193,6 +196,7 @@ class ThermostatOverValve(BaseThermostat[UnderlyingValve]):  # pylint: disable=a
         )
 
     @overrides
+    @timed(TIMING_RECALCULATE)
     def recalculate(self):
         """A utility function to force the calculation of a the algo and
         update the custom attributes and write the state
@@ -212,12 +216,7 @@ class ThermostatOverValve(BaseThermostat[UnderlyingValve]):  # pylint: disable=a
                 )
                 return
 
-        self._prop_algorithm.calculate(
-            self._target_temp,
-            self._cur_temp,
-            self._cur_ext_temp,
-            self._hvac_mode or HVACMode.OFF,
-        )
+        self.calculate_prop_algorithm()
 
         new_valve_percent = round(
             max(0, min(self.proportional_algorithm.on_percent, 1)) * 100
@@ -0,0 +1,170 @@
+# pylint: disable=line-too-long
+""" The timing instrumentation of the hot paths.
+
+    Each hot path (the control pass, the recalculation, the update of the attributes, the service
+    calls to the underlyings, the shedding calculation, ...) has a histogram of its durations with
+    fixed buckets. Recording a duration only updates preallocated counters: there is no allocation
+    and no formatting. The histograms are decoded when the diagnostics or the timing sensors are read.
+"""
+
+import asyncio
+import functools
+from array import array
+from bisect import bisect_left
+from time import monotonic
+from typing import Any, Iterable
+
+# The hot paths of a VTherm
+TIMING_CONTROL_HEATING = "control_heating"
+TIMING_RECALCULATE = "recalculate"
+TIMING_UPDATE_ATTRIBUTES = "update_custom_attributes"
+TIMING_SERVICE_CALL = "service_call"
+VTHERM_HOT_PATHS = [TIMING_CONTROL_HEATING, TIMING_RECALCULATE, TIMING_UPDATE_ATTRIBUTES, TIMING_SERVICE_CALL]
+
+# The central hot paths
+TIMING_CALCULATE_SHEDDING = "calculate_shedding"
+TIMING_CENTRAL_MODE_CHANGE = "central_mode_change"
+CENTRAL_HOT_PATHS = [TIMING_CALCULATE_SHEDDING, TIMING_CENTRAL_MODE_CHANGE]
+
+# The paths which are not run inside another one. The others are nested (the recalculation, the update
+# of the attributes and the service calls run in the control pass, the central mode change runs control
+# passes) so only these ones are summed to get the time spent
+OUTER_HOT_PATHS = [TIMING_CONTROL_HEATING, TIMING_CALCULATE_SHEDDING]
+
+# The upper bounds of the buckets in ms. The last bucket has no upper bound
+BUCKET_BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+_BUCKET_BOUNDS_SEC = tuple(bound / 1000 for bound in BUCKET_BOUNDS_MS)
+BUCKET_NAMES = [f"<{bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">={BUCKET_BOUNDS_MS[-1]}ms"]
+
+
+class TimingHistogram:
+    """The durations of a hot path in fixed buckets"""
+
+    __slots__ = ("_buckets", "_count", "_total", "_max", "is_running")
+
+    def __init__(self):
+        self._buckets = array("L", [0] * (len(BUCKET_BOUNDS_MS) + 1))
+        self._count: int = 0
+        self._total: float = 0.0
+        self._max: float = 0.0
+        # True while the path is timed. The nested calls (a call to super() for example) are not timed again
+        self.is_running: bool = False
+
+    def record(self, duration_sec: float):
+        """Record a duration"""
+        self._buckets[bisect_left(_BUCKET_BOUNDS_SEC, duration_sec)] += 1
+        self._count += 1
+        self._total += duration_sec
+        if duration_sec > self._max:
+            self._max = duration_sec
+
+    def merge(self, other: "TimingHistogram"):
+        """Add the durations of another histogram"""
+        for i, nb in enumerate(other._buckets):  # pylint: disable=protected-access
+            self._buckets[i] += nb
+        self._count += other.count
+        self._total += other.total_sec
+        self._max = max(self._max, other._max)  # pylint: disable=protected-access
+
+    @property
+    def count(self) -> int:
+        """The number of recorded durations"""
+        return self._count
+
+    @property
+    def total_sec(self) -> float:
+        """The sum of the recorded durations"""
+        return self._total
+
+    @property
+    def mean_ms(self) -> float | None:
+        """The mean duration in ms"""
+        return self._total * 1000 / self._count if self._count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """The decoded histogram"""
+        return {
+            "count": self._count,
+            "total_ms": round(self._total * 1000, 3),
+            "mean_ms": round(self.mean_ms, 3) if self._count else None,
+            "max_ms": round(self._max * 1000, 3),
+            "buckets": {name: nb for name, nb in zip(BUCKET_NAMES, self._buckets) if nb},
+        }
+
+
+class HotPathTimings:
+    """The histograms of a set of hot paths"""
+
+    def __init__(self, paths: Iterable[str]):
+        self._histograms: dict[str, TimingHistogram] = {path: TimingHistogram() for path in paths}
+
+    def __getitem__(self, path: str) -> TimingHistogram:
+        return self._histograms[path]
+
+    def record(self, path: str, duration_sec: float):
+        """Record a duration of a hot path"""
+        self._histograms[path].record(duration_sec)
+
+    def merge(self, other: "HotPathTimings"):
+        """Add the durations of the other timings. The unknown paths are added"""
+        for path, histogram in other.histograms.items():
+            self._histograms.setdefault(path, TimingHistogram()).merge(histogram)
+
+    @property
+    def histograms(self) -> dict[str, TimingHistogram]:
+        """The histograms by path"""
+        return self._histograms
+
+    @property
+    def total_sec(self) -> float:
+        """The sum of the durations of all the hot paths. The nested paths are counted several times"""
+        return sum(histogram.total_sec for histogram in self._histograms.values())
+
+    @property
+    def outer_total_sec(self) -> float:
+        """The time spent in the hot paths, counted once"""
+        return sum(self._histograms[path].total_sec for path in OUTER_HOT_PATHS if path in self._histograms)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """The decoded histograms by path"""
+        return {path: histogram.as_dict() for path, histogram in self._histograms.items()}
+
+
+def timed(path: str):
+    """Decorator which records the durations of a method in the histogram path of self.timings.
+    The nested calls of the same path are not recorded twice"""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                histogram = self.timings[path]
+                if histogram.is_running:
+                    return await func(self, *args, **kwargs)
+                histogram.is_running = True
+                start = monotonic()
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    histogram.is_running = False
+                    histogram.record(monotonic() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            histogram = self.timings[path]
+            if histogram.is_running:
+                return func(self, *args, **kwargs)
+            histogram.is_running = True
+            start = monotonic()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                histogram.is_running = False
+                histogram.record(monotonic() - start)
+
+        return wrapper
+
+    return decorator
@@ -2,6 +2,7 @@
 
 """ Underlying entities classes """
 import logging
+from time import monotonic
 from typing import Any
 from enum import StrEnum
 
@@ -34,6 +35,7 @@ from homeassistant.util.unit_conversion import TemperatureConverter
 
 from .const import UnknownEntity, overrides, get_safe_float
 from .keep_alive import IntervalCaller
+from .timing_stats import TIMING_SERVICE_CALL
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -84,6 +86,14 @@ class UnderlyingEntity:
     def __str__(self):
         return str(self._thermostat) + "-" + self._entity_id
 
+    async def async_call_service(self, *args, **kwargs):
+        """Call a service of Home Assistant and record its duration in the timings of the VTherm"""
+        start = monotonic()
+        try:
+            await self._hass.services.async_call(*args, **kwargs)
+        finally:
+            self._thermostat.timings.record(TIMING_SERVICE_CALL, monotonic() - start)
+
     @property
     def entity_id(self):
         """The entiy id represented by this class"""
@@ -316,7 +326,7 @@ class UnderlyingSwitch(UnderlyingEntity):
         try:
             try:
                 data = {ATTR_ENTITY_ID: self._entity_id}
-                await self._hass.services.async_call(domain, command, data)
+                await self.async_call_service(domain, command, data)
                 self._keep_alive.set_async_action(self._keep_alive_callback)
             except Exception:
                 self._keep_alive.cancel()
@@ -337,7 +347,7 @@ class UnderlyingSwitch(UnderlyingEntity):
         try:
             try:
                 data = {ATTR_ENTITY_ID: self._entity_id}
-                await self._hass.services.async_call(domain, command, data)
+                await self.async_call_service(domain, command, data)
                 self._keep_alive.set_async_action(self._keep_alive_callback)
                 return True
             except Exception:
@@ -574,7 +584,7 @@ class UnderlyingClimate(UnderlyingEntity):
             return False
 
         data = {ATTR_ENTITY_ID: self._entity_id, "hvac_mode": hvac_mode}
-        await self._hass.services.async_call(
+        await self.async_call_service(
             CLIMATE_DOMAIN,
             SERVICE_SET_HVAC_MODE,
             data,
@@ -603,7 +613,7 @@ class UnderlyingClimate(UnderlyingEntity):
             "fan_mode": fan_mode,
         }
 
-        await self._hass.services.async_call(
+        await self.async_call_service(
             CLIMATE_DOMAIN,
             SERVICE_SET_FAN_MODE,
             data,
@@ -619,7 +629,7 @@ class UnderlyingClimate(UnderlyingEntity):
             "humidity": humidity,
         }
 
-        await self._hass.services.async_call(
+        await self.async_call_service(
             CLIMATE_DOMAIN,
             SERVICE_SET_HUMIDITY,
             data,
@@ -635,7 +645,7 @@ class UnderlyingClimate(UnderlyingEntity):
             "swing_mode": swing_mode,
         }
 
-        await self._hass.services.async_call(
+        await self.async_call_service(
             CLIMATE_DOMAIN,
             SERVICE_SET_SWING_MODE,
             data,
@@ -666,7 +676,7 @@ class UnderlyingClimate(UnderlyingEntity):
         if ClimateEntityFeature.TARGET_TEMPERATURE in self._underlying_climate.supported_features:
             data["temperature"] = target_temp
 
-        await self._hass.services.async_call(
+        await self.async_call_service(
             CLIMATE_DOMAIN,
             SERVICE_SET_TEMPERATURE,
             data,
@@ -921,7 +931,7 @@ class UnderlyingValve(UnderlyingEntity):
             data = {"value": value}
             target = {ATTR_ENTITY_ID: number_entity_id}
             domain = number_entity_id.split(".")[0]
-            await self._hass.services.async_call(
+            await self.async_call_service(
                 domain=domain,
                 service=SERVICE_SET_VALUE,
                 service_data=data,
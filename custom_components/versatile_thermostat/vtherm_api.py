@@ -1,7 +1,9 @@
 """ The API of Versatile Thermostat"""
 
+import asyncio
 import logging
 from datetime import datetime
+from time import monotonic
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
@@ -17,10 +19,35 @@ from .const import (
     CONF_THERMOSTAT_TYPE,
     CONF_THERMOSTAT_CENTRAL_CONFIG,
     CONF_MAX_ON_PERCENT,
+    CONF_EVENT_PAYLOAD,
+    CONF_OUTDOOR_TEMP_PARAMS,
+    CONF_TEMP_DEBOUNCE_PARAMS,
+    CONF_STARTUP_CONCURRENCY,
+    CONF_WINDOW_AUTO_PARAMS,
+    CONF_TEMPERATURE_FILTER_PARAMS,
+    CONF_OPTIMAL_START_PARAMS,
+    CONF_STATE_STORE_PARAMS,
+    CONF_WARM_START_PARAMS,
+    DEFAULT_STARTUP_CONCURRENCY,
+    DEFAULT_OPTIMAL_START_MAX_LEAD_MIN,
+    DEFAULT_STATE_STORE_SAVE_DELAY_SEC,
+    DEFAULT_WARM_START_HISTORY_MIN,
+    DEFAULT_WARM_START_MAX_SAMPLES,
+    WINDOW_AUTO_ALGORITHM_SLOPE,
+    EVENT_PAYLOAD_MINIMAL,
+    EVENT_PAYLOAD_DELTA,
+    EVENT_PAYLOAD_DEFAULT_KEY,
+    DEFAULT_EVENT_PAYLOAD,
+    EventType,
     NowClass,
 )
 
 from .central_feature_power_manager import CentralFeaturePowerManager
+from .sensor_hub import SensorSubscriptionHub
+from .central_sensor_watchdog import CentralSensorWatchdog
+from .state_store import VThermStateStore
+from .warm_start import RecorderWarmStart
+from .timing_stats import HotPathTimings, CENTRAL_HOT_PATHS, TIMING_CENTRAL_MODE_CHANGE
 
 VTHERM_API_NAME = "vtherm_api"
 
@@ -65,10 +92,36 @@ class VersatileThermostatAPI(dict):
         self._central_mode_select = None
         # A dict that will store all Number entities which holds the temperature
         self._number_temperatures = dict()
+        # The VTherms which uses a central temperature by (config_id, preset_name)
+        self._central_preset_dependencies: dict[tuple[str, str], set] = dict()
         self._max_on_percent = None
+        self._event_payload = dict()
+        self._outdoor_temp_params = dict()
+        self._temp_debounce_params = dict()
+        self._startup_concurrency = DEFAULT_STARTUP_CONCURRENCY
+        self._window_auto_params = dict()
+        self._temperature_filter_params = dict()
+        self._optimal_start_params = dict()
+        self._state_store_params = dict()
+        self._warm_start_params = dict()
+        # The startup durations in sec by VTherm entity_id and the total one
+        self._startup_durations: dict[str, float] = dict()
+        self._startup_total_duration: float | None = None
+        self._central_mode_durations: dict[str, float] = dict()
+        self._central_mode_total_duration: float | None = None
+        # The durations of the central hot paths
+        self._timings = HotPathTimings(CENTRAL_HOT_PATHS)
+        # The central mode changes are applied one after the other
+        self._central_mode_lock = asyncio.Lock()
+        # The last state_attributes sent by (entity_id, event_type). Used by the delta payload policy
+        self._last_event_attributes = dict()
         self._central_power_manager = CentralFeaturePowerManager(
             VersatileThermostatAPI._hass, self
         )
+        self._sensor_hub = SensorSubscriptionHub(VersatileThermostatAPI._hass)
+        self._sensor_watchdog = CentralSensorWatchdog(VersatileThermostatAPI._hass, self)
+        self._state_store = VThermStateStore(VersatileThermostatAPI._hass, self)
+        self._warm_start = RecorderWarmStart(VersatileThermostatAPI._hass, self)
 
         # the current time (for testing purpose)
         self._now = None
@@ -99,8 +152,9 @@ class VersatileThermostatAPI(dict):
         _LOGGER.debug("Remove the entry %s", entry.entry_id)
         VersatileThermostatAPI._hass.data[DOMAIN].pop(entry.entry_id)
         # If not more entries are preset, remove the API
-        if len(self) == 0:
+        if all(key == VTHERM_API_NAME for key in VersatileThermostatAPI._hass.data[DOMAIN]):
             _LOGGER.debug("No more entries-> Remove the API from DOMAIN")
+            self._sensor_hub.stop()
             VersatileThermostatAPI._hass.data.pop(DOMAIN)
 
     def set_global_config(self, config):
@@ -125,6 +179,64 @@ class VersatileThermostatAPI(dict):
                 "We have found max_on_percent setting %s", self._max_on_percent
             )
 
+        self._event_payload = config.get(CONF_EVENT_PAYLOAD) or dict()
+        if self._event_payload:
+            _LOGGER.debug("We have found event_payload setting %s", self._event_payload)
+        self._last_event_attributes = dict()
+
+        self._outdoor_temp_params = config.get(CONF_OUTDOOR_TEMP_PARAMS) or dict()
+        if self._outdoor_temp_params:
+            _LOGGER.debug("We have found outdoor_temp_params setting %s", self._outdoor_temp_params)
+
+        self._temp_debounce_params = config.get(CONF_TEMP_DEBOUNCE_PARAMS) or dict()
+        if self._temp_debounce_params:
+            _LOGGER.debug("We have found temperature_debounce_params setting %s", self._temp_debounce_params)
+
+        self._startup_concurrency = config.get(CONF_STARTUP_CONCURRENCY) or DEFAULT_STARTUP_CONCURRENCY
+
+        self._window_auto_params = config.get(CONF_WINDOW_AUTO_PARAMS) or dict()
+        if self._window_auto_params:
+            _LOGGER.debug("We have found window_auto_params setting %s", self._window_auto_params)
+
+        self._temperature_filter_params = config.get(CONF_TEMPERATURE_FILTER_PARAMS) or dict()
+        if self._temperature_filter_params:
+            _LOGGER.debug("We have found temperature_filter_params setting %s", self._temperature_filter_params)
+
+        self._optimal_start_params = config.get(CONF_OPTIMAL_START_PARAMS) or dict()
+        if self._optimal_start_params:
+            _LOGGER.debug("We have found optimal_start_params setting %s", self._optimal_start_params)
+
+        self._state_store_params = config.get(CONF_STATE_STORE_PARAMS) or dict()
+        if self._state_store_params:
+            _LOGGER.debug("We have found state_store_params setting %s", self._state_store_params)
+
+        self._warm_start_params = config.get(CONF_WARM_START_PARAMS) or dict()
+        if self._warm_start_params:
+            _LOGGER.debug("We have found warm_start_params setting %s", self._warm_start_params)
+
+    def get_event_payload(self, event_type: EventType) -> str:
+        """Get the payload policy of an event type"""
+        return self._event_payload.get(
+            event_type.value,
+            self._event_payload.get(EVENT_PAYLOAD_DEFAULT_KEY, DEFAULT_EVENT_PAYLOAD),
+        )
+
+    def get_event_state_attributes(self, event_type: EventType, entity) -> dict | None:
+        """Get the state_attributes to add to an event depending on the payload
+        policy of the event type. None means no state_attributes at all"""
+        payload = self.get_event_payload(event_type)
+        if payload == EVENT_PAYLOAD_MINIMAL:
+            return None
+
+        state_attributes = entity.state_attributes
+        if payload != EVENT_PAYLOAD_DELTA:
+            return state_attributes
+
+        key = (entity.entity_id, event_type)
+        last_attributes = self._last_event_attributes.get(key, {})
+        self._last_event_attributes[key] = dict(state_attributes)
+        return {name: value for name, value in state_attributes.items() if name not in last_attributes or last_attributes[name] != value}
+
     def register_central_boiler(self, central_boiler_entity):
         """Register the central boiler entity. This is used by the CentralBoilerBinarySensor
         class to register itself at creation"""
@@ -163,47 +275,96 @@ class VersatileThermostatAPI(dict):
                 return entity.state
         return None
 
-    async def init_vtherm_links(self, entry_id=None):
+    def register_central_preset_dependencies(self, vtherm, config_id: str | None, preset_names):
+        """Register the central temperature Number used by a VTherm. The previous
+        registrations of the VTherm are replaced"""
+        self.unregister_central_preset_dependencies(vtherm)
+        if config_id is None:
+            return
+        for preset_name in preset_names:
+            self._central_preset_dependencies.setdefault((config_id, preset_name), set()).add(vtherm)
+
+    def unregister_central_preset_dependencies(self, vtherm):
+        """Remove all the central temperature dependencies of a VTherm"""
+        for key in list(self._central_preset_dependencies):
+            dependents = self._central_preset_dependencies[key]
+            dependents.discard(vtherm)
+            if not dependents:
+                del self._central_preset_dependencies[key]
+
+    def find_central_preset_dependents(self, config_id: str, preset_name: str) -> list:
+        """The VTherms which uses the central temperature Number preset_name"""
+        return list(self._central_preset_dependencies.get((config_id, preset_name), []))
+
+    async def update_vtherm_preset_with_central(self, config_id: str, preset_name: str):
+        """Update the preset of the VTherms which uses the central temperature Number preset_name"""
+        dependents = self.find_central_preset_dependents(config_id, preset_name)
+        _LOGGER.debug("The central preset %s is used by %d VTherm(s)", preset_name, len(dependents))
+        for vtherm in dependents:
+            await vtherm.update_central_preset(preset_name)
+
+    async def init_vtherm_links(self, entry_id=None, entry_ids: set[str] | None = None):
         """Initialize all VTherms entities links
         This method is called when HA is fully started (and all entities should be initialized)
         Or when we need to reload all VTherm links (with Number temp entities, central boiler, ...)
         If entry_id is set, only the VTherm of this entry will be reloaded
+        If entry_ids is set, only the VTherms of these entries will be reloaded
         """
         await self.reload_central_boiler_binary_listener()
         await self.reload_central_boiler_entities_list()
+        if entry_id is not None:
+            entry_ids = {entry_id}
         # Initialization of all preset for all VTherm
-        component: EntityComponent[ClimateEntity] = self._hass.data.get(
-            CLIMATE_DOMAIN, None
-        )
-        if component:
-            for entity in component.entities:
-                # A little hack to test if the climate is a VTherm. Cannot use isinstance
-                # due to circular dependency of BaseThermostat
-                if (
-                    entity.device_info
-                    and entity.device_info.get("model", None) == DOMAIN
-                ):
-                    if entry_id is None or entry_id == entity.unique_id:
-                        await entity.async_startup(self.find_central_configuration())
-
-        # start listening for the central power manager if not only one vtherm reload
-        if not entry_id:
+        vtherms = [entity for entity in self.find_all_vtherms() if entry_ids is None or entity.unique_id in entry_ids]
+        central_configuration = self.find_central_configuration()
+
+        # The VTherms are started concurrently, but no more than startup_concurrency at the same time
+        semaphore = asyncio.Semaphore(self._startup_concurrency)
+
+        async def startup(entity):
+            async with semaphore:
+                start = monotonic()
+                try:
+                    await entity.async_startup(central_configuration)
+                finally:
+                    self._startup_durations[entity.entity_id] = monotonic() - start
+
+        start = monotonic()
+        # the recent history of the temperature sensors of all the VTherms is read in one query
+        await self._warm_start.async_prefetch([entity.temperature_sensor_entity_id for entity in vtherms])
+        results = await asyncio.gather(*[startup(entity) for entity in vtherms], return_exceptions=True)
+        for entity, result in zip(vtherms, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("%s - Error while starting the VTherm. Error is: %s", entity, result, exc_info=result)
+        self._warm_start.clear()
+
+        # start listening for the central power manager if not only some vtherms reload
+        if entry_ids is None:
+            self._startup_total_duration = monotonic() - start
+            _LOGGER.info("All VTherms (%d) have been started in %.3f sec", len(vtherms), self._startup_total_duration)
             await self.central_power_manager.start_listening()
 
-    async def init_vtherm_preset_with_central(self):
-        """Init all VTherm presets when the VTherm uses central temperature"""
-        # Initialization of all preset for all VTherm
+    async def async_update_vtherm_in_place(self, entry: ConfigEntry) -> bool:
+        """Try to apply the new configuration of entry to its VTherm without recreating it.
+        Return False if the VTherm must be reloaded"""
+        vtherm = next((entity for entity in self.find_all_vtherms() if entity.unique_id == entry.entry_id), None)
+        if vtherm is None or not vtherm.can_update_config_in_place(entry.data):
+            return False
+
+        await vtherm.async_update_config_in_place(entry.data)
+        return True
+
+    def find_all_vtherms(self) -> list:
+        """Find all the VTherm climate entities"""
         component: EntityComponent[ClimateEntity] = self._hass.data.get(
             CLIMATE_DOMAIN, None
         )
-        if component:
-            for entity in component.entities:
-                if (
-                    entity.device_info
-                    and entity.device_info.get("model", None) == DOMAIN
-                    and entity.use_central_config_temperature
-                ):
-                    await entity.init_presets(self.find_central_configuration())
+        if not component:
+            return []
+
+        # A little hack to test if the climate is a VTherm. Cannot use isinstance
+        # due to circular dependency of BaseThermostat
+        return [entity for entity in component.entities if entity.device_info and entity.device_info.get("model", None) == DOMAIN]
 
     async def reload_central_boiler_binary_listener(self):
         """Reloads the BinarySensor entity which listen to the number of
@@ -225,17 +386,51 @@ class VersatileThermostatAPI(dict):
         if self._central_mode_select is None:
             return
 
-        # Update all VTherm states
-        component: EntityComponent[ClimateEntity] = self.hass.data[CLIMATE_DOMAIN]
-        for entity in component.entities:
-            if entity.device_info and entity.device_info.get("model", None) == DOMAIN:
-                _LOGGER.debug(
-                    "Changing the central_mode. We have find %s to update",
-                    entity.name,
-                )
-                await entity.check_central_mode(
-                    self._central_mode_select.state, old_central_mode
-                )
+        async with self._central_mode_lock:
+            await self._apply_central_mode(self._central_mode_select.state, old_central_mode)
+
+    async def _apply_central_mode(self, new_central_mode: str | None, old_central_mode: str | None):
+        """Update all VTherm states with the new central_mode.
+        The VTherms are updated concurrently (but no more than startup_concurrency at the same time)
+        except the ones with power management: they are restarted one after the other, the one which needs
+        the most to heat first, so that the power is given in this order. The shedding is not calculated meanwhile"""
+        vtherms = self.find_all_vtherms()
+        power_manager = self.central_power_manager
+        power_vtherms = power_manager.sort_by_power_priority(vtherms) if power_manager.is_configured else []
+        other_vtherms = [entity for entity in vtherms if entity not in power_vtherms]
+        semaphore = asyncio.Semaphore(self._startup_concurrency)
+
+        async def change_central_mode(entity):
+            _LOGGER.debug("Changing the central_mode. We have find %s to update", entity.name)
+            start = monotonic()
+            try:
+                await entity.check_central_mode(new_central_mode, old_central_mode)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                _LOGGER.error("%s - Error while changing the central_mode. Error is: %s", entity, err, exc_info=err)
+            finally:
+                self._central_mode_durations[entity.entity_id] = monotonic() - start
+
+        async def change_central_mode_bounded(entity):
+            async with semaphore:
+                await change_central_mode(entity)
+
+        async def change_central_mode_with_power():
+            if not power_vtherms:
+                return
+            async with semaphore, power_manager.shedding_lock:
+                for entity in power_vtherms:
+                    await change_central_mode(entity)
+
+        start = monotonic()
+        await asyncio.gather(change_central_mode_with_power(), *[change_central_mode_bounded(entity) for entity in other_vtherms])
+        self._central_mode_total_duration = monotonic() - start
+        self._timings.record(TIMING_CENTRAL_MODE_CHANGE, self._central_mode_total_duration)
+        _LOGGER.info(
+            "The central_mode %s have been applied to all VTherms (%d) in %.3f sec",
+            new_central_mode,
+            len(vtherms),
+            self._central_mode_total_duration,
+        )
 
     @property
     def self_regulation_expert(self):
@@ -257,6 +452,100 @@ class VersatileThermostatAPI(dict):
         """Get the max_open_percent params"""
         return self._max_on_percent
 
+    @property
+    def outdoor_temp_min_dtemp(self) -> float:
+        """The minimal change of the outdoor temperature which triggers a recalculation"""
+        return self._outdoor_temp_params.get("min_dtemp", 0)
+
+    @property
+    def outdoor_temp_min_don_percent(self) -> float:
+        """The minimal change of on_percent due to an outdoor temperature change
+        which triggers a control. Under this threshold the control is deferred to the next one"""
+        return self._outdoor_temp_params.get("min_don_percent", 0)
+
+    @property
+    def temp_debounce_min_interval_sec(self) -> float:
+        """The minimal interval between two controls due to a temperature change. 0 means no debounce"""
+        return self._temp_debounce_params.get("min_interval_sec", 0)
+
+    @property
+    def temp_debounce_min_dtemp(self) -> float:
+        """The temperature change which triggers a control without waiting for the min interval. 0 means never"""
+        return self._temp_debounce_params.get("min_dtemp", 0)
+
+    @property
+    def temperature_filter_params(self) -> dict:
+        """The configuration of the temperature filter pipeline"""
+        return self._temperature_filter_params
+
+    @property
+    def window_auto_algorithm(self) -> str:
+        """The algorithm of the open window auto detection"""
+        return self._window_auto_params.get("algorithm", WINDOW_AUTO_ALGORITHM_SLOPE)
+
+    @property
+    def window_auto_window_sec(self) -> float | None:
+        """The duration of the window of the regression algorithm. None means the default one"""
+        return self._window_auto_params.get("window_sec")
+
+    @property
+    def optimal_start_max_lead_min(self) -> float:
+        """The max time in minutes the optimal start can heat in advance of a scheduled preset"""
+        return self._optimal_start_params.get("max_lead_min", DEFAULT_OPTIMAL_START_MAX_LEAD_MIN)
+
+    @property
+    def thermal_model_forgetting_factor(self) -> float | None:
+        """The forgetting factor of the thermal model estimation. None means the default one"""
+        return self._optimal_start_params.get("forgetting_factor")
+
+    @property
+    def state_store_save_delay_sec(self) -> float:
+        """The delay between two writes of the learned state of the VTherms"""
+        return self._state_store_params.get("save_delay_sec", DEFAULT_STATE_STORE_SAVE_DELAY_SEC)
+
+    @property
+    def warm_start_history_min(self) -> float:
+        """The duration of the history replayed by the VTherms at startup. 0 means no warm start"""
+        return self._warm_start_params.get("history_min", DEFAULT_WARM_START_HISTORY_MIN)
+
+    @property
+    def warm_start_max_samples(self) -> int:
+        """The max number of samples of the history kept by sensor"""
+        return self._warm_start_params.get("max_samples", DEFAULT_WARM_START_MAX_SAMPLES)
+
+    @property
+    def startup_durations(self) -> dict[str, float]:
+        """The last startup duration in sec of each VTherm by entity_id"""
+        return self._startup_durations
+
+    @property
+    def startup_total_duration(self) -> float | None:
+        """The duration in sec of the last startup of all VTherms"""
+        return self._startup_total_duration
+
+    @property
+    def central_mode_durations(self) -> dict[str, float]:
+        """The duration in seconds of the last central_mode change of each VTherm"""
+        return self._central_mode_durations
+
+    @property
+    def central_mode_total_duration(self) -> float | None:
+        """The duration in seconds of the last central_mode change of all VTherms"""
+        return self._central_mode_total_duration
+
+    @property
+    def timings(self) -> HotPathTimings:
+        """The durations of the central hot paths"""
+        return self._timings
+
+    def aggregate_timings(self) -> HotPathTimings:
+        """The durations of the hot paths of all VTherms and of the central ones"""
+        timings = HotPathTimings([])
+        for vtherm in self.find_all_vtherms():
+            timings.merge(vtherm.timings)
+        timings.merge(self._timings)
+        return timings
+
     @property
     def central_boiler_entity(self):
         """Get the central boiler binary_sensor entity"""
@@ -309,6 +598,26 @@ class VersatileThermostatAPI(dict):
         """Returns the central power manager"""
         return self._central_power_manager
 
+    @property
+    def sensor_hub(self) -> SensorSubscriptionHub:
+        """Returns the hub which shares the sensors listeners between VTherms"""
+        return self._sensor_hub
+
+    @property
+    def sensor_watchdog(self) -> CentralSensorWatchdog:
+        """Returns the watchdog of the temperature sensors of all VTherms"""
+        return self._sensor_watchdog
+
+    @property
+    def state_store(self) -> VThermStateStore:
+        """Returns the persistent store of the learned state of the VTherms"""
+        return self._state_store
+
+    @property
+    def warm_start(self) -> RecorderWarmStart:
+        """Returns the reader of the recent history of the temperature sensors"""
+        return self._warm_start
+
     # For testing purpose
     def _set_now(self, now: datetime):
         """Set the now timestamp. This is only for tests purpose"""
@@ -0,0 +1,135 @@
+# pylint: disable=line-too-long
+""" The warm start of the VTherms from the recorder history.
+
+    At startup the EMA, the temperature filters and the slope estimator (used by the open window
+    detection) start empty and need several measurements before giving significant values.
+    When the warm start is enabled the last history_min minutes of the temperature sensors are read
+    from the recorder and replayed by each VTherm before its first live measurement.
+    The history of all the sensors is read in one query shared by all the VTherms which are started
+    together, and the number of samples kept by sensor is bounded by max_samples. The samples are
+    released once the VTherms are started.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, State
+
+from .sensor_hub import parse_temperature
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORDER_DOMAIN = "recorder"
+
+
+class RecorderWarmStart:
+    """The shared reader of the recent history of the temperature sensors"""
+
+    def __init__(self, hass: HomeAssistant, vtherm_api: Any):
+        self._hass: HomeAssistant = hass
+        self._vtherm_api = vtherm_api  # no type due to circular reference
+        # the (value, datetime) samples by sensor entity_id, oldest first
+        self._samples: dict[str, list[tuple[float, datetime]]] = {}
+        # the running query by sensor entity_id
+        self._pending: dict[str, asyncio.Task] = {}
+        self._nb_queries: int = 0
+
+    def __str__(self):
+        return "RecorderWarmStart"
+
+    @property
+    def is_enabled(self) -> bool:
+        """True if the warm start is configured and the recorder is loaded"""
+        return self._vtherm_api.warm_start_history_min > 0 and RECORDER_DOMAIN in self._hass.config.components
+
+    async def async_prefetch(self, entity_ids: list[str | None]):
+        """Read the history of all the sensors not already read in one query"""
+        if not self.is_enabled:
+            return
+        missing = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id and entity_id not in self._samples and entity_id not in self._pending]
+        if not missing:
+            return
+
+        task = self._hass.async_create_task(self._async_query(missing))
+        for entity_id in missing:
+            self._pending[entity_id] = task
+        await task
+
+    async def async_get_samples(self, entity_id: str | None) -> list[tuple[float, datetime]]:
+        """The samples of a sensor. They are read if not already done or waited if a query is running"""
+        if not entity_id or not self.is_enabled:
+            return []
+        if entity_id not in self._samples:
+            task = self._pending.get(entity_id)
+            if task is not None:
+                await task
+            else:
+                await self.async_prefetch([entity_id])
+        return self._samples.get(entity_id, [])
+
+    def clear(self):
+        """Release the samples once the VTherms are started"""
+        self._samples = {}
+
+    async def _async_query(self, entity_ids: list[str]):
+        """Read the history of the sensors and keep the last valid samples"""
+        end_time = self._vtherm_api.now
+        start_time = end_time - timedelta(minutes=self._vtherm_api.warm_start_history_min)
+        try:
+            history = await self._async_fetch_history(entity_ids, start_time, end_time)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            _LOGGER.warning("%s - Unable to read the history of %s. The VTherms will start without it. Error is: %s", self, entity_ids, err)
+            history = {}
+        finally:
+            for entity_id in entity_ids:
+                self._pending.pop(entity_id, None)
+
+        self._nb_queries += 1
+        for entity_id in entity_ids:
+            self._samples[entity_id] = self._parse_samples(history.get(entity_id) or [])
+        _LOGGER.info(
+            "%s - %d samples read from the recorder for %d sensor(s)",
+            self,
+            sum(len(self._samples[entity_id]) for entity_id in entity_ids),
+            len(entity_ids),
+        )
+
+    async def _async_fetch_history(self, entity_ids: list[str], start_time: datetime, end_time: datetime) -> dict[str, list[State]]:
+        """Read the states of the sensors between start_time and end_time in the recorder database"""
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.recorder import get_instance, history
+
+        return await get_instance(self._hass).async_add_executor_job(
+            partial(
+                history.get_significant_states,
+                self._hass,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state=False,
+                significant_changes_only=False,
+                no_attributes=True,
+            )
+        )
+
+    def _parse_samples(self, states: list[State]) -> list[tuple[float, datetime]]:
+        """Keep the last max_samples valid temperatures"""
+        samples: deque[tuple[float, datetime]] = deque(maxlen=self._vtherm_api.warm_start_max_samples)
+        for state in states:
+            if not isinstance(state, State) or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                continue
+            try:
+                samples.append((parse_temperature(state), state.last_changed))
+            except ValueError:
+                continue
+        return list(samples)
+
+    @property
+    def nb_queries(self) -> int:
+        """The number of queries done on the recorder"""
+        return self._nb_queries
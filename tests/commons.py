@@ -2,7 +2,9 @@
 
 """ Some common resources """
 import asyncio
+import json
 import logging
+import os
 from typing import Any, Dict, Callable
 from unittest.mock import patch, MagicMock  # pylint: disable=unused-import
 import pytest  # pylint: disable=unused-import
@@ -1113,3 +1115,16 @@ async def do_central_power_refresh(hass):
     """Do a central power refresh"""
     await VersatileThermostatAPI.get_vtherm_api().central_power_manager.refresh_state()
     return hass.async_block_till_done()
+
+
+def write_result(output: str | None, result: dict):
+    """Append the result to the JSON file output if configured"""
+    if not output:
+        return
+    results = []
+    if os.path.exists(output):
+        with open(output, encoding="utf-8") as file:
+            results = json.load(file)
+    results.append(result)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
@@ -0,0 +1,4 @@
+""" An accelerated-time simulator of a house to drive the VTherms in tests """
+
+from .room import OutdoorProfile, RoomModel, HeaterSwitch, Trv, ClimateUnit
+from .house import HouseSimulator, SimulatedRoom, OUTDOOR_TEMP_SENSOR
@@ -0,0 +1,325 @@
+# pylint: disable=line-too-long, protected-access
+""" The driver of the simulated house.
+
+    Each simulated room has a real VTherm (over_switch, over_climate or over_valve) created in the
+    test Home Assistant instance. The time is virtual: at each step the thermal models are integrated,
+    the now of the VTherm API is moved forward, the timers of Home Assistant which are due are fired
+    and the sensors states are written with the virtual date. The service calls to the underlyings are
+    intercepted and applied to the simulated devices.
+"""
+
+import logging
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant, ServiceRegistry
+from homeassistant.const import ATTR_ENTITY_ID, STATE_ON, STATE_OFF
+from homeassistant.components.climate import HVACMode, HVACAction
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.versatile_thermostat.const import *  # pylint: disable=wildcard-import, unused-wildcard-import
+from custom_components.versatile_thermostat.base_thermostat import BaseThermostat
+from custom_components.versatile_thermostat.underlyings import UnderlyingClimate
+from custom_components.versatile_thermostat.vtherm_api import VersatileThermostatAPI
+
+from ..commons import MockClimate, create_thermostat
+from .room import ClimateUnit, HeaterSwitch, OutdoorProfile, RoomModel, Trv
+
+_LOGGER = logging.getLogger(__name__)
+
+OUTDOOR_TEMP_SENSOR = "sensor.sim_outdoor_temperature"
+
+
+@dataclass
+class SimulatedRoom:
+    """A room of the simulated house with its VTherm.
+    vtherm_config overrides the default configuration of the VTherm and window_openings
+    gives the (start offset, duration) of the window openings"""
+
+    name: str
+    vtherm_type: str
+    target_temperature: float = 19.0
+    hvac_mode: HVACMode = HVACMode.HEAT
+    model: RoomModel = field(default_factory=RoomModel)
+    device_power_kw: float = 1.5
+    vtherm_config: dict[str, Any] = field(default_factory=dict)
+    window_openings: list[tuple[timedelta, timedelta]] = field(default_factory=list)
+
+    @property
+    def temperature_sensor(self) -> str:
+        """The entity_id of the temperature sensor"""
+        return f"sensor.sim_{self.name}_temperature"
+
+    @property
+    def window_sensor(self) -> str:
+        """The entity_id of the window sensor"""
+        return f"binary_sensor.sim_{self.name}_window"
+
+    @property
+    def underlying(self) -> str:
+        """The entity_id of the underlying device"""
+        if self.vtherm_type == CONF_THERMOSTAT_CLIMATE:
+            return f"climate.sim_{self.name}_unit"
+        if self.vtherm_type == CONF_THERMOSTAT_VALVE:
+            return f"number.sim_{self.name}_valve"
+        return f"switch.sim_{self.name}_heater"
+
+    def is_window_open(self, offset: timedelta) -> bool:
+        """True if a window is open at the offset from the start of the simulation"""
+        return any(start <= offset < start + duration for start, duration in self.window_openings)
+
+    def create_vtherm_config(self) -> dict[str, Any]:
+        """The configuration of the VTherm of the room"""
+        config = {
+            CONF_NAME: f"sim_{self.name}",
+            CONF_THERMOSTAT_TYPE: self.vtherm_type,
+            CONF_TEMP_SENSOR: self.temperature_sensor,
+            CONF_EXTERNAL_TEMP_SENSOR: OUTDOOR_TEMP_SENSOR,
+            CONF_UNDERLYING_LIST: [self.underlying],
+            CONF_CYCLE_MIN: 5,
+            CONF_TEMP_MIN: 7,
+            CONF_TEMP_MAX: 35,
+            CONF_STEP_TEMPERATURE: 0.1,
+            CONF_DEVICE_POWER: self.device_power_kw * 1000,
+            CONF_USE_WINDOW_FEATURE: False,
+            CONF_USE_MOTION_FEATURE: False,
+            CONF_USE_POWER_FEATURE: False,
+            CONF_USE_PRESENCE_FEATURE: False,
+            CONF_MINIMAL_ACTIVATION_DELAY: 30,
+            CONF_SAFETY_DELAY_MIN: 60,
+            CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+            CONF_SAFETY_DEFAULT_ON_PERCENT: 0.1,
+            CONF_AC_MODE: self.hvac_mode == HVACMode.COOL,
+        }
+        if self.vtherm_type == CONF_THERMOSTAT_CLIMATE:
+            config |= {
+                CONF_AUTO_REGULATION_MODE: CONF_AUTO_REGULATION_MEDIUM,
+                CONF_AUTO_REGULATION_DTEMP: 0.5,
+                CONF_AUTO_REGULATION_PERIOD_MIN: 5,
+            }
+        else:
+            config |= {
+                CONF_HEATER_KEEP_ALIVE: 0,
+                CONF_INVERSE_SWITCH: False,
+                CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+                CONF_TPI_COEF_INT: 0.6,
+                CONF_TPI_COEF_EXT: 0.01,
+            }
+        return config | self.vtherm_config
+
+
+class RoomMetrics:
+    """The metrics of a room accumulated during the simulation"""
+
+    def __init__(self):
+        self.comfort_error_sum: float = 0.0
+        self.comfort_deficit: float = 0.0
+        self.comfort_duration: float = 0.0
+        self.energy_kwh: float = 0.0
+        self.nb_switches: int = 0
+        self.nb_service_calls: int = 0
+        self.min_temperature: float | None = None
+        self.max_temperature: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """The metrics of the room"""
+        return {
+            "comfort_error": round(self.comfort_error_sum / self.comfort_duration, 3) if self.comfort_duration else None,
+            "comfort_deficit_degree_hours": round(self.comfort_deficit, 3),
+            "energy_kwh": round(self.energy_kwh, 3),
+            "nb_switches": self.nb_switches,
+            "nb_service_calls": self.nb_service_calls,
+            "min_temperature": round(self.min_temperature, 2) if self.min_temperature is not None else None,
+            "max_temperature": round(self.max_temperature, 2) if self.max_temperature is not None else None,
+        }
+
+
+class HouseSimulator:
+    """Drive the VTherms of simulated rooms in virtual time.
+    The service calls and the underlying climates are patched while the simulator is entered:
+
+        with HouseSimulator(hass, rooms) as simulator:
+            await simulator.async_setup()
+            results = await simulator.async_run(timedelta(days=1))
+    """
+
+    def __init__(self, hass: HomeAssistant, rooms: list[SimulatedRoom], outdoor: OutdoorProfile | None = None, step: timedelta = timedelta(minutes=1), sensor_period: timedelta = timedelta(minutes=5)):
+        self._hass = hass
+        self._rooms = rooms
+        self._outdoor = outdoor or OutdoorProfile()
+        self._step = step
+        self._sensor_period = sensor_period
+        self._api = VersatileThermostatAPI.get_vtherm_api(hass)
+        self._devices: dict[str, HeaterSwitch | Trv | ClimateUnit] = {}
+        self._climates: dict[str, MockClimate] = {}
+        self._rooms_by_underlying = {room.underlying: room for room in rooms}
+        self._vtherms: dict[str, BaseThermostat] = {}
+        self._metrics: dict[str, RoomMetrics] = {room.name: RoomMetrics() for room in rooms}
+        self._exit_stack: ExitStack | None = None
+        self._now: datetime | None = None
+        self._start: datetime | None = None
+        self._wall_duration: float = 0.0
+        for room in rooms:
+            if room.vtherm_type == CONF_THERMOSTAT_CLIMATE:
+                self._devices[room.name] = ClimateUnit()
+                self._climates[room.underlying] = MockClimate(hass, room.underlying.split(".")[1], room.underlying.split(".")[1], {})
+            elif room.vtherm_type == CONF_THERMOSTAT_VALVE:
+                self._devices[room.name] = Trv()
+            else:
+                self._devices[room.name] = HeaterSwitch()
+
+    def __enter__(self) -> "HouseSimulator":
+        simulator = self
+
+        async def async_call(_: ServiceRegistry, domain: str, service: str, service_data: dict | None = None, blocking: bool = False, context=None, target: dict | None = None, return_response: bool = False):  # pylint: disable=unused-argument
+            await simulator._async_apply_service(domain, service, (service_data or {}) | (target or {}))
+
+        self._exit_stack = ExitStack()
+        self._exit_stack.enter_context(patch.object(UnderlyingClimate, "find_underlying_climate", autospec=True, side_effect=lambda under: self._climates[under.entity_id]))
+        self._exit_stack.enter_context(patch.object(ServiceRegistry, "async_call", new=async_call))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._exit_stack.close()
+        self._exit_stack = None
+
+    @property
+    def vtherms(self) -> dict[str, BaseThermostat]:
+        """The VTherms by room name"""
+        return self._vtherms
+
+    @property
+    def now(self) -> datetime | None:
+        """The virtual now"""
+        return self._now
+
+    @property
+    def wall_duration_sec(self) -> float:
+        """The real duration of the last run"""
+        return self._wall_duration
+
+    async def async_setup(self):
+        """Create the VTherms of the rooms and start them on their target temperature"""
+        self._now = self._start = self._api.now
+        self._api._set_now(self._now)
+        self._write_sensors(force_outdoor=True)
+        for room in self._rooms:
+            if room.vtherm_type == CONF_THERMOSTAT_SWITCH:
+                self._hass.states.async_set(room.underlying, STATE_OFF)
+            elif room.vtherm_type == CONF_THERMOSTAT_VALVE:
+                self._hass.states.async_set(room.underlying, "0", {"min": 0, "max": 100})
+
+        for room in self._rooms:
+            config = room.create_vtherm_config()
+            entry = MockConfigEntry(domain=DOMAIN, title=config[CONF_NAME], unique_id=f"sim_{room.name}", data=config)
+            vtherm = await create_thermostat(self._hass, entry, f"climate.{config[CONF_NAME]}")
+            assert vtherm, f"The VTherm of the room {room.name} cannot be created"
+            self._vtherms[room.name] = vtherm
+            await vtherm.async_set_hvac_mode(room.hvac_mode)
+            await vtherm.async_set_temperature(temperature=room.target_temperature)
+        await self._hass.async_block_till_done()
+        # the calls of the setup are not counted
+        for metrics in self._metrics.values():
+            metrics.nb_switches = metrics.nb_service_calls = 0
+
+    async def async_run(self, duration: timedelta) -> dict[str, dict[str, Any]]:
+        """Simulate the duration and return the metrics by room name"""
+        start = perf_counter()
+        step_sec = self._step.total_seconds()
+        end = self._now + duration
+        last_sensor_write = self._now
+        while self._now < end:
+            offset = self._now - self._start
+            hour_of_day = (self._now.hour + self._now.minute / 60) % 24
+            outdoor_temperature = self._outdoor.temperature(hour_of_day)
+            for room in self._rooms:
+                self._step_room(room, outdoor_temperature, step_sec, room.is_window_open(offset))
+
+            self._now += self._step
+            self._api._set_now(self._now)
+            if self._now - last_sensor_write >= self._sensor_period:
+                self._write_sensors(force_outdoor=self._now.minute % 15 == 0)
+                last_sensor_write = self._now
+            async_fire_time_changed(self._hass, self._now)
+            await self._hass.async_block_till_done()
+
+        self._wall_duration = perf_counter() - start
+        return {room.name: {"vtherm_type": room.vtherm_type} | self._metrics[room.name].as_dict() for room in self._rooms}
+
+    def _step_room(self, room: SimulatedRoom, outdoor_temperature: float, step_sec: float, is_window_open: bool):
+        """Integrate the model of a room during a step and accumulate its metrics"""
+        device = self._devices[room.name]
+        power = device.power(room.model.temperature)
+        temperature = room.model.step(power, outdoor_temperature, step_sec, is_window_open)
+
+        metrics = self._metrics[room.name]
+        metrics.energy_kwh += abs(power) * room.device_power_kw * step_sec / 3600
+        metrics.min_temperature = temperature if metrics.min_temperature is None else min(metrics.min_temperature, temperature)
+        metrics.max_temperature = temperature if metrics.max_temperature is None else max(metrics.max_temperature, temperature)
+
+        if isinstance(device, ClimateUnit):
+            climate = self._climates[room.underlying]
+            climate.set_current_temperature(temperature)
+            climate.set_hvac_action(HVACAction.HEATING if power > 0 else HVACAction.COOLING if power < 0 else HVACAction.IDLE)
+
+        vtherm = self._vtherms[room.name]
+        if vtherm.hvac_mode == HVACMode.OFF or vtherm.target_temperature is None:
+            return
+        error = temperature - vtherm.target_temperature
+        metrics.comfort_error_sum += abs(error) * step_sec
+        metrics.comfort_duration += step_sec
+        # the deficit is the missing comfort: too cold when heating, too hot when cooling
+        deficit = -error if room.hvac_mode == HVACMode.HEAT else error
+        metrics.comfort_deficit += max(0.0, deficit) * step_sec / 3600
+
+    def _write_sensors(self, force_outdoor: bool = False):
+        """Write the states of the sensors with the virtual date"""
+        timestamp = self._now.timestamp()
+        offset = self._now - self._start
+        if force_outdoor:
+            hour_of_day = (self._now.hour + self._now.minute / 60) % 24
+            self._hass.states.async_set(OUTDOOR_TEMP_SENSOR, str(round(self._outdoor.temperature(hour_of_day), 1)), timestamp=timestamp)
+        for room in self._rooms:
+            self._hass.states.async_set(room.temperature_sensor, str(round(room.model.temperature, 1)), timestamp=timestamp)
+            if room.vtherm_config.get(CONF_WINDOW_SENSOR):
+                self._hass.states.async_set(room.window_sensor, STATE_ON if room.is_window_open(offset) else STATE_OFF, timestamp=timestamp)
+
+    async def _async_apply_service(self, domain: str, service: str, data: dict[str, Any]):
+        """Apply a service call to the simulated device of the targeted room"""
+        entity_ids = data.get(ATTR_ENTITY_ID)
+        for entity_id in entity_ids if isinstance(entity_ids, list) else [entity_ids]:
+            room = self._rooms_by_underlying.get(entity_id)
+            if room is None:
+                _LOGGER.debug("Simulator - ignore the call %s.%s to %s", domain, service, entity_id)
+                continue
+            metrics = self._metrics[room.name]
+            metrics.nb_service_calls += 1
+            device = self._devices[room.name]
+            if isinstance(device, HeaterSwitch) and service in ("turn_on", "turn_off"):
+                is_on = service == "turn_on"
+                if device.is_on != is_on:
+                    metrics.nb_switches += 1
+                device.is_on = is_on
+                self._hass.states.async_set(entity_id, STATE_ON if is_on else STATE_OFF, timestamp=self._now.timestamp())
+            elif isinstance(device, Trv) and service == "set_value":
+                value = float(data["value"])
+                if device.open_percent != value:
+                    metrics.nb_switches += 1
+                device.open_percent = value
+                self._hass.states.async_set(entity_id, str(value), {"min": 0, "max": 100}, timestamp=self._now.timestamp())
+            elif isinstance(device, ClimateUnit) and service == "set_temperature" and data.get("temperature") is not None:
+                setpoint = float(data["temperature"])
+                if device.setpoint != setpoint:
+                    metrics.nb_switches += 1
+                device.setpoint = setpoint
+                self._climates[entity_id].set_temperature(temperature=setpoint)
+            elif isinstance(device, ClimateUnit) and service == "set_hvac_mode":
+                if device.hvac_mode != data["hvac_mode"]:
+                    metrics.nb_switches += 1
+                device.hvac_mode = str(data["hvac_mode"])
+                self._climates[entity_id].set_hvac_mode(data["hvac_mode"])
@@ -0,0 +1,92 @@
+# pylint: disable=line-too-long
+""" The thermal models of the simulated house.
+
+    A room is a first order RC network: its temperature goes to the outdoor temperature with the
+    time constant R.C and each device brings a heating (or cooling) rate proportional to its power.
+    The models do not depend on Home Assistant.
+"""
+
+import math
+from dataclasses import dataclass
+
+# The integration step of the models
+INTEGRATION_STEP_SEC = 10
+
+
+@dataclass
+class OutdoorProfile:
+    """The outdoor temperature: a daily sine with its minimum at min_hour"""
+
+    mean: float = 5.0
+    amplitude: float = 4.0
+    min_hour: float = 5.0
+
+    def temperature(self, hour_of_day: float) -> float:
+        """The outdoor temperature at an hour of the day"""
+        return self.mean - self.amplitude * math.cos(2 * math.pi * (hour_of_day - self.min_hour) / 24)
+
+
+@dataclass
+class HeaterSwitch:
+    """An electrical heater driven by a switch"""
+
+    is_on: bool = False
+
+    def power(self, _: float) -> float:
+        """The part of the nominal power used (0 to 1)"""
+        return 1.0 if self.is_on else 0.0
+
+
+@dataclass
+class Trv:
+    """A thermostatic radiator valve driven by its opening"""
+
+    open_percent: float = 0.0
+
+    def power(self, _: float) -> float:
+        """The part of the nominal power used (0 to 1)"""
+        return max(0.0, min(100.0, self.open_percent)) / 100
+
+
+@dataclass
+class ClimateUnit:
+    """A heat pump or an AC unit with its own regulation on its setpoint.
+    Its power is proportional to the gap between the setpoint and the room temperature.
+    The power is negative when cooling"""
+
+    hvac_mode: str = "off"
+    setpoint: float | None = None
+    gain: float = 1.0
+
+    def power(self, temperature: float) -> float:
+        """The part of the nominal power used (-1 to 1)"""
+        if self.setpoint is None:
+            return 0.0
+        if self.hvac_mode == "heat":
+            return max(0.0, min(1.0, (self.setpoint - temperature) * self.gain))
+        if self.hvac_mode == "cool":
+            return -max(0.0, min(1.0, (temperature - self.setpoint) * self.gain))
+        return 0.0
+
+
+@dataclass
+class RoomModel:
+    """A room modeled as a first order RC network.
+    time_constant_hours is R.C, heating_rate is the temperature rise rate (°/hour) at full power
+    and window_loss_factor multiplies the losses when a window is open"""
+
+    temperature: float = 18.0
+    time_constant_hours: float = 4.0
+    heating_rate: float = 5.0
+    window_loss_factor: float = 10.0
+
+    def step(self, power: float, outdoor_temperature: float, duration_sec: float, is_window_open: bool = False) -> float:
+        """Integrate the temperature during duration_sec with a constant power. Returns the new temperature"""
+        losses_factor = self.window_loss_factor if is_window_open else 1.0
+        remaining = duration_sec
+        while remaining > 0:
+            dt_hour = min(INTEGRATION_STEP_SEC, remaining) / 3600
+            derivative = (outdoor_temperature - self.temperature) * losses_factor / self.time_constant_hours + self.heating_rate * power
+            self.temperature += derivative * dt_hour
+            remaining -= INTEGRATION_STEP_SEC
+        return self.temperature
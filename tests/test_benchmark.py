@@ -0,0 +1,218 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" The end-to-end benchmark of the event pipeline of the VTherms.
+
+    N VTherms of a type are created and synthetic streams of temperature, outdoor temperature,
+    window and power events are replayed through the state machine of Home Assistant as fast as
+    possible. The rates of the streams (in events per simulated minute) give the mix and the number
+    of events. The throughput, the state writes and the service calls per event, the latency of the
+    handlers and the peak RSS are reported.
+
+    Without configuration only a small smoke run is done. The benchmark is configured by environment variables:
+    - VTHERM_BENCHMARK_SIZES: the numbers of VTherms, for example "10,100,500" (default "2"),
+    - VTHERM_BENCHMARK_DURATION_MIN: the simulated duration of the streams in minutes (default 2),
+    - VTHERM_BENCHMARK_RATES: the rates by stream, for example "temperature=1,outdoor=0.5,window=0.1,power=2".
+      The temperature and window rates are by VTherm, the outdoor and power ones are for the shared sensors,
+    - VTHERM_BENCHMARK_OUTPUT: a JSON file to which the results are appended.
+
+    Example: VTHERM_BENCHMARK_SIZES=10,100,500 VTHERM_BENCHMARK_OUTPUT=benchmark.json pytest tests/test_benchmark.py
+"""
+import json
+import os
+import platform
+import random
+from time import perf_counter
+from unittest.mock import patch, AsyncMock
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from homeassistant.core import HomeAssistant, Event, callback, EVENT_STATE_CHANGED
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.versatile_thermostat.underlyings import UnderlyingClimate
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+BENCHMARK_SIZES = [int(size) for size in os.environ.get("VTHERM_BENCHMARK_SIZES", "2").split(",")]
+BENCHMARK_DURATION_MIN = float(os.environ.get("VTHERM_BENCHMARK_DURATION_MIN", "2"))
+BENCHMARK_RATES = {"temperature": 1.0, "outdoor": 0.5, "window": 0.1, "power": 2.0} | {
+    stream: float(rate) for stream, rate in (item.split("=") for item in os.environ.get("VTHERM_BENCHMARK_RATES", "").split(",") if item)
+}
+BENCHMARK_OUTPUT = os.environ.get("VTHERM_BENCHMARK_OUTPUT")
+
+EXT_TEMP_SENSOR = "sensor.bench_ext_temp"
+POWER_SENSOR = "sensor.the_power_sensor"
+MAX_POWER_SENSOR = "sensor.the_max_power_sensor"
+
+
+def create_benchmark_config(vtherm_type: str, i: int) -> dict:
+    """The configuration of the VTherm i of a type with its own sensors"""
+    config = {
+        CONF_NAME: f"bench_{vtherm_type}_{i}",
+        CONF_THERMOSTAT_TYPE: vtherm_type,
+        CONF_TEMP_SENSOR: f"sensor.bench_temp_{i}",
+        CONF_EXTERNAL_TEMP_SENSOR: EXT_TEMP_SENSOR,
+        CONF_CYCLE_MIN: 5,
+        CONF_TEMP_MIN: 15,
+        CONF_TEMP_MAX: 30,
+        CONF_STEP_TEMPERATURE: 0.1,
+        CONF_DEVICE_POWER: 1000,
+        CONF_USE_WINDOW_FEATURE: True,
+        CONF_WINDOW_SENSOR: f"binary_sensor.bench_window_{i}",
+        CONF_WINDOW_DELAY: 10,
+        CONF_USE_MOTION_FEATURE: False,
+        CONF_USE_POWER_FEATURE: True,
+        CONF_PRESET_POWER: 10,
+        CONF_USE_PRESENCE_FEATURE: False,
+        CONF_MINIMAL_ACTIVATION_DELAY: 30,
+        CONF_SAFETY_DELAY_MIN: 60,
+        CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+        CONF_SAFETY_DEFAULT_ON_PERCENT: 0.1,
+        CONF_AC_MODE: False,
+        "comfort_temp": 19,
+    }
+    if vtherm_type == CONF_THERMOSTAT_CLIMATE:
+        config |= {
+            CONF_UNDERLYING_LIST: [f"climate.bench_climate_{i}"],
+            CONF_AUTO_REGULATION_MODE: CONF_AUTO_REGULATION_MEDIUM,
+            CONF_AUTO_REGULATION_DTEMP: 0.5,
+            CONF_AUTO_REGULATION_PERIOD_MIN: 2,
+        }
+    else:
+        config |= {
+            CONF_UNDERLYING_LIST: [f"switch.bench_heater_{i}" if vtherm_type == CONF_THERMOSTAT_SWITCH else f"number.bench_valve_{i}"],
+            CONF_HEATER_KEEP_ALIVE: 0,
+            CONF_INVERSE_SWITCH: False,
+            CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+            CONF_TPI_COEF_INT: 0.3,
+            CONF_TPI_COEF_EXT: 0.01,
+        }
+    return config
+
+
+def create_event_streams(nb_vtherms: int, duration_min: float, rates: dict[str, float], seed: int = 42) -> list[tuple[float, str, str]]:
+    """The (simulated minute, entity_id, state) events of all the streams sorted by date"""
+    rand = random.Random(seed)
+    events = []
+
+    def add_stream(entity_id: str, rate: float, next_state):
+        if rate <= 0:
+            return
+        for n in range(int(duration_min * rate)):
+            events.append(((n + rand.random()) / rate, entity_id, next_state()))
+
+    for i in range(nb_vtherms):
+        add_stream(f"sensor.bench_temp_{i}", rates["temperature"], lambda: str(round(rand.uniform(17, 21), 1)))
+        add_stream(f"binary_sensor.bench_window_{i}", rates["window"], lambda: rand.choice([STATE_ON, STATE_OFF]))
+    add_stream(EXT_TEMP_SENSOR, rates["outdoor"], lambda: str(round(rand.uniform(-5, 10), 1)))
+    add_stream(POWER_SENSOR, rates["power"], lambda: str(rand.randint(500, 6000)))
+    return sorted(events, key=lambda event: event[0])
+
+
+def percentile(sorted_values: list[float], ratio: float) -> float | None:
+    """The percentile of sorted values"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(ratio * len(sorted_values)))]
+
+
+def peak_rss_mb() -> float | None:
+    """The peak resident set size of the process in MB"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # in bytes on macOS and in KB on Linux
+    return round(max_rss / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def read_version() -> str:
+    """The version of the integration"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "custom_components", DOMAIN, "manifest.json"), encoding="utf-8") as file:
+        return json.load(file)["version"]
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+@pytest.mark.parametrize("nb_vtherms", BENCHMARK_SIZES)
+@pytest.mark.parametrize("vtherm_type", [CONF_THERMOSTAT_SWITCH, CONF_THERMOSTAT_CLIMATE, CONF_THERMOSTAT_VALVE])
+async def test_benchmark_event_pipeline(hass: HomeAssistant, skip_hass_states_is_state, skip_send_event, init_central_power_manager, vtherm_type: str, nb_vtherms: int):
+    """Replay the event streams through N VTherms and report the throughput"""
+    climates = {f"climate.bench_climate_{i}": MockClimate(hass, f"bench_climate_{i}", f"bench_climate_{i}", {}) for i in range(nb_vtherms)}
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+
+    with patch.object(UnderlyingClimate, "find_underlying_climate", autospec=True, side_effect=lambda under: climates[under.entity_id]), patch(
+        "homeassistant.core.ServiceRegistry.async_call", new_callable=AsyncMock
+    ) as mock_service_call:
+        # 1. create the VTherms and start them in heat
+        start = perf_counter()
+        vtherms = []
+        for i in range(nb_vtherms):
+            config = create_benchmark_config(vtherm_type, i)
+            entry = MockConfigEntry(domain=DOMAIN, title=config[CONF_NAME], unique_id=f"bench_{i}", data=config)
+            vtherm = await create_thermostat(hass, entry, f"climate.{config[CONF_NAME]}")
+            assert vtherm
+            vtherms.append(vtherm)
+        hass.states.async_set(MAX_POWER_SENSOR, "100000")
+        await api.central_power_manager.start_listening()
+        for vtherm in vtherms:
+            await vtherm.async_set_preset_mode(PRESET_COMFORT)
+            await vtherm.async_set_hvac_mode(HVACMode.HEAT)
+        await hass.async_block_till_done()
+        setup_duration = perf_counter() - start
+
+        # 2. count the state writes of the integration
+        events = create_event_streams(nb_vtherms, BENCHMARK_DURATION_MIN, BENCHMARK_RATES)
+        injected_entity_ids = {entity_id for _, entity_id, _ in events}
+        nb_state_writes = 0
+
+        @callback
+        def count_state_writes(event: Event):
+            nonlocal nb_state_writes
+            if event.data["entity_id"] not in injected_entity_ids:
+                nb_state_writes += 1
+
+        remove_listener = hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_writes)
+        nb_service_calls = mock_service_call.call_count
+
+        # 3. replay the events
+        latencies = []
+        start = perf_counter()
+        for _, entity_id, state in events:
+            event_start = perf_counter()
+            hass.states.async_set(entity_id, state)
+            await hass.async_block_till_done()
+            latencies.append(perf_counter() - event_start)
+        duration = perf_counter() - start
+
+        remove_listener()
+        nb_service_calls = mock_service_call.call_count - nb_service_calls
+
+    latencies.sort()
+    nb_events = len(events)
+    result = {
+        "version": read_version(),
+        "python": platform.python_version(),
+        "vtherm_type": vtherm_type,
+        "nb_vtherms": nb_vtherms,
+        "rates_per_min": BENCHMARK_RATES,
+        "duration_min": BENCHMARK_DURATION_MIN,
+        "nb_events": nb_events,
+        "setup_duration_sec": round(setup_duration, 3),
+        "duration_sec": round(duration, 3),
+        "events_per_sec": round(nb_events / duration, 1) if duration else None,
+        "state_writes_per_event": round(nb_state_writes / nb_events, 3) if nb_events else None,
+        "service_calls_per_event": round(nb_service_calls / nb_events, 3) if nb_events else None,
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    write_result(BENCHMARK_OUTPUT, result)
+
+    assert nb_events > 0
+    assert result["events_per_sec"] > 0
+    # all the VTherms have processed their temperature stream
+    assert all(vtherm.current_temperature is not None for vtherm in vtherms)
@@ -1057,3 +1057,96 @@ async def test_switch_change_central_mode_true_with_cool_only_and_window(
         assert entity._saved_hvac_mode == HVACMode.HEAT
         assert entity._saved_preset_mode == PRESET_ACTIVITY
         assert entity.window_state is STATE_OFF
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_concurrent_central_mode_change(hass: HomeAssistant, skip_hass_states_is_state, init_central_config):
+    """Test the central_mode change is applied concurrently (bounded) and the VTherms with
+    power management are restarted one after the other in the order of their need of heat"""
+
+    vtherms = []
+    with patch("homeassistant.core.ServiceRegistry.async_call"):
+        for i in range(4):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                title=f"TheOverSwitchMockName{i}",
+                unique_id=f"uniqueId{i}",
+                data={
+                    CONF_NAME: f"TheOverSwitchMockName{i}",
+                    CONF_THERMOSTAT_TYPE: CONF_THERMOSTAT_SWITCH,
+                    CONF_TEMP_SENSOR: "sensor.mock_temp_sensor",
+                    CONF_EXTERNAL_TEMP_SENSOR: "sensor.mock_ext_temp_sensor",
+                    CONF_USE_CENTRAL_MODE: True,
+                    CONF_CYCLE_MIN: 5,
+                    CONF_TEMP_MIN: 8,
+                    CONF_TEMP_MAX: 18,
+                    "frost_temp": 10,
+                    "eco_temp": 17,
+                    "comfort_temp": 18,
+                    "boost_temp": 21,
+                    CONF_USE_WINDOW_FEATURE: False,
+                    CONF_USE_MOTION_FEATURE: False,
+                    CONF_USE_POWER_FEATURE: False,
+                    CONF_USE_PRESENCE_FEATURE: False,
+                    CONF_HEATER: f"switch.mock_switch{i}",
+                    CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+                    CONF_TPI_COEF_INT: 0.3,
+                    CONF_TPI_COEF_EXT: 0.01,
+                    CONF_MINIMAL_ACTIVATION_DELAY: 30,
+                    CONF_SAFETY_DELAY_MIN: 5,
+                    CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+                    CONF_SAFETY_DEFAULT_ON_PERCENT: 0.1,
+                },
+            )
+            vtherms.append(await create_thermostat(hass, entry, f"climate.theoverswitchmockname{i}"))
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config({CONF_STARTUP_CONCURRENCY: 2})
+
+    # The two last VTherms have power management. The last one needs more heat than the third one
+    api.central_power_manager._is_configured = True
+    for vtherm, dtemp in ((vtherms[2], 1), (vtherms[3], 3)):
+        vtherm.power_manager._is_configured = True
+        vtherm._target_temp = 18
+        vtherm._cur_temp = 18 - dtemp
+
+    running = 0
+    max_running = 0
+    power_order = []
+    power_lock_held = []
+
+    async def slow_check_central_mode(vtherm, new_central_mode, old_central_mode):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        if vtherm.power_manager.is_configured:
+            power_order.append(vtherm.entity_id)
+            power_lock_held.append(api.central_power_manager.shedding_lock.locked())
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.check_central_mode",
+        autospec=True,
+        side_effect=slow_check_central_mode,
+    ) as mock_check_central_mode:
+        await api.notify_central_mode_change(CENTRAL_MODE_STOPPED)
+
+    assert mock_check_central_mode.call_count == 4
+    assert max_running == 2
+    assert power_order == [vtherms[3].entity_id, vtherms[2].entity_id]
+    assert power_lock_held == [True, True]
+    assert not api.central_power_manager.shedding_lock.locked()
+    assert api.central_mode_total_duration >= 0.02
+    for vtherm in vtherms:
+        assert api.central_mode_durations[vtherm.entity_id] >= 0.01
+
+    # An error on one VTherm does not prevent the others to be updated
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.check_central_mode",
+        side_effect=Exception("fake error"),
+    ) as mock_check_central_mode:
+        await api.notify_central_mode_change(CENTRAL_MODE_STOPPED)
+    assert mock_check_central_mode.call_count == 4
+
+    api.central_power_manager._is_configured = False
@@ -0,0 +1,138 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the ControlMailbox which serializes the control passes """
+import asyncio
+import logging
+
+from custom_components.versatile_thermostat.control_mailbox import (
+    ControlMailbox,
+    serialized_control,
+)
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+class FakeVTherm:
+    """A fake VTherm with a slow control pass"""
+
+    def __init__(self):
+        self._control_mailbox = ControlMailbox("fake")
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    @serialized_control
+    async def async_control_heating(self, force=False, _=None) -> bool:
+        """The control pass"""
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.calls.append(force)
+        await self.release.wait()
+        self.running -= 1
+        return True
+
+    @serialized_control
+    async def nested_control_heating(self, force=False, _=None) -> bool:
+        """A control pass which calls the control again"""
+        self.calls.append(force)
+        if not force:
+            return await self.nested_control_heating(force=True)
+        return True
+
+
+class GatedVTherm(FakeVTherm):
+    """A fake VTherm whose control passes are released one by one"""
+
+    def __init__(self):
+        super().__init__()
+        self.gates: list[asyncio.Event] = []
+
+    @serialized_control
+    async def async_control_heating(self, force=False, _=None) -> bool:
+        """The control pass waits for its own gate"""
+        gate = asyncio.Event()
+        self.gates.append(gate)
+        self.calls.append(force)
+        await gate.wait()
+        return True
+
+
+async def test_control_mailbox_coalesce(hass: HomeAssistant):
+    """Test that the requests received during a pass are merged in one pending pass"""
+    vtherm = FakeVTherm()
+
+    first = asyncio.create_task(vtherm.async_control_heating(force=False))
+    await asyncio.sleep(0)
+    assert vtherm._control_mailbox.is_running is True
+
+    others = [
+        asyncio.create_task(vtherm.async_control_heating(force=False)),
+        asyncio.create_task(vtherm.async_control_heating(force=True)),
+        asyncio.create_task(vtherm.async_control_heating(force=False)),
+    ]
+    await asyncio.sleep(0)
+
+    vtherm.release.set()
+    results = await asyncio.gather(first, *others)
+
+    assert results == [True, True, True, True]
+    # The first pass and only one pending pass with force=True which dominates
+    assert vtherm.calls == [False, True]
+    assert vtherm.max_running == 1
+    assert vtherm._control_mailbox.nb_executed == 2
+    assert vtherm._control_mailbox.nb_coalesced == 2
+    assert vtherm._control_mailbox.is_running is False
+
+
+async def test_control_mailbox_nested(hass: HomeAssistant):
+    """Test that a nested request from the running pass doesn't deadlock"""
+    vtherm = FakeVTherm()
+
+    assert await asyncio.wait_for(vtherm.nested_control_heating(force=False), timeout=1) is True
+    assert vtherm.calls == [False, True]
+    assert vtherm._control_mailbox.nb_executed == 1
+
+
+async def test_control_mailbox_cancelled_runner(hass: HomeAssistant):
+    """Test that the coalesced callers do not wait forever when the runner is cancelled"""
+    vtherm = FakeVTherm()
+
+    # 1. the runner is cancelled during its own pass
+    first = asyncio.create_task(vtherm.async_control_heating(force=False))
+    await asyncio.sleep(0)
+    others = [asyncio.create_task(vtherm.async_control_heating(force=False)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    first.cancel()
+    results = await asyncio.wait_for(asyncio.gather(first, *others, return_exceptions=True), timeout=1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert vtherm._control_mailbox.is_running is False
+    assert vtherm._control_mailbox._pending is None
+
+    # 2. the runner is cancelled during the pending pass
+    vtherm = GatedVTherm()
+    first = asyncio.create_task(vtherm.async_control_heating(force=False))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(vtherm.async_control_heating(force=False))
+    await asyncio.sleep(0)
+    # the first pass ends and the pending one starts
+    vtherm.gates[0].set()
+    while len(vtherm.gates) < 2:
+        await asyncio.sleep(0)
+    third = asyncio.create_task(vtherm.async_control_heating(force=True))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    results = await asyncio.wait_for(asyncio.gather(first, second, third, return_exceptions=True), timeout=1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert vtherm._control_mailbox.is_running is False
+    assert vtherm._control_mailbox._pending is None
+
+    # 3. the mailbox is still usable
+    task = asyncio.create_task(vtherm.async_control_heating(force=False))
+    while len(vtherm.gates) < 3:
+        await asyncio.sleep(0)
+    vtherm.gates[2].set()
+    assert await asyncio.wait_for(task, timeout=1) is True
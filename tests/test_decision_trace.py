@@ -0,0 +1,130 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the trace of the control decisions """
+from unittest.mock import patch, PropertyMock
+from datetime import datetime, timedelta, timezone
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.versatile_thermostat.decision_trace import (
+    DecisionTrace,
+    REASON_SAFETY,
+    REASON_WINDOW,
+    REASON_AUTO_STOP,
+    ACTION_START_CYCLE,
+    ACTION_SET_TEMPERATURE,
+)
+from custom_components.versatile_thermostat.diagnostics import async_get_config_entry_diagnostics
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+
+def test_decision_trace_ring_buffer():
+    """The trace keeps the last decisions, oldest first"""
+    now = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    trace = DecisionTrace(size=3)
+    assert trace.to_list() == []
+    trace.amend_last(output=1)
+    assert len(trace) == 0
+
+    for i in range(5):
+        trace.record(now + timedelta(minutes=i), HVACMode.HEAT, 18 + i, None, 20, 0.1 * i, REASON_WINDOW if i == 3 else 0, ACTION_START_CYCLE)
+
+    decisions = trace.to_list()
+    assert len(trace) == trace.size == 3
+    assert [decision["temperature"] for decision in decisions] == [20, 21, 22]
+    assert decisions[0] == {
+        "timestamp": (now + timedelta(minutes=2)).isoformat(),
+        "hvac_mode": HVACMode.HEAT,
+        "temperature": 20,
+        "ext_temperature": None,
+        "target_temperature": 20,
+        "output": pytest.approx(0.2),
+        "reasons": [],
+        "action": "start_cycle",
+    }
+    assert decisions[1]["reasons"] == ["window"]
+
+    # the last decision is completed
+    trace.amend_last(output=19.5, reasons=REASON_SAFETY | REASON_AUTO_STOP, action=ACTION_SET_TEMPERATURE)
+    last = trace.to_list()[-1]
+    assert last["output"] == 19.5
+    assert last["reasons"] == ["safety", "auto_stop"]
+    assert last["action"] == "set_temperature"
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_decision_trace_diagnostics(hass: HomeAssistant, skip_hass_states_is_state, skip_send_event):
+    """The decisions of the cycles are exported in the diagnostics"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data=FULL_SWITCH_CONFIG,
+    )
+
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+
+    with patch("custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.turn_on"), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.turn_off"
+    ), patch("custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.call_later", return_value=None), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.is_device_active",
+        new_callable=PropertyMock,
+        return_value=False,
+    ):
+        await send_temperature_change_event(entity, 15, now)
+        await send_ext_temperature_change_event(entity, 5, now)
+        await entity.async_set_hvac_mode(HVACMode.HEAT)
+        await entity.async_set_preset_mode(PRESET_COMFORT)
+        await entity.async_control_heating(force=True)
+
+        decision = entity.decision_trace.to_list()[-1]
+        assert decision["hvac_mode"] == HVACMode.HEAT
+        assert decision["temperature"] == 15
+        assert decision["ext_temperature"] == 5
+        assert decision["target_temperature"] == entity.target_temperature
+        assert decision["output"] == entity.proportional_algorithm.on_percent
+        assert decision["action"] == "start_cycle"
+        assert decision["reasons"] == []
+
+        await entity.async_set_hvac_mode(HVACMode.OFF)
+        await entity.async_control_heating(force=True)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["decisions"] == entity.decision_trace.to_list()
+    assert diagnostics["decisions"][-1]["reasons"] == ["off"]
+    assert diagnostics["decisions"][-1]["action"] == "none"
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_decision_trace_over_climate(hass: HomeAssistant, skip_hass_states_is_state, skip_send_event):
+    """An over_climate cycle which sends no regulated temperature is recorded without action"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverClimateMockName",
+        unique_id="uniqueId",
+        data=PARTIAL_CLIMATE_CONFIG,
+    )
+    fake_underlying_climate = MockClimate(hass, "mockUniqueId", "MockClimateName", {})
+
+    with patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingClimate.find_underlying_climate",
+        return_value=fake_underlying_climate,
+    ), patch("homeassistant.core.ServiceRegistry.async_call"):
+        entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverclimatemockname")
+        assert entity
+
+        await send_temperature_change_event(entity, 15, now)
+        await entity.async_set_hvac_mode(HVACMode.HEAT)
+        await entity.async_set_preset_mode(PRESET_COMFORT)
+        await entity.async_control_heating(force=True)
+
+        # nothing changes: the regulated temperature is not sent again
+        await entity.async_control_heating()
+        decision = entity.decision_trace.to_list()[-1]
+        assert decision["action"] == "none"
+        assert all(decision["action"] != "start_cycle" for decision in entity.decision_trace.to_list())
@@ -0,0 +1,65 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the event payload policies """
+import logging
+from unittest.mock import MagicMock, PropertyMock
+
+from custom_components.versatile_thermostat.base_thermostat import BaseThermostat
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+@pytest.mark.parametrize(
+    "event_payload, event_type, expected_payload",
+    [
+        # fmt: off
+        ( {}, EventType.WINDOW_AUTO_EVENT, EVENT_PAYLOAD_MINIMAL ),
+        ( {"default": "full"}, EventType.WINDOW_AUTO_EVENT, EVENT_PAYLOAD_FULL ),
+        ( {"default": "full", "versatile_thermostat_window_auto_event": "delta"}, EventType.WINDOW_AUTO_EVENT, EVENT_PAYLOAD_DELTA ),
+        ( {"default": "full", "versatile_thermostat_window_auto_event": "delta"}, EventType.POWER_EVENT, EVENT_PAYLOAD_FULL ),
+        ( {"versatile_thermostat_power_event": "full"}, EventType.SECURITY_EVENT, EVENT_PAYLOAD_MINIMAL ),
+        # fmt: on
+    ],
+)
+async def test_event_payload_policy(hass: HomeAssistant, event_payload, event_type, expected_payload):
+    """Test the choice of the payload policy by event type"""
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config({CONF_EVENT_PAYLOAD: event_payload})
+
+    assert api.get_event_payload(event_type) == expected_payload
+
+
+async def test_event_payload_state_attributes(hass: HomeAssistant):
+    """Test the state_attributes given for each payload policy"""
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config(
+        {
+            CONF_EVENT_PAYLOAD: {
+                "versatile_thermostat_power_event": EVENT_PAYLOAD_FULL,
+                "versatile_thermostat_window_auto_event": EVENT_PAYLOAD_DELTA,
+            }
+        }
+    )
+
+    fake_vtherm = MagicMock(spec=BaseThermostat)
+    type(fake_vtherm).entity_id = PropertyMock(return_value="climate.the_vtherm")
+    state_attributes = {"current_temperature": 18, "preset_mode": "comfort"}
+    type(fake_vtherm).state_attributes = PropertyMock(side_effect=lambda: dict(state_attributes))
+
+    # 1. minimal (the default) -> no state_attributes
+    assert api.get_event_state_attributes(EventType.SECURITY_EVENT, fake_vtherm) is None
+
+    # 2. full -> all the state_attributes
+    assert api.get_event_state_attributes(EventType.POWER_EVENT, fake_vtherm) == state_attributes
+
+    # 3. delta -> the first event gives all the state_attributes
+    assert api.get_event_state_attributes(EventType.WINDOW_AUTO_EVENT, fake_vtherm) == state_attributes
+
+    # 4. delta -> then only the changed ones
+    state_attributes["current_temperature"] = 17
+    state_attributes["window_auto_state"] = STATE_ON
+    assert api.get_event_state_attributes(EventType.WINDOW_AUTO_EVENT, fake_vtherm) == {"current_temperature": 17, "window_auto_state": STATE_ON}
+
+    # 5. delta -> nothing changed
+    assert api.get_event_state_attributes(EventType.WINDOW_AUTO_EVENT, fake_vtherm) == {}
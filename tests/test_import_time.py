@@ -0,0 +1,83 @@
+# pylint: disable=line-too-long
+""" Test the cost of loading the integration at Home Assistant startup """
+import json
+import os
+import subprocess
+import sys
+
+from custom_components.versatile_thermostat.config_schema import (
+    STEP_CENTRAL_MAIN_DATA_SCHEMA,
+    STEP_CENTRAL_TPI_DATA_SCHEMA,
+    STEP_CENTRAL_WINDOW_DATA_SCHEMA,
+    STEP_CENTRAL_MOTION_DATA_SCHEMA,
+    STEP_CENTRAL_POWER_DATA_SCHEMA,
+    STEP_CENTRAL_PRESENCE_DATA_SCHEMA,
+    STEP_CENTRAL_ADVANCED_DATA_SCHEMA,
+)
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+# The platforms and modules loaded by Home Assistant at startup
+RUNTIME_MODULES = [
+    "custom_components.versatile_thermostat",
+    "custom_components.versatile_thermostat.climate",
+    "custom_components.versatile_thermostat.sensor",
+    "custom_components.versatile_thermostat.binary_sensor",
+    "custom_components.versatile_thermostat.number",
+    "custom_components.versatile_thermostat.select",
+    "custom_components.versatile_thermostat.switch",
+]
+
+# The upper bounds. They are large enough to not depend on the machine but low
+# enough to detect a heavy dependency added on the startup path
+MAX_IMPORT_DURATION_SEC = 10
+MAX_INTEGRATION_MODULES = 40
+
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+duration = time.perf_counter() - start
+loaded = [name for name in set(sys.modules) - before if name.startswith("custom_components.versatile_thermostat")]
+print(json.dumps({{"duration": duration, "modules": sorted(loaded)}}))
+"""
+
+
+def test_runtime_import_do_not_load_config_flow():
+    """Test that the startup path of the integration don't load the config flow
+    and stays bounded in time and number of modules.
+    The import is done in a fresh interpreter because the tests already load the config flow"""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(modules=RUNTIME_MODULES)],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert "custom_components.versatile_thermostat.config_schema" not in report["modules"]
+    assert "custom_components.versatile_thermostat.config_flow" not in report["modules"]
+    assert len(report["modules"]) <= MAX_INTEGRATION_MODULES
+    assert report["duration"] < MAX_IMPORT_DURATION_SEC
+
+
+def test_central_config_keys():
+    """Test that the keys taken from the central configuration are the ones of the central schemas"""
+
+    schemas = {
+        CONF_USE_MAIN_CENTRAL_CONFIG: STEP_CENTRAL_MAIN_DATA_SCHEMA,
+        CONF_USE_TPI_CENTRAL_CONFIG: STEP_CENTRAL_TPI_DATA_SCHEMA,
+        CONF_USE_WINDOW_CENTRAL_CONFIG: STEP_CENTRAL_WINDOW_DATA_SCHEMA,
+        CONF_USE_MOTION_CENTRAL_CONFIG: STEP_CENTRAL_MOTION_DATA_SCHEMA,
+        CONF_USE_POWER_CENTRAL_CONFIG: STEP_CENTRAL_POWER_DATA_SCHEMA,
+        CONF_USE_PRESENCE_CENTRAL_CONFIG: STEP_CENTRAL_PRESENCE_DATA_SCHEMA,
+        CONF_USE_ADVANCED_CENTRAL_CONFIG: STEP_CENTRAL_ADVANCED_DATA_SCHEMA,
+    }
+
+    assert set(CENTRAL_CONFIG_KEYS) == set(schemas)
+    for use_central_key, schema in schemas.items():
+        assert set(CENTRAL_CONFIG_KEYS[use_central_key]) == {str(key) for key in schema.schema}
@@ -596,6 +596,20 @@ async def test_motion_management_time_enough_and_presence(
         assert mock_heater_off.call_count == 1
         assert mock_send_event.call_count == 0
 
+    # The presets are resolved with the precalculated table
+    assert entity._preset_table[(PRESET_ACTIVITY, False, False, True)] == 19
+    assert entity._preset_table[(PRESET_ACTIVITY, False, False, False)] == 18
+    assert entity._preset_table[(PRESET_COMFORT, False, True, False)] == 18
+    with patch.object(entity, "resolve_preset_temp") as mock_resolve:
+        assert entity.find_preset_temp(PRESET_ACTIVITY) == 18
+        assert entity.find_preset_temp(PRESET_BOOST) == 19
+        assert mock_resolve.call_count == 0
+
+    # The table is rebuilt when a preset temperature changes
+    await entity.service_set_preset_temperature(PRESET_COMFORT, 18.5, 16)
+    assert entity.find_preset_temp(PRESET_ACTIVITY) == 18.5
+    assert entity._preset_table[(PRESET_ACTIVITY, False, True, False)] == 16
+
 
 @pytest.mark.parametrize("expected_lingering_tasks", [True])
 @pytest.mark.parametrize("expected_lingering_timers", [True])
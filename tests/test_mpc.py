@@ -0,0 +1,145 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the model predictive regulation """
+from unittest.mock import patch, MagicMock, PropertyMock
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.components.climate import HVACMode
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.versatile_thermostat.thermostat_climate import ThermostatOverClimate
+from custom_components.versatile_thermostat.feature_optimal_start_manager import FeatureOptimalStartManager
+from custom_components.versatile_thermostat.thermal_model import ThermalModelEstimator
+from custom_components.versatile_thermostat.pi_algorithm import PITemperatureRegulator
+from custom_components.versatile_thermostat.mpc_algorithm import MpcTemperatureRegulator
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+from .test_optimal_start import simulate_room
+
+
+def create_medium_pi(target_temp: float) -> PITemperatureRegulator:
+    """The fallback regulator"""
+    return PITemperatureRegulator(target_temp, 0.3, 0.05, 0.1, 2, 0.1, 20)
+
+
+def create_learned_manager() -> MagicMock:
+    """A fake optimal start manager with a learned model of the simulated room"""
+    thermal_model = ThermalModelEstimator("test")
+    simulate_room(thermal_model, 0)
+    manager = MagicMock(spec=FeatureOptimalStartManager)
+    type(manager).thermal_model = PropertyMock(return_value=thermal_model)
+    return manager
+
+
+def regulate_room(regulator, hours: int = 10, underlying_bias: float = 0) -> tuple[int, float, float]:
+    """Regulate the simulated room (see test_optimal_start) heated by an underlying proportional
+    to the gap between its setpoint and its own sensor. Returns the number of setpoint changes, the
+    max temperature and the mean absolute error once the target is reached"""
+    temperature = 17.0
+    setpoint = None
+    nb_changes = 0
+    max_temperature = temperature
+    total_error = 0
+    nb_periods = hours * 12
+    for period in range(nb_periods):
+        new_setpoint = round(round(regulator.calculate_regulated_temperature(round(temperature, 1), 5) * 2) / 2, 1)
+        if new_setpoint != setpoint:
+            nb_changes += 1
+            setpoint = new_setpoint
+        for _ in range(300):
+            power = max(0, min(1, setpoint - temperature - underlying_bias))
+            temperature += (0.25 * (5 - temperature) + 5.0 * power) / 3600
+        max_temperature = max(max_temperature, temperature)
+        if period >= 36:
+            total_error += abs(temperature - 20)
+    return nb_changes, max_temperature, total_error / (nb_periods - 36)
+
+
+def test_mpc_regulation():
+    """The MPC reaches the target without overshoot and with few setpoint changes"""
+    manager = create_learned_manager()
+
+    for underlying_bias in (0, 0.5, 1, -0.5):
+        pi_changes, pi_max, _ = regulate_room(create_medium_pi(20), underlying_bias=underlying_bias)
+
+        regulator = MpcTemperatureRegulator(20, manager, 5, 2, create_medium_pi(20), 0.5)
+        mpc_changes, mpc_max, mpc_error = regulate_room(regulator, underlying_bias=underlying_bias)
+
+        assert mpc_max < 20.3
+        assert mpc_max < pi_max
+        assert mpc_changes < pi_changes
+        assert mpc_changes <= 6
+        assert mpc_error < 0.3
+        assert regulator.predicted_temperature is not None
+        assert regulator.cache_stats["nb_predictions"] == 120
+
+
+def test_mpc_fallback():
+    """The PI is used while the model is not learned and in cooling"""
+    manager = MagicMock(spec=FeatureOptimalStartManager)
+    type(manager).thermal_model = PropertyMock(return_value=ThermalModelEstimator("test"))
+
+    regulator = MpcTemperatureRegulator(20, manager, 5, 2, create_medium_pi(20))
+    pi = create_medium_pi(20)
+    assert regulator.calculate_regulated_temperature(18, 10) == pi.calculate_regulated_temperature(18, 10)
+    assert regulator.accumulated_error == pi.accumulated_error == 2
+    assert regulator.cache_stats["nb_predictions"] == 0
+
+    regulator = MpcTemperatureRegulator(20, create_learned_manager(), 5, 2, create_medium_pi(20))
+    regulator.is_cooling = True
+    assert regulator.calculate_regulated_temperature(18, 10) == create_medium_pi(20).calculate_regulated_temperature(18, 10)
+    assert regulator.cache_stats["nb_predictions"] == 0
+
+    regulator.is_cooling = False
+    assert regulator.calculate_regulated_temperature(18, 10) >= 20
+    assert regulator.cache_stats["nb_predictions"] == 1
+
+
+def test_mpc_memoization():
+    """A calculation between two control ticks with the same inputs is not done again"""
+    regulator = MpcTemperatureRegulator(20, create_learned_manager(), 5, 2, create_medium_pi(20))
+    result = regulator.calculate_regulated_temperature(19.5, 5)
+    assert regulator.calculate_regulated_temperature(19.503, 5, is_control_tick=False) == result
+    assert regulator.cache_stats == {"nb_hit": 1, "nb_miss": 1, "nb_predictions": 1}
+
+    # a new target is a new calculation
+    regulator.set_target_temp(18)
+    assert regulator.calculate_regulated_temperature(19.5, 5, is_control_tick=False) < result
+    assert regulator.cache_stats["nb_predictions"] == 2
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_over_climate_mpc_mode(hass: HomeAssistant, skip_hass_states_is_state, skip_send_event):
+    """The MPC mode can be selected by the service"""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverClimateMockName",
+        unique_id="uniqueId",
+        data=PARTIAL_CLIMATE_CONFIG,
+    )
+
+    now: datetime = datetime.now(tz=get_tz(hass))
+    fake_underlying_climate = MockClimate(hass, "mockUniqueId", "MockClimateName", {})
+
+    with patch("custom_components.versatile_thermostat.const.NowClass.get_now", return_value=now - timedelta(minutes=10)), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingClimate.find_underlying_climate",
+        return_value=fake_underlying_climate,
+    ):
+        entity: ThermostatOverClimate = await create_thermostat(hass, entry, "climate.theoverclimatemockname")
+        assert entity
+        assert isinstance(entity._regulation_algo, PITemperatureRegulator)
+
+        await entity.service_set_auto_regulation_mode("MPC")
+        assert entity.auto_regulation_mode == CONF_AUTO_REGULATION_MPC
+        assert isinstance(entity._regulation_algo, MpcTemperatureRegulator)
+        assert "mpc" in entity.algorithm_cache_stats
+
+        # the model is not learned: the medium PI is used
+        await entity.async_set_hvac_mode(HVACMode.HEAT)
+        await send_temperature_change_event(entity, 15, now - timedelta(minutes=10))
+        await send_ext_temperature_change_event(entity, 10, now - timedelta(minutes=10))
+        await entity.async_set_temperature(temperature=18)
+        assert entity.regulated_target_temp > entity.target_temperature
+        assert entity.extra_state_attributes["regulation_predicted_temperature"] is None
@@ -0,0 +1,198 @@
+# pylint: disable=unused-argument, line-too-long
+""" Test the OpenWindow regression algorithm and compare it with the slope one """
+
+import math
+import random
+from datetime import datetime, timedelta
+
+from custom_components.versatile_thermostat.open_window_algorithm import (
+    WindowOpenDetectionAlgorithm,
+    WindowRegressionDetectionAlgorithm,
+)
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def test_regression_slope_irregular_sampling():
+    """The slope of a linear decrease doesn't depend on the sampling"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0, window_sec=600)
+    assert the_algo.last_slope is None
+
+    # -6°/hour sampled irregularly
+    for offset_sec in [0, 20, 45, 170, 200, 410, 430, 590]:
+        last_slope = the_algo.add_temp_measurement(temperature=20 - 6 * offset_sec / 3600, datetime_measure=START + timedelta(seconds=offset_sec))
+
+    assert last_slope == -6.0
+    assert the_algo.is_window_open_detected() is True
+    assert the_algo.is_window_close_detected() is False
+
+
+def test_regression_need_enough_points():
+    """No slope until 3 filtered points covering at least one minute"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0)
+
+    assert the_algo.add_temp_measurement(20, START) is None
+    # the point waits for the next one to be filtered
+    assert the_algo.add_temp_measurement(19, START + timedelta(seconds=10)) is None
+    assert the_algo.nb_point == 1
+    assert the_algo.add_temp_measurement(18, START + timedelta(seconds=20)) is None
+    assert the_algo.nb_point == 2
+    # 3 points but only 20 sec
+    assert the_algo.add_temp_measurement(18, START + timedelta(seconds=80)) is None
+    assert the_algo.is_window_open_detected() is False
+    assert the_algo.is_window_close_detected() is False
+
+    assert the_algo.add_temp_measurement(18, START + timedelta(seconds=140)) is not None
+
+    # a measure in the past is ignored
+    assert the_algo.add_temp_measurement(10, START + timedelta(seconds=70)) == the_algo.last_slope
+    assert the_algo.nb_point == 4
+
+
+def test_regression_reject_outliers():
+    """An isolated aberrant value is rejected by the median filter"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0)
+
+    for i in range(5):
+        the_algo.add_temp_measurement(20, START + timedelta(minutes=i))
+    assert the_algo.last_slope == 0
+
+    the_algo.add_temp_measurement(15, START + timedelta(minutes=5))
+    assert the_algo.last_slope == 0
+    assert the_algo.is_window_open_detected() is False
+
+    the_algo.add_temp_measurement(20, START + timedelta(minutes=6))
+    assert the_algo.last_slope == 0
+
+
+def test_regression_window_and_ring_buffer():
+    """The old points are evicted and the size of the buffer is bounded"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0, window_sec=300, max_nb_point=8)
+
+    # A fast decrease then a stable temperature
+    for i in range(5):
+        the_algo.add_temp_measurement(20 - i * 0.5, START + timedelta(minutes=i))
+    assert the_algo.is_window_open_detected() is True
+
+    for i in range(5, 30):
+        the_algo.add_temp_measurement(18, START + timedelta(minutes=i))
+        assert the_algo.nb_point <= 6  # 5 min with one point by minute
+
+    assert the_algo.last_slope == 0
+    assert the_algo.is_window_close_detected() is True
+
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0, window_sec=3600, max_nb_point=8)
+    for i in range(30):
+        the_algo.add_temp_measurement(18, START + timedelta(minutes=i))
+    assert the_algo.nb_point == 8
+
+
+def test_regression_check_age_last_measurement():
+    """In cycle the last temperature is still valid and the slope goes back to 0 without storing fake points"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0, window_sec=600)
+
+    for i in range(4):
+        the_algo.add_temp_measurement(20 - i * 0.5, START + timedelta(minutes=i))
+    assert the_algo.is_window_open_detected() is True
+    nb_point = the_algo.nb_point
+
+    # the sensor doesn't send anything because the temperature doesn't change
+    last_slope = the_algo.check_age_last_measurement(temperature=18.5, datetime_now=START + timedelta(minutes=10))
+    assert last_slope == -7.41
+    assert the_algo.nb_point == nb_point
+
+    last_slope = the_algo.check_age_last_measurement(temperature=18.5, datetime_now=START + timedelta(minutes=60))
+    assert last_slope == -0.78
+    assert the_algo.is_window_open_detected() is False
+    # the last points are kept because their temperature is still valid
+    assert the_algo.nb_point == 2
+
+
+def test_regression_rebase():
+    """The origin of the abscissa is moved every day without changing the slope"""
+    the_algo = WindowRegressionDetectionAlgorithm(3.0, 0.0)
+
+    for i in range(4):
+        the_algo.add_temp_measurement(20, START + timedelta(minutes=i))
+
+    later = START + timedelta(days=3)
+    for i in range(5):
+        last_slope = the_algo.add_temp_measurement(20 - i * 0.1, later + timedelta(minutes=i))
+    assert last_slope == -6.0
+
+
+def make_trace(seed: int, window_open_sec: float | None, hours: int = 6) -> list[tuple[datetime, float]]:
+    """A trace of a room temperature as sent by a sensor:
+    - irregular sampling between 30 sec and 5 min,
+    - rounded at 0.1° with a measurement noise and some isolated aberrant values,
+    - a slow oscillation due to the heating cycles,
+    - if window_open_sec is given, the window opens at this time: the temperature loses 1.5° in 15 min and then recovers in one hour"""
+    rnd = random.Random(seed)
+    trace = []
+    offset_sec = 0.0
+    while offset_sec < hours * 3600:
+        offset_sec += rnd.uniform(30, 300)
+        temperature = 19.0 + 0.3 * math.sin(offset_sec / 1800)
+        if window_open_sec is not None and offset_sec >= window_open_sec:
+            elapsed = offset_sec - window_open_sec
+            temperature -= 1.5 * elapsed / 900 if elapsed < 900 else 1.5 * max(0, 1 - (elapsed - 900) / 3600)
+        temperature += rnd.gauss(0, 0.05)
+        if rnd.random() < 0.02:
+            temperature += rnd.choice([-1, 1])
+        trace.append((START + timedelta(seconds=offset_sec), round(temperature, 1)))
+    return trace
+
+
+def replay(the_algo, trace, window_open_sec: float | None) -> tuple[float | None, int]:
+    """Replay a trace. Return the detection delay of the open window and the number of false alarms"""
+    detection_delay = None
+    nb_false_alarm = 0
+    is_open = False
+    for date, temperature in trace:
+        the_algo.add_temp_measurement(temperature=temperature, datetime_measure=date)
+        if the_algo.is_window_open_detected() and not is_open:
+            is_open = True
+            offset_sec = (date - START).total_seconds()
+            if window_open_sec is not None and window_open_sec <= offset_sec < window_open_sec + 1800:
+                if detection_delay is None:
+                    detection_delay = offset_sec - window_open_sec
+            else:
+                nb_false_alarm += 1
+        elif the_algo.is_window_close_detected():
+            is_open = False
+    return detection_delay, nb_false_alarm
+
+
+def test_benchmark_window_detection():
+    """Compare the slope and regression algorithms on the same traces"""
+    window_open_sec = 2 * 3600
+    results = {}
+    for name, algo_class in [("slope", WindowOpenDetectionAlgorithm), ("regression", WindowRegressionDetectionAlgorithm)]:
+        delays = []
+        nb_missed = 0
+        nb_false_alarm = 0
+        for seed in range(30):
+            delay, nb_false = replay(algo_class(3.0, 0.0), make_trace(seed, window_open_sec), window_open_sec)
+            nb_false_alarm += nb_false
+            if delay is None:
+                nb_missed += 1
+            else:
+                delays.append(delay)
+
+            _, nb_false = replay(algo_class(3.0, 0.0), make_trace(seed + 1000, None), None)
+            nb_false_alarm += nb_false
+
+        results[name] = {
+            "nb_missed": nb_missed,
+            "nb_false_alarm": nb_false_alarm,
+            "mean_delay_sec": sum(delays) / len(delays) if delays else None,
+        }
+        _LOGGER.info("Window detection benchmark %s: %s", name, results[name])
+
+    assert results["regression"]["nb_missed"] <= results["slope"]["nb_missed"]
+    assert results["regression"]["nb_missed"] == 0
+    assert results["regression"]["nb_false_alarm"] * 5 < results["slope"]["nb_false_alarm"]
+    # detected before the window has lost 1°
+    assert results["regression"]["mean_delay_sec"] < 600
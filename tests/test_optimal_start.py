@@ -0,0 +1,186 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the thermal model and the optimal start """
+import math
+import random
+from datetime import datetime, timedelta
+from unittest.mock import PropertyMock, AsyncMock, MagicMock
+
+from custom_components.versatile_thermostat.base_thermostat import BaseThermostat
+from custom_components.versatile_thermostat.feature_window_manager import FeatureWindowManager
+from custom_components.versatile_thermostat.feature_optimal_start_manager import FeatureOptimalStartManager
+from custom_components.versatile_thermostat.thermal_model import ThermalModelEstimator
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+def simulate_room(estimator: ThermalModelEstimator, seed: int, a: float = 0.25, b: float = 5.0, hours: int = 48) -> float:
+    """Simulate a room with a TPI regulation and a day/night schedule and give the
+    measurements (with noise and rounded at 0.1°) to the estimator. Returns the last temperature"""
+    rnd = random.Random(seed)
+    temperature = 18.0
+    offset_sec = 0
+    while offset_sec < hours * 3600:
+        ext_temperature = 5 + 3 * math.sin(offset_sec / 86400 * 2 * math.pi)
+        target = 20 if 6 <= (offset_sec // 3600) % 24 < 22 else 17
+        power = max(0, min(1, 0.4 * (target - temperature) + 0.01 * (target - ext_temperature)))
+        for _ in range(120):
+            temperature += (a * (ext_temperature - temperature) + b * power) / 3600
+        offset_sec += 120
+        estimator.add_measurement(round(temperature + rnd.gauss(0, 0.05), 1), ext_temperature, power, START + timedelta(seconds=offset_sec))
+    return temperature
+
+
+def test_thermal_model_learning():
+    """The time constant and the heating gain are learned from a noisy trace"""
+    for seed in range(3):
+        estimator = ThermalModelEstimator("test")
+        assert estimator.is_ready is False
+        assert estimator.time_constant_hours is None
+
+        simulate_room(estimator, seed)
+
+        assert estimator.is_ready is True
+        assert 3.6 < estimator.time_constant_hours < 4.4
+        assert 4.5 < estimator.heating_gain < 5.5
+
+
+def test_thermal_model_time_to_reach():
+    """The time to reach a temperature is the one of the real room"""
+    estimator = ThermalModelEstimator("test")
+    simulate_room(estimator, 0)
+
+    # the real time to heat from 17 to 20° with 5° outside
+    temperature = 17.0
+    real_sec = 0
+    while temperature < 20:
+        temperature += (0.25 * (5 - temperature) + 5.0) / 3600
+        real_sec += 1
+
+    estimated_sec = estimator.time_to_reach(17, 20, 5)
+    assert abs(estimated_sec - real_sec) < 0.1 * real_sec
+
+    assert estimator.time_to_reach(20, 19, 5) == 0
+    # the equilibrium temperature at full power is 5 + 5 / 0.25 = 25°
+    assert estimator.time_to_reach(15, 26, 5) is None
+    assert estimator.time_to_reach(None, 18, 5) is None
+
+
+def test_thermal_model_observations():
+    """An observation needs a full period without gap"""
+    estimator = ThermalModelEstimator("test", min_period_sec=600)
+
+    assert estimator.add_measurement(20, 5, 0.5, START) is False
+    assert estimator.add_measurement(20.1, 5, 0.5, START + timedelta(minutes=5)) is False
+    # a measurement in the past is ignored
+    assert estimator.add_measurement(20.1, 5, 0.5, START + timedelta(minutes=4)) is False
+    assert estimator.add_measurement(20.2, 5, 0.5, START + timedelta(minutes=10)) is True
+    assert estimator.nb_observations == 1
+
+    # a missing temperature restarts the observation
+    assert estimator.add_measurement(20.2, None, 0.5, START + timedelta(minutes=15)) is False
+    assert estimator.add_measurement(20.3, 5, 0.5, START + timedelta(minutes=20)) is False
+    # a gap too
+    assert estimator.add_measurement(20.4, 5, 0.5, START + timedelta(minutes=90)) is False
+    assert estimator.add_measurement(20.5, 5, 0.5, START + timedelta(minutes=100)) is True
+    assert estimator.nb_observations == 2
+
+
+async def test_optimal_start_manager(hass: HomeAssistant):
+    """The scheduled preset is set as late as possible"""
+    now = datetime(2024, 1, 1, 4, 0, 0, tzinfo=get_tz(hass))
+
+    fake_vtherm = MagicMock(spec=BaseThermostat)
+    type(fake_vtherm).name = PropertyMock(return_value="the name")
+    type(fake_vtherm).now = PropertyMock(side_effect=lambda: now)
+    type(fake_vtherm).hvac_mode = PropertyMock(return_value=HVACMode.HEAT)
+    type(fake_vtherm).preset_modes = PropertyMock(return_value=[PRESET_ECO, PRESET_COMFORT])
+    type(fake_vtherm).ema_temperature = PropertyMock(return_value=17)
+    type(fake_vtherm).current_outdoor_temperature = PropertyMock(return_value=5)
+    type(fake_vtherm).proportional_algorithm = PropertyMock(return_value=None)
+    fake_vtherm.find_preset_temp.return_value = 20
+    fake_vtherm.async_set_preset_mode = AsyncMock()
+    fake_vtherm.async_control_heating = AsyncMock()
+
+    manager = FeatureOptimalStartManager(fake_vtherm, hass)
+    manager.post_init({})
+
+    # 1. no model: the preset is set at the scheduled time
+    await manager.schedule_preset(PRESET_COMFORT, now + timedelta(hours=3))
+    assert manager.scheduled_preset == PRESET_COMFORT
+    assert manager.calculate_lead_sec() == 0
+    assert fake_vtherm.async_set_preset_mode.call_count == 0
+
+    # 2. with a learned model the lead is the time to heat from 17 to 20°
+    simulate_room(manager.thermal_model, 0)
+    lead_sec = manager.calculate_lead_sec()
+    assert 6000 < lead_sec < 7500
+
+    now = now + timedelta(hours=3) - timedelta(seconds=lead_sec) - timedelta(minutes=1)
+    assert await manager.refresh_state() is False
+    assert fake_vtherm.async_set_preset_mode.call_count == 0
+
+    custom_attributes = {}
+    manager.add_custom_attributes(custom_attributes)
+    assert custom_attributes["optimal_start_preset"] == PRESET_COMFORT
+    assert custom_attributes["thermal_time_constant_hours"] is not None
+    assert custom_attributes["thermal_model_observations"] > 0
+
+    now = now + timedelta(minutes=2)
+    assert await manager.refresh_state() is True
+    fake_vtherm.async_set_preset_mode.assert_awaited_once_with(PRESET_COMFORT)
+    assert manager.scheduled_preset is None
+    assert manager._check_cancel is None
+
+    # 3. an unknown preset is ignored
+    await manager.schedule_preset(PRESET_BOOST, now + timedelta(hours=3))
+    assert manager.scheduled_preset is None
+
+    # 4. the learning is stopped while a window is open
+    fake_window_manager = MagicMock(spec=FeatureWindowManager)
+    type(fake_window_manager).is_window_detected = PropertyMock(return_value=True)
+    type(fake_vtherm).window_manager = PropertyMock(return_value=fake_window_manager)
+    nb_observations = manager.thermal_model.nb_observations
+    manager.add_temperature_measurement()
+    assert manager.thermal_model.nb_observations == nb_observations
+    assert manager.thermal_model._start_datetime is None
+
+
+async def test_optimal_start_in_place_update(hass: HomeAssistant):
+    """The periodic check of a scheduled preset survives an in place update of the VTherm"""
+    now = datetime(2024, 1, 1, 4, 0, 0, tzinfo=get_tz(hass))
+
+    fake_vtherm = MagicMock(spec=BaseThermostat)
+    type(fake_vtherm).name = PropertyMock(return_value="the name")
+    type(fake_vtherm).now = PropertyMock(side_effect=lambda: now)
+    type(fake_vtherm).hvac_mode = PropertyMock(return_value=HVACMode.HEAT)
+    type(fake_vtherm).preset_modes = PropertyMock(return_value=[PRESET_ECO, PRESET_COMFORT])
+    type(fake_vtherm).ema_temperature = PropertyMock(return_value=17)
+    type(fake_vtherm).current_outdoor_temperature = PropertyMock(return_value=5)
+    type(fake_vtherm).proportional_algorithm = PropertyMock(return_value=None)
+    fake_vtherm.find_preset_temp.return_value = 20
+    fake_vtherm.async_set_preset_mode = AsyncMock()
+    fake_vtherm.async_control_heating = AsyncMock()
+
+    manager = FeatureOptimalStartManager(fake_vtherm, hass)
+    manager.post_init({})
+    await manager.start_listening()
+    assert manager._check_cancel is None
+
+    await manager.schedule_preset(PRESET_COMFORT, now + timedelta(hours=3))
+    assert manager._check_cancel is not None
+
+    # the in place update of the VTherm stops and starts the managers
+    manager.stop_listening()
+    manager.update_config({})
+    await manager.start_listening()
+    assert await manager.refresh_state() is False
+    assert manager.scheduled_preset == PRESET_COMFORT
+    assert manager._check_cancel is not None
+
+    # the periodic check sets the preset when it is due
+    now = now + timedelta(hours=3)
+    await manager._check_optimal_start()
+    fake_vtherm.async_set_preset_mode.assert_awaited_once_with(PRESET_COMFORT)
+    assert manager._check_cancel is None
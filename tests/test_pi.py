@@ -207,3 +207,41 @@ def test_pi_algorithm_strong():
     assert the_algo.calculate_regulated_temperature(19, 10) == 24.0
     assert the_algo.calculate_regulated_temperature(19, 10) == 24.0
     assert the_algo.calculate_regulated_temperature(19, 10) == 24.0
+
+
+def test_pi_algorithm_control_tick():
+    """Test that the accumulated error only advances on control ticks when the inputs are unchanged"""
+
+    the_algo = PITemperatureRegulator(
+        target_temp=20,
+        kp=0.2,
+        ki=0.05,
+        k_ext=0.1,
+        offset_max=2,
+        stabilization_threshold=0.1,
+        accumulated_error_threshold=20,
+    )
+
+    assert the_algo.calculate_regulated_temperature(19, 10) == 21.1
+    assert the_algo.accumulated_error == 1
+
+    # Repeated events between two control ticks: the last result is returned
+    assert the_algo.calculate_regulated_temperature(19, 10, is_control_tick=False) == 21.1
+    assert the_algo.calculate_regulated_temperature(19.001, 10, is_control_tick=False) == 21.1
+    assert the_algo.accumulated_error == 1
+    assert the_algo.cache_stats == {"nb_hit": 2, "nb_miss": 1}
+
+    # A control tick always advances the accumulated error
+    assert the_algo.calculate_regulated_temperature(19, 10) == 21.2
+    assert the_algo.accumulated_error == 2
+
+    # A change of target is a new calculation
+    the_algo.set_target_temp(21)
+    assert the_algo.calculate_regulated_temperature(19, 10, is_control_tick=False) == 22.5
+    assert the_algo.accumulated_error == 4
+
+    # A restored accumulated error invalidates the last result
+    the_algo.set_accumulated_error(0)
+    assert the_algo.calculate_regulated_temperature(19, 10, is_control_tick=False) == 22.4
+    assert the_algo.accumulated_error == 2
+    assert the_algo.cache_stats == {"nb_hit": 2, "nb_miss": 4}
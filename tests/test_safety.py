@@ -1,7 +1,7 @@
 # pylint: disable=wildcard-import, unused-wildcard-import, protected-access, unused-argument, line-too-long
 
 """ Test the Security featrure """
-from unittest.mock import patch, call, PropertyMock, MagicMock
+from unittest.mock import patch, call, PropertyMock, MagicMock, AsyncMock
 from datetime import timedelta, datetime
 import logging
 
@@ -108,6 +108,62 @@ async def test_safety_feature_manager_post_init(
         )
 
 
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_safety_feature_manager_deadline(hass: HomeAssistant):
+    """Test the safety deadline is calculated at each measurement and the check is done only after it"""
+    tz = get_tz(hass)  # pylint: disable=invalid-name
+    now: datetime = datetime.now(tz=tz)
+    last_temperature_measure = now
+    last_ext_temperature_measure = now - timedelta(minutes=2)
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+
+    fake_vtherm = MagicMock(spec=BaseThermostat)
+    type(fake_vtherm).name = PropertyMock(return_value="the name")
+    type(fake_vtherm).now = PropertyMock(side_effect=lambda: now)
+    type(fake_vtherm).is_over_climate = PropertyMock(return_value=False)
+    type(fake_vtherm).hvac_mode = PropertyMock(return_value=HVACMode.HEAT)
+    type(fake_vtherm).temperature_sensor_entity_id = PropertyMock(return_value="sensor.the_temp")
+    type(fake_vtherm).ext_temperature_sensor_entity_id = PropertyMock(return_value="sensor.the_ext_temp")
+    type(fake_vtherm).last_temperature_measure = PropertyMock(side_effect=lambda: last_temperature_measure)
+    type(fake_vtherm).last_ext_temperature_measure = PropertyMock(side_effect=lambda: last_ext_temperature_measure)
+    fake_vtherm.async_control_heating = AsyncMock()
+
+    safety_manager = FeatureSafetyManager(fake_vtherm, hass)
+    safety_manager.post_init({CONF_SAFETY_DELAY_MIN: 10})
+    assert safety_manager.deadline is None
+
+    # 1. the deadline is the oldest measurement + the delay. The measurements are given to the watchdog
+    safety_manager.update_deadline()
+    assert safety_manager.deadline == last_ext_temperature_measure + timedelta(minutes=10)
+    assert api.sensor_watchdog.next_deadline == safety_manager.deadline
+
+    # 2. before the deadline, the safety is off without any other check
+    now = now + timedelta(minutes=7)
+    assert await safety_manager.refresh_state() is False
+    assert safety_manager.safety_state == STATE_OFF
+    assert fake_vtherm.proportional_algorithm.mock_calls == []
+
+    # 3. a new measurement moves the deadline
+    last_ext_temperature_measure = now
+    safety_manager.update_deadline()
+    assert safety_manager.deadline == last_temperature_measure + timedelta(minutes=10)
+    assert api.sensor_watchdog.next_deadline == safety_manager.deadline
+
+    # 4. the deadline is reached: the watchdog asks for a control
+    api._set_now(last_temperature_measure + timedelta(minutes=10))
+    await api.sensor_watchdog.check_deadlines()
+    fake_vtherm.async_control_heating.assert_awaited_once()
+    assert list(api.sensor_watchdog.stale_sensors) == ["sensor.the_temp"]
+
+    # 5. the removal of the VTherm cleans the watchdog
+    api.sensor_watchdog.unregister(fake_vtherm)
+    assert api.sensor_watchdog.stale_sensors == {}
+    assert api.sensor_watchdog.next_deadline is None
+    api._set_now(None)
+
+
 @pytest.mark.parametrize("expected_lingering_tasks", [True])
 @pytest.mark.parametrize("expected_lingering_timers", [True])
 async def test_security_feature(hass: HomeAssistant, skip_hass_states_is_state):
@@ -0,0 +1,126 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the sensor subscription hub """
+import logging
+from unittest.mock import patch, AsyncMock
+
+from custom_components.versatile_thermostat.sensor_hub import (
+    SensorSubscriptionHub,
+    SensorReading,
+    READING_TEMPERATURE,
+    READING_STATE,
+)
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+async def test_sensor_hub_fan_out(hass: HomeAssistant):
+    """Test that a sensor is listened once and the reading is parsed once for all subscribers"""
+    hub = SensorSubscriptionHub(hass)
+
+    callback1 = AsyncMock()
+    callback2 = AsyncMock()
+    callback3 = AsyncMock()
+
+    unsub1 = hub.subscribe("sensor.ext_temp", READING_TEMPERATURE, callback1)
+    unsub2 = hub.subscribe("sensor.ext_temp", READING_TEMPERATURE, callback2)
+    unsub3 = hub.subscribe("binary_sensor.presence", READING_STATE, callback3)
+
+    assert hub.entity_ids == ["sensor.ext_temp", "binary_sensor.presence"]
+    assert hub.nb_subscribers("sensor.ext_temp") == 2
+    assert hub.nb_subscribers("binary_sensor.presence") == 1
+
+    # 1. a valid temperature
+    with patch(
+        "custom_components.versatile_thermostat.sensor_hub.parse_temperature",
+        return_value=12.5,
+    ) as mock_parse:
+        hass.states.async_set("sensor.ext_temp", "12.5")
+        await hass.async_block_till_done()
+
+        assert mock_parse.call_count == 1
+
+    assert callback1.call_count == 1
+    assert callback2.call_count == 1
+    assert callback3.call_count == 0
+    reading1: SensorReading = callback1.call_args.args[1]
+    reading2: SensorReading = callback2.call_args.args[1]
+    assert reading1 is reading2
+    assert reading1.value == 12.5
+    assert reading1.is_valid is True
+
+    # 2. an invalid temperature
+    hass.states.async_set("sensor.ext_temp", "nan")
+    await hass.async_block_till_done()
+
+    reading1 = callback1.call_args.args[1]
+    assert reading1.value is None
+    assert reading1.is_available is True
+    assert reading1.is_valid is False
+
+    # 3. an unavailable temperature
+    hass.states.async_set("sensor.ext_temp", STATE_UNAVAILABLE)
+    await hass.async_block_till_done()
+
+    reading1 = callback1.call_args.args[1]
+    assert reading1.is_available is False
+
+    # 4. a state reading
+    hass.states.async_set("binary_sensor.presence", STATE_ON)
+    await hass.async_block_till_done()
+
+    assert callback3.call_count == 1
+    assert callback3.call_args.args[1].value == STATE_ON
+
+    # 5. unsubscribe
+    unsub1()
+    assert hub.nb_subscribers("sensor.ext_temp") == 1
+    unsub2()
+    assert hub.nb_subscribers("sensor.ext_temp") == 0
+    assert hub.entity_ids == ["binary_sensor.presence"]
+
+    hass.states.async_set("sensor.ext_temp", "13")
+    await hass.async_block_till_done()
+    assert callback1.call_count == 3
+    assert callback2.call_count == 3
+
+    unsub3()
+    assert hub.entity_ids == []
+
+
+async def test_sensor_hub_subscriber_error(hass: HomeAssistant):
+    """Test that an error in a subscriber doesn't prevent the others to be called"""
+    hub = SensorSubscriptionHub(hass)
+
+    callback1 = AsyncMock(side_effect=HomeAssistantError("boom"))
+    callback2 = AsyncMock()
+
+    hub.subscribe("sensor.ext_temp", READING_TEMPERATURE, callback1)
+    hub.subscribe("sensor.ext_temp", READING_TEMPERATURE, callback2)
+
+    hass.states.async_set("sensor.ext_temp", "10")
+    await hass.async_block_till_done()
+
+    assert callback1.call_count == 1
+    assert callback2.call_count == 1
+
+    hub.stop()
+    assert hub.entity_ids == []
+
+
+async def test_sensor_hub_stopped_with_last_entry(hass: HomeAssistant):
+    """Test that the hub stops listening when the last entry is removed"""
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    entry1 = MockConfigEntry(domain=DOMAIN, title="TheFirstMockName", unique_id="uniqueId1", data={})
+    entry2 = MockConfigEntry(domain=DOMAIN, title="TheSecondMockName", unique_id="uniqueId2", data={})
+    api.add_entry(entry1)
+    api.add_entry(entry2)
+
+    api.sensor_hub.subscribe("sensor.ext_temp", READING_TEMPERATURE, AsyncMock())
+
+    api.remove_entry(entry1)
+    assert api.sensor_hub.entity_ids == ["sensor.ext_temp"]
+
+    api.remove_entry(entry2)
+    assert api.sensor_hub.entity_ids == []
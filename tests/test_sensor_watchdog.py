@@ -0,0 +1,219 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the central watchdog of the temperature sensors """
+from unittest.mock import MagicMock, AsyncMock, PropertyMock
+from datetime import datetime, timedelta
+
+from custom_components.versatile_thermostat.central_sensor_watchdog import CentralSensorWatchdog
+from custom_components.versatile_thermostat.feature_safety_manager import FeatureSafetyManager
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+
+def create_fake_vtherm(name: str) -> MagicMock:
+    """A fake VTherm which records the stale sensor notifications"""
+    fake_vtherm = MagicMock()
+    fake_vtherm.entity_id = f"climate.{name}"
+    fake_vtherm.safety_manager.async_on_stale_sensor = AsyncMock()
+    return fake_vtherm
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_sensor_watchdog(hass: HomeAssistant):
+    """A sensor shared by two VTherms is watched with its own deadlines and the VTherms are notified in one batch"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+    watchdog: CentralSensorWatchdog = api.sensor_watchdog
+
+    vtherm1 = create_fake_vtherm("vtherm1")
+    vtherm2 = create_fake_vtherm("vtherm2")
+    vtherm3 = create_fake_vtherm("vtherm3")
+
+    # 1. vtherm1 and vtherm2 share the outdoor sensor with different delays
+    watchdog.report_measurement(vtherm1, "sensor.ext", now, 10)
+    watchdog.report_measurement(vtherm2, "sensor.ext", now, 20)
+    watchdog.report_measurement(vtherm3, "sensor.ext", now, 10)
+    watchdog.report_measurement(vtherm1, "sensor.temp1", now, 10)
+    assert watchdog.next_deadline == now + timedelta(minutes=10)
+    assert len(watchdog._heap) == 3
+
+    # 2. the same measurement reported again does nothing
+    watchdog.report_measurement(vtherm3, "sensor.ext", now, 10)
+    assert len(watchdog._heap) == 3
+
+    # 3. temp1 is updated but not the outdoor sensor
+    api._set_now(now + timedelta(minutes=5))
+    watchdog.report_measurement(vtherm1, "sensor.temp1", now + timedelta(minutes=5), 10)
+    assert watchdog.next_deadline == now + timedelta(minutes=10)
+
+    # 4. the first deadline of the outdoor sensor: the VTherms with a 10 min delay are notified
+    api._set_now(now + timedelta(minutes=10))
+    await watchdog.check_deadlines()
+    assert watchdog.stale_sensors == {"sensor.ext": now}
+    vtherm1.safety_manager.async_on_stale_sensor.assert_awaited_once()
+    vtherm3.safety_manager.async_on_stale_sensor.assert_awaited_once()
+    vtherm2.safety_manager.async_on_stale_sensor.assert_not_awaited()
+    assert watchdog.find_stale_dependents() == [vtherm1, vtherm2, vtherm3]
+    assert watchdog.next_deadline == now + timedelta(minutes=15)
+
+    # 5. temp1 is stale too, then the second deadline of the outdoor sensor
+    api._set_now(now + timedelta(minutes=20))
+    await watchdog.check_deadlines()
+    assert list(watchdog.stale_sensors) == ["sensor.ext", "sensor.temp1"]
+    assert vtherm1.safety_manager.async_on_stale_sensor.await_count == 2
+    vtherm2.safety_manager.async_on_stale_sensor.assert_awaited_once()
+    assert watchdog.next_deadline is None
+
+    # 6. a new measurement of the outdoor sensor removes it from the stale sensors
+    watchdog.report_measurement(vtherm2, "sensor.ext", now + timedelta(minutes=20), 20)
+    assert list(watchdog.stale_sensors) == ["sensor.temp1"]
+    assert watchdog.next_deadline == now + timedelta(minutes=30)
+
+    # 7. the obsolete deadlines do not accumulate
+    for i in range(100):
+        watchdog.report_measurement(vtherm1, "sensor.temp1", now + timedelta(minutes=20, seconds=i + 1), 10)
+    assert len(watchdog._heap) < 30
+    assert watchdog.stale_sensors == {}
+
+    # 8. the removal of the VTherms
+    for vtherm in (vtherm1, vtherm2, vtherm3):
+        watchdog.unregister(vtherm)
+    assert watchdog.next_deadline is None
+    assert watchdog._dependents == {}
+    api._set_now(None)
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_sensor_watchdog_shared_sensor_never_goes_back(hass: HomeAssistant):
+    """Two VTherms report different times for a shared sensor: the last measure of the sensor only moves forward"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+    watchdog: CentralSensorWatchdog = api.sensor_watchdog
+
+    vtherm1 = create_fake_vtherm("vtherm1")
+    vtherm2 = create_fake_vtherm("vtherm2")
+
+    watchdog.report_measurement(vtherm1, "sensor.ext", now, 10)
+    watchdog.report_measurement(vtherm2, "sensor.ext", now + timedelta(minutes=3), 10)
+    assert watchdog.next_deadline == now + timedelta(minutes=13)
+
+    # vtherm1 reports again its older measure (its other sensor has changed): the sensor does not go back
+    watchdog.report_measurement(vtherm1, "sensor.ext", now, 10)
+    assert watchdog._last_measures["sensor.ext"] == now + timedelta(minutes=3)
+    assert watchdog.next_deadline == now + timedelta(minutes=13)
+
+    api._set_now(now + timedelta(minutes=10))
+    await watchdog.check_deadlines()
+    assert watchdog.stale_sensors == {}
+    vtherm1.safety_manager.async_on_stale_sensor.assert_not_awaited()
+
+    api._set_now(now + timedelta(minutes=13))
+    await watchdog.check_deadlines()
+    assert watchdog.stale_sensors == {"sensor.ext": now + timedelta(minutes=3)}
+    vtherm1.safety_manager.async_on_stale_sensor.assert_awaited_once()
+    vtherm2.safety_manager.async_on_stale_sensor.assert_awaited_once()
+
+    for vtherm in (vtherm1, vtherm2):
+        watchdog.unregister(vtherm)
+    api._set_now(None)
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_sensor_watchdog_ignores_reset_measures(hass: HomeAssistant):
+    """The reset of the measurement times of a VTherm (at a preset change) does not mark a stale sensor as fresh"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+    watchdog: CentralSensorWatchdog = api.sensor_watchdog
+    last_temperature_measure = last_ext_temperature_measure = now
+
+    fake_vtherm = MagicMock(spec=BaseThermostat)
+    type(fake_vtherm).name = PropertyMock(return_value="the name")
+    type(fake_vtherm).temperature_sensor_entity_id = PropertyMock(return_value="sensor.the_temp")
+    type(fake_vtherm).ext_temperature_sensor_entity_id = PropertyMock(return_value="sensor.ext")
+    type(fake_vtherm).last_temperature_measure = PropertyMock(side_effect=lambda: last_temperature_measure)
+    type(fake_vtherm).last_ext_temperature_measure = PropertyMock(side_effect=lambda: last_ext_temperature_measure)
+    safety_manager = FeatureSafetyManager(fake_vtherm, hass)
+    safety_manager.post_init({CONF_SAFETY_DELAY_MIN: 10})
+    fake_vtherm.safety_manager = safety_manager
+    safety_manager.update_deadline()
+
+    # another VTherm shares the outdoor sensor
+    other_vtherm = create_fake_vtherm("other")
+    watchdog.report_measurement(other_vtherm, "sensor.ext", now, 10)
+
+    api._set_now(now + timedelta(minutes=10))
+    await watchdog.check_deadlines()
+    assert set(watchdog.stale_sensors) == {"sensor.the_temp", "sensor.ext"}
+
+    # 1. the reset of the measurements (a preset change) is not reported
+    last_temperature_measure = last_ext_temperature_measure = now + timedelta(minutes=10)
+    safety_manager.update_deadline(is_sensor_measure=False)
+    assert safety_manager.deadline == now + timedelta(minutes=20)
+    assert set(watchdog.stale_sensors) == {"sensor.the_temp", "sensor.ext"}
+
+    # 2. a real measurement of the temperature is reported but not the reset outdoor temperature
+    last_temperature_measure = now + timedelta(minutes=11)
+    safety_manager.update_deadline()
+    assert list(watchdog.stale_sensors) == ["sensor.ext"]
+
+    for vtherm in (fake_vtherm, other_vtherm):
+        watchdog.unregister(vtherm)
+    api._set_now(None)
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_stale_sensors_sensor(hass: HomeAssistant, init_central_config):
+    """The central configuration has a sensor which lists the stale sensors"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+
+    stale_sensors_sensor = search_entity(hass, "sensor.stale_sensors", "sensor")
+    assert stale_sensors_sensor
+    assert stale_sensors_sensor.state == 0
+
+    vtherm1 = create_fake_vtherm("vtherm1")
+    api.sensor_watchdog.report_measurement(vtherm1, "sensor.ext", now, 10)
+    api._set_now(now + timedelta(minutes=11))
+    await api.sensor_watchdog.check_deadlines()
+
+    assert stale_sensors_sensor.state == 1
+    assert stale_sensors_sensor.extra_state_attributes == {
+        "stale_entity_ids": ["sensor.ext"],
+        "last_measures": {"sensor.ext": now.isoformat()},
+        "affected_vtherms": ["climate.vtherm1"],
+    }
+
+    api.sensor_watchdog.unregister(vtherm1)
+    assert stale_sensors_sensor.state == 0
+    api._set_now(None)
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_sensor_watchdog_lazy_compaction(hass: HomeAssistant):
+    """The obsolete deadlines are counted and the heap is only rebuilt when they are more than the half of it"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+    watchdog: CentralSensorWatchdog = api.sensor_watchdog
+
+    vtherms = [create_fake_vtherm(f"vtherm{i}") for i in range(10)]
+    with patch.object(watchdog, "_compact", wraps=watchdog._compact) as mock_compact:
+        for i in range(100):
+            for j, vtherm in enumerate(vtherms):
+                watchdog.report_measurement(vtherm, f"sensor.temp{j}", now + timedelta(seconds=i), 10)
+                watchdog.report_measurement(vtherm, "sensor.ext", now + timedelta(seconds=i), 20)
+            nb_valid = sum(1 for entry in watchdog._heap if watchdog._is_valid(*entry))
+            assert watchdog._nb_obsolete == len(watchdog._heap) - nb_valid
+            assert watchdog._nb_obsolete <= len(watchdog._heap) // 2
+
+    # the heap is not rebuilt at each of the 2000 measurements
+    assert mock_compact.call_count < 100
+    assert watchdog.next_deadline == now + timedelta(minutes=10, seconds=99)
+
+    for vtherm in vtherms:
+        watchdog.unregister(vtherm)
+    assert watchdog._heap == []
+    api._set_now(None)
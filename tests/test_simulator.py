@@ -0,0 +1,82 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the VTherms in the accelerated-time house simulator.
+
+    A simulated day of a house with a room of each type of VTherm is run in a few seconds.
+    The comfort error, the energy, the switching count and the service calls count of each
+    configuration are appended to the JSON file given by VTHERM_SIMULATOR_OUTPUT so that they
+    can be compared between versions.
+
+    Example: VTHERM_SIMULATOR_OUTPUT=simulator.json pytest tests/test_simulator.py
+"""
+import os
+from datetime import timedelta
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+from .simulator import ClimateUnit, HouseSimulator, OutdoorProfile, RoomModel, SimulatedRoom
+
+SIMULATOR_OUTPUT = os.environ.get("VTHERM_SIMULATOR_OUTPUT")
+
+
+def test_room_model():
+    """The room goes to the outdoor temperature without heating and to its equilibrium with heating"""
+    room = RoomModel(temperature=20, time_constant_hours=4, heating_rate=5)
+    for _ in range(48):
+        room.step(0, 5, 3600)
+    assert room.temperature == pytest.approx(5, abs=0.1)
+
+    # the equilibrium is outdoor + heating_rate * time_constant * power
+    for _ in range(48):
+        room.step(0.5, 5, 3600)
+    assert room.temperature == pytest.approx(15, abs=0.1)
+
+    # the losses are bigger when a window is open
+    closed = RoomModel(temperature=20)
+    opened = RoomModel(temperature=20)
+    closed.step(0, 5, 600)
+    opened.step(0, 5, 600, is_window_open=True)
+    assert opened.temperature < closed.temperature - 1
+
+    unit = ClimateUnit(hvac_mode="cool", setpoint=24)
+    assert unit.power(26) == -1
+    assert unit.power(23) == 0
+    assert OutdoorProfile(mean=5, amplitude=4, min_hour=5).temperature(5) == pytest.approx(1)
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_simulated_day(hass: HomeAssistant):
+    """A simulated day of a house with a room of each type of VTherm"""
+    rooms = [
+        SimulatedRoom("living", CONF_THERMOSTAT_SWITCH, model=RoomModel(temperature=16)),
+        SimulatedRoom("bedroom", CONF_THERMOSTAT_VALVE, target_temperature=18, model=RoomModel(temperature=16, time_constant_hours=6)),
+        SimulatedRoom("office", CONF_THERMOSTAT_CLIMATE, model=RoomModel(temperature=16, heating_rate=8), device_power_kw=2),
+        SimulatedRoom(
+            "kitchen",
+            CONF_THERMOSTAT_SWITCH,
+            model=RoomModel(temperature=19),
+            window_openings=[(timedelta(hours=12), timedelta(minutes=30))],
+            vtherm_config={
+                CONF_USE_WINDOW_FEATURE: True,
+                CONF_WINDOW_SENSOR: "binary_sensor.sim_kitchen_window",
+                CONF_WINDOW_DELAY: 30,
+            },
+        ),
+    ]
+
+    with HouseSimulator(hass, rooms, OutdoorProfile(mean=5, amplitude=4)) as simulator:
+        await simulator.async_setup()
+        results = await simulator.async_run(timedelta(days=1))
+
+    write_result(SIMULATOR_OUTPUT, {"wall_duration_sec": round(simulator.wall_duration_sec, 3), "rooms": results})
+
+    for name, result in results.items():
+        # the rooms are regulated around their target once the first hours are passed
+        assert result["comfort_error"] is not None and result["comfort_error"] < 1.5, name
+        assert result["energy_kwh"] > 0, name
+        assert result["nb_switches"] > 0, name
+        assert result["nb_service_calls"] >= result["nb_switches"], name
+
+    # the over_switch VTherm cycles its heater and the window stops the heating in the kitchen
+    assert results["living"]["nb_switches"] > 10
+    assert simulator.vtherms["kitchen"].window_state == STATE_OFF
+    assert results["kitchen"]["min_temperature"] < 17
@@ -16,6 +16,10 @@ from custom_components.versatile_thermostat.thermostat_switch import (
     ThermostatOverSwitch,
 )
 
+from custom_components.versatile_thermostat.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
 from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
 
 
@@ -262,3 +266,51 @@ async def test_over_switch_deactivate_preset(
         assert False
     finally:
         assert entity.preset_mode is PRESET_NONE
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_parallel_startup(hass: HomeAssistant, skip_hass_states_is_state):
+    """Test the startup of all VTherms is concurrent, bounded and instrumented"""
+
+    vtherms = []
+    for i in range(3):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"TheOverSwitchMockName{i}",
+            unique_id=f"uniqueId{i}",
+            data=FULL_SWITCH_CONFIG | {CONF_NAME: f"TheOverSwitchMockName{i}"},
+        )
+        vtherms.append(await create_thermostat(hass, entry, f"climate.theoverswitchmockname{i}"))
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config({CONF_STARTUP_CONCURRENCY: 2})
+    assert len(api.find_all_vtherms()) == 3
+
+    running = 0
+    max_running = 0
+
+    async def slow_startup(_):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_startup",
+        side_effect=slow_startup,
+    ) as mock_startup:
+        await api.init_vtherm_links()
+
+    assert mock_startup.call_count == 3
+    assert max_running == 2
+    assert api.startup_total_duration >= 0.02
+    for vtherm in vtherms:
+        assert api.startup_durations[vtherm.entity_id] >= 0.01
+
+    # the diagnostics gives the startup durations
+    diagnostics = await async_get_config_entry_diagnostics(hass, hass.config_entries.async_get_entry(vtherms[0].unique_id))
+    assert diagnostics["startup"]["total_duration_sec"] == api.startup_total_duration
+    assert diagnostics["startup"]["duration_sec"] == api.startup_durations[vtherms[0].entity_id]
+    assert len(diagnostics["startup"]["all_durations_sec"]) == 3
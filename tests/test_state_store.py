@@ -0,0 +1,81 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the persistent store of the learned state """
+from unittest.mock import patch
+from datetime import datetime, timedelta
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.versatile_thermostat.thermostat_climate import ThermostatOverClimate
+from custom_components.versatile_thermostat.state_store import STORAGE_KEY, STORAGE_VERSION
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+THERMAL_MODEL_STATE = {"a": 0.25, "b": 5.0, "p11": 0.01, "p12": 0.0, "p22": 0.2, "nb_observations": 100}
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_state_store(hass: HomeAssistant, skip_hass_states_is_state, hass_storage):
+    """The learned state is restored at startup and saved with a delay"""
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": {
+            "vtherms": {
+                "uniqueId": {
+                    "total_energy": 12.5,
+                    "thermal_model": THERMAL_MODEL_STATE,
+                    "regulation_accumulated_error": 3.0,
+                },
+                "anotherId": {"total_energy": 1},
+            }
+        },
+    }
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config({CONF_STATE_STORE_PARAMS: {"save_delay_sec": 30}})
+    assert api.state_store_save_delay_sec == 30
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverClimateMockName",
+        unique_id="uniqueId",
+        data=PARTIAL_CLIMATE_CONFIG,
+    )
+    fake_underlying_climate = MockClimate(hass, "mockUniqueId", "MockClimateName", {})
+
+    with patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingClimate.find_underlying_climate",
+        return_value=fake_underlying_climate,
+    ):
+        entity: ThermostatOverClimate = await create_thermostat(hass, entry, "climate.theoverclimatemockname")
+        assert entity
+
+    # 1. the learned state is restored
+    assert entity.total_energy == 12.5
+    assert entity._optimal_start_manager.thermal_model.is_ready
+    assert entity._optimal_start_manager.thermal_model.time_constant_hours == 4
+    assert entity._regulation_algo.accumulated_error == 3.0
+
+    # 2. the save is delayed and batched
+    entity._total_energy = 15
+    api.state_store.async_schedule_save()
+    api.state_store.async_schedule_save()
+    assert hass_storage[STORAGE_KEY]["data"]["vtherms"]["uniqueId"]["total_energy"] == 12.5
+
+    async_fire_time_changed(hass, datetime.now(tz=get_tz(hass)) + timedelta(seconds=31))
+    await hass.async_block_till_done()
+
+    records = hass_storage[STORAGE_KEY]["data"]["vtherms"]
+    assert records["uniqueId"]["total_energy"] == 15
+    assert records["uniqueId"]["thermal_model"] == THERMAL_MODEL_STATE
+    assert records["uniqueId"]["regulation_accumulated_error"] == 3.0
+    # the records of the other VTherms are kept
+    assert records["anotherId"] == {"total_energy": 1}
+    assert api.state_store.nb_saves == 1
+
+    # 3. the removal of a VTherm keeps its last state. A deleted entry is removed
+    entity.remove_thermostat()
+    assert "uniqueId" in api.state_store.records
+    api.state_store.remove("anotherId")
+    assert "anotherId" not in api.state_store.records
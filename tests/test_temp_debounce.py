@@ -0,0 +1,110 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the debounce of the temperature changes """
+import logging
+from unittest.mock import patch, MagicMock
+from datetime import datetime, timedelta
+
+from custom_components.versatile_thermostat.base_thermostat import BaseThermostat
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+logging.getLogger().setLevel(logging.DEBUG)
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_temperature_debounce(hass: HomeAssistant, skip_hass_states_is_state):
+    """Test that temperature changes are coalesced and the last one is always processed"""
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data={
+            CONF_NAME: "TheOverSwitchMockName",
+            CONF_THERMOSTAT_TYPE: CONF_THERMOSTAT_SWITCH,
+            CONF_TEMP_SENSOR: "sensor.mock_temp_sensor",
+            CONF_EXTERNAL_TEMP_SENSOR: "sensor.mock_ext_temp_sensor",
+            CONF_CYCLE_MIN: 5,
+            CONF_TEMP_MIN: 15,
+            CONF_TEMP_MAX: 30,
+            CONF_USE_WINDOW_FEATURE: False,
+            CONF_USE_MOTION_FEATURE: False,
+            CONF_USE_POWER_FEATURE: False,
+            CONF_USE_PRESENCE_FEATURE: False,
+            CONF_HEATER: "switch.mock_switch",
+            CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+            CONF_TPI_COEF_INT: 0.3,
+            CONF_TPI_COEF_EXT: 0.01,
+            CONF_MINIMAL_ACTIVATION_DELAY: 30,
+            CONF_SAFETY_DELAY_MIN: 5,
+            CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+        },
+    )
+
+    entity: BaseThermostat = await create_thermostat(
+        hass, entry, "climate.theoverswitchmockname"
+    )
+    assert entity
+    # simulate the temperature_debounce_params global configuration
+    entity._temp_debounce_min_interval_sec = 60
+    entity._temp_debounce_min_dtemp = 0.5
+
+    now = datetime.now(get_tz(hass))
+    entity._set_now(now)
+
+    with patch(
+        "custom_components.versatile_thermostat.thermostat_switch.ThermostatOverSwitch.recalculate"
+    ) as mock_recalculate, patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_control_heating"
+    ) as mock_control_heating, patch(
+        "custom_components.versatile_thermostat.base_thermostat.async_call_later",
+        return_value=MagicMock(),
+    ) as mock_call_later:
+        # 1. the first change is processed immediately
+        await send_temperature_change_event(entity, 18, now)
+        assert mock_recalculate.call_count == 1
+        assert mock_control_heating.call_count == 1
+        assert mock_call_later.call_count == 0
+
+        # 2. a small change 10 sec later is deferred at the end of the interval
+        now = now + timedelta(seconds=10)
+        entity._set_now(now)
+        await send_temperature_change_event(entity, 18.1, now)
+        assert entity.current_temperature == 18.1
+        assert mock_recalculate.call_count == 1
+        assert mock_control_heating.call_count == 1
+        assert mock_call_later.call_count == 1
+        assert mock_call_later.call_args.args[1] == 50
+
+        # 3. another small change don't rearm the timer
+        now = now + timedelta(seconds=10)
+        entity._set_now(now)
+        await send_temperature_change_event(entity, 18.2, now)
+        assert mock_recalculate.call_count == 1
+        assert mock_call_later.call_count == 1
+
+        # 4. the timer fires -> the last value is processed
+        await mock_call_later.call_args.args[2](None)
+        assert mock_recalculate.call_count == 2
+        assert mock_control_heating.call_count == 2
+        assert entity._last_temp_control_temp == 18.2
+        assert entity._cancel_temp_debounce is None
+
+        # 5. a big change is processed immediately
+        now = now + timedelta(seconds=10)
+        entity._set_now(now)
+        await send_temperature_change_event(entity, 17.5, now)
+        assert mock_recalculate.call_count == 3
+        assert mock_control_heating.call_count == 3
+        assert mock_call_later.call_count == 1
+
+        # 6. a small change after the interval is processed immediately
+        now = now + timedelta(seconds=70)
+        entity._set_now(now)
+        await send_temperature_change_event(entity, 17.6, now)
+        assert mock_recalculate.call_count == 4
+        assert mock_control_heating.call_count == 4
+        assert mock_call_later.call_count == 1
+
+    entity.remove_thermostat()
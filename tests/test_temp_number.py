@@ -889,6 +889,37 @@ async def test_change_central_config_temperature(
         vtherm2.find_preset_temp(preset_name) == 15
     )  # 15 is the min temp which is the default
 
+    # 3. Only the VTherm which uses the central temperature depends on it
+    vtherm_api: VersatileThermostatAPI = VersatileThermostatAPI.get_vtherm_api(hass)
+    central_config_id = vtherm_api.find_central_configuration().entry_id
+    assert vtherm_api.find_central_preset_dependents(central_config_id, "boost_temp") == [vtherm]
+    assert vtherm_api.find_central_preset_dependents(central_config_id, "boost_away_temp") == [vtherm]
+    assert vtherm_api.find_central_preset_dependents(vtherm2.unique_id, "boost_temp") == []
+
+    # 4. The current preset is re-applied only if its temperature changes
+    await vtherm.async_set_preset_mode(PRESET_ECO)
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_set_preset_mode_internal"
+    ) as mock_set_preset_mode_internal:
+        await temp_entity.async_set_native_value(20.5)
+        await asyncio.sleep(0.1)
+        assert vtherm.find_preset_temp(preset_name) == 20.5
+        assert mock_set_preset_mode_internal.call_count == 0
+
+        eco_entity = search_entity(
+            hass,
+            "number.central_configuration_preset_eco" + PRESET_TEMP_SUFFIX,
+            NUMBER_DOMAIN,
+        )
+        await eco_entity.async_set_native_value(18.2)
+        await asyncio.sleep(0.1)
+        assert vtherm._presets[PRESET_ECO] == 18.2
+        mock_set_preset_mode_internal.assert_called_once_with(PRESET_ECO, True)
+
+    # 5. A removed VTherm is not updated anymore
+    vtherm.remove_thermostat()
+    assert vtherm_api.find_central_preset_dependents(central_config_id, "boost_temp") == []
+
 
 @pytest.mark.parametrize("expected_lingering_timers", [True])
 async def test_change_vtherm_temperature(
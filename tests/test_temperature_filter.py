@@ -0,0 +1,111 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the temperature filter pipeline """
+
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from custom_components.versatile_thermostat.temperature_filter import (
+    TemperatureFilterPipeline,
+    SpikeRejectionStage,
+    MedianStage,
+    KalmanStage,
+)
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+START = datetime(2024, 1, 1, 8, 0, 0, tzinfo=timezone.utc)
+
+
+def test_spike_rejection_stage():
+    """An isolated spike is rejected but a confirmed change is accepted"""
+    stage = SpikeRejectionStage(max_delta=1.0, max_consecutive=2)
+
+    assert stage.process(20, START) == 20
+    assert stage.process(20.5, START) == 20.5
+    # A spike
+    assert stage.process(25, START) is None
+    assert stage.process(20.4, START) == 20.4
+    assert stage.last_value == 20.4
+
+    # A real change confirmed by the next measurements
+    assert stage.process(23, START) is None
+    assert stage.process(23, START) is None
+    assert stage.process(23, START) == 23
+
+    assert stage.stats["nb_processed"] == 7
+    assert stage.stats["nb_rejected"] == 3
+    assert stage.stats["mean_duration_us"] is not None
+
+
+def test_median_stage():
+    """The median of the last values"""
+    stage = MedianStage(size=3)
+
+    assert stage.process(20, START) == 20
+    assert stage.process(22, START) == 21
+    assert stage.process(30, START) == 22
+    assert stage.process(21, START) == 22
+    assert stage.process(21, START) == 21
+    assert stage.stats["nb_rejected"] == 0
+
+
+@pytest.mark.parametrize("size", [1, 4, 5])
+def test_median_stage_sliding_window(size):
+    """The median is the one of the last size values, with duplicated values"""
+    stage = MedianStage(size=size)
+    values = [20, 21.5, 19, 21.5, 25, 18, 20, 20, 22.5, 19, 21.5, 23]
+    for i, value in enumerate(values):
+        assert stage.process(value, START) == statistics.median(values[max(0, i + 1 - size) : i + 1])
+
+
+def test_kalman_stage():
+    """The Kalman filter smoothes the noise and follows a real change"""
+    stage = KalmanStage(process_noise=0.01, measurement_noise=0.04)
+
+    assert stage.process(20, START) == 20
+    for i, value in enumerate([20.2, 19.8, 20.2, 19.8]):
+        output = stage.process(value, START + timedelta(minutes=i + 1))
+        assert 19.85 < output < 20.15
+
+    for i in range(30):
+        output = stage.process(22, START + timedelta(minutes=10 + i))
+    assert 21.9 < output <= 22
+
+
+def test_pipeline():
+    """The pipeline chains the stages and gives the temperature for the regulation"""
+    ema_params = {"max_alpha": 0.5, "halflife_sec": 300, "precision": 2}
+
+    # Default configuration: only the EMA and the regulation uses the raw temperature
+    pipeline = TemperatureFilterPipeline.from_config("test", {}, ema_params, timezone.utc)
+    assert pipeline.stage_names == [FILTER_STAGE_EMA]
+    assert pipeline.regulation_stage == FILTER_STAGE_RAW
+    assert pipeline.regulation_temperature is None
+
+    assert pipeline.process(20, START) == 20
+    assert pipeline.process(21, START + timedelta(minutes=5)) == 21
+    assert pipeline.output(FILTER_STAGE_EMA) == 20.5
+
+    # A full chain. The EMA stage is added because it is needed by the temperature slope
+    pipeline = TemperatureFilterPipeline.from_config(
+        "test",
+        {"stages": [FILTER_STAGE_SPIKE, FILTER_STAGE_MEDIAN, FILTER_STAGE_KALMAN], "regulation_input": FILTER_STAGE_KALMAN, "spike_max_delta": 1},
+        ema_params,
+        timezone.utc,
+    )
+    assert pipeline.stage_names == [FILTER_STAGE_SPIKE, FILTER_STAGE_MEDIAN, FILTER_STAGE_KALMAN, FILTER_STAGE_EMA]
+    assert pipeline.regulation_stage == FILTER_STAGE_KALMAN
+
+    assert pipeline.process(20, START) == 20
+    # a spike is rejected: the following stages keep their last output
+    assert pipeline.process(30, START + timedelta(minutes=1)) == 20
+    assert pipeline.output(FILTER_STAGE_RAW) == 30
+    assert pipeline.stats[FILTER_STAGE_SPIKE]["nb_rejected"] == 1
+    assert pipeline.stats[FILTER_STAGE_MEDIAN]["nb_processed"] == 1
+    # invalid values are ignored
+    assert pipeline.process(None, START + timedelta(minutes=2)) == 20
+    assert pipeline.process(float("nan"), START + timedelta(minutes=2)) == 20
+
+    # a stage which is not in the chain cannot drive the regulation
+    pipeline = TemperatureFilterPipeline.from_config("test", {"regulation_input": FILTER_STAGE_KALMAN}, ema_params, timezone.utc)
+    assert pipeline.regulation_stage == FILTER_STAGE_RAW
@@ -0,0 +1,84 @@
+# pylint: disable=unused-argument, line-too-long
+""" Test the shared temperature slope estimator """
+
+from datetime import datetime, timedelta
+
+from custom_components.versatile_thermostat.open_window_algorithm import (
+    WindowOpenDetectionAlgorithm,
+)
+from custom_components.versatile_thermostat.temperature_slope import (
+    TemperatureSlopeEstimator,
+)
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def test_temperature_slope_estimator():
+    """The short slope is the one of the configured algorithm and the long slope is the trend on 30 min"""
+    estimator = TemperatureSlopeEstimator("test")
+    reference = WindowOpenDetectionAlgorithm(None, None)
+
+    assert estimator.short_slope is None
+    assert estimator.long_slope is None
+    assert estimator.is_ready is False
+    assert estimator.is_slope_under(-3) is False
+    assert estimator.is_slope_over(0) is False
+
+    # 20 min of stable temperature then a fast decrease
+    temperatures = [20] * 20 + [19.8, 19.6, 19.4, 19.2]
+    for i, temperature in enumerate(temperatures):
+        slope = estimator.add_temp_measurement(temperature, START + timedelta(minutes=i))
+        assert slope == reference.add_temp_measurement(temperature, START + timedelta(minutes=i))
+
+    assert estimator.is_ready is True
+    assert estimator.short_slope < -3
+    assert estimator.is_slope_under(-3) is True
+    assert estimator.is_slope_over(0) is False
+    assert estimator.is_slope_under(None) is False
+    # The long slope is less reactive
+    assert estimator.short_slope < estimator.long_slope < 0
+
+    # No more measurement: the temperature is stable so the long slope goes back near 0
+    estimator.check_age_last_measurement(19.2, START + timedelta(minutes=90))
+    assert -1 < estimator.long_slope <= 0
+
+
+def test_temperature_slope_estimator_regression():
+    """The short slope can use the regression algorithm"""
+    estimator = TemperatureSlopeEstimator("test", algorithm=WINDOW_AUTO_ALGORITHM_REGRESSION, window_sec=600)
+
+    # None temperatures are ignored
+    assert estimator.add_temp_measurement(None, START) is None
+
+    for i in range(10):
+        estimator.add_temp_measurement(20 - 0.1 * i, START + timedelta(minutes=i))
+
+    assert estimator.short_slope == -6.0
+    assert estimator.long_slope == -6.0
+    assert estimator.is_slope_under(-3) is True
+
+
+@pytest.mark.parametrize("period_sec", [5, 10])
+def test_temperature_slope_estimator_high_rate(period_sec):
+    """The long slope covers the whole 30 min horizon even with a sensor which reports every few seconds"""
+    estimator = TemperatureSlopeEstimator("test")
+
+    # the temperature rises at 3°/hour during 20 min and is then stable during 10 min
+    samples = []
+    for i in range(1800 // period_sec + 1):
+        elapsed_sec = i * period_sec
+        temperature = round(20 + 3 * min(elapsed_sec, 1200) / 3600, 2)
+        samples.append((elapsed_sec / 3600, temperature))
+        estimator.add_temp_measurement(temperature, START + timedelta(seconds=elapsed_sec))
+
+    # the least-squares slope of all the samples of the horizon
+    n = len(samples)
+    mean_x = sum(x for x, _ in samples) / n
+    mean_y = sum(y for _, y in samples) / n
+    expected = sum((x - mean_x) * (y - mean_y) for x, y in samples) / sum((x - mean_x) ** 2 for x, _ in samples)
+
+    assert expected > 2
+    # with only the last points the long slope would be 0
+    assert estimator.long_slope == pytest.approx(expected, abs=0.1)
@@ -0,0 +1,114 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the timing instrumentation of the hot paths """
+from unittest.mock import patch, PropertyMock
+from datetime import datetime
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.versatile_thermostat.timing_stats import (
+    HotPathTimings,
+    TimingHistogram,
+    timed,
+    TIMING_CONTROL_HEATING,
+    TIMING_RECALCULATE,
+    TIMING_UPDATE_ATTRIBUTES,
+    TIMING_CALCULATE_SHEDDING,
+)
+from custom_components.versatile_thermostat.sensor import CentralHotPathTimingsSensor
+from custom_components.versatile_thermostat.diagnostics import async_get_config_entry_diagnostics
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+
+class FakeHotPath:
+    """An object with a timed method which calls itself"""
+
+    def __init__(self):
+        self.timings = HotPathTimings(["path"])
+
+    @timed("path")
+    def run(self, depth: int = 0) -> int:
+        """A nested call is not timed twice"""
+        return self.run(depth - 1) + 1 if depth > 0 else 0
+
+
+def test_timing_histogram():
+    """The durations are counted in fixed buckets"""
+    histogram = TimingHistogram()
+    assert histogram.mean_ms is None
+    for duration_sec in (0.00005, 0.0008, 0.0008, 0.003, 2):
+        histogram.record(duration_sec)
+
+    stats = histogram.as_dict()
+    assert stats["count"] == 5
+    assert stats["max_ms"] == 2000
+    assert stats["mean_ms"] == pytest.approx(400.93, abs=0.01)
+    assert stats["buckets"] == {"<0.1ms": 1, "<1ms": 2, "<5ms": 1, ">=1000ms": 1}
+
+    other = TimingHistogram()
+    other.record(0.0008)
+    histogram.merge(other)
+    assert histogram.as_dict()["buckets"]["<1ms"] == 3
+    assert histogram.count == 6
+
+    fake = FakeHotPath()
+    assert fake.run(3) == 3
+    assert fake.timings["path"].count == 1
+    assert not fake.timings["path"].is_running
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_vtherm_timings(hass: HomeAssistant, skip_hass_states_is_state, skip_send_event):
+    """The hot paths of a VTherm are timed and aggregated centrally"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data=FULL_SWITCH_CONFIG,
+    )
+
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+    nb_control_heating = entity.timings[TIMING_CONTROL_HEATING].count
+
+    with patch("custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.call_later", return_value=None), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.is_device_active",
+        new_callable=PropertyMock,
+        return_value=False,
+    ):
+        await send_temperature_change_event(entity, 15, now)
+        await entity.async_set_hvac_mode(HVACMode.HEAT)
+        await entity.async_set_preset_mode(PRESET_COMFORT)
+        await entity.async_control_heating(force=True)
+
+    # the nested calls of super() are timed once
+    assert entity.timings[TIMING_CONTROL_HEATING].count > nb_control_heating
+    assert entity.timings[TIMING_RECALCULATE].count > 0
+    assert entity.timings[TIMING_UPDATE_ATTRIBUTES].count > 0
+    assert not any(histogram.is_running for histogram in entity.timings.histograms.values())
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.timings.record(TIMING_CALCULATE_SHEDDING, 0.001)
+    aggregate = api.aggregate_timings()
+    assert aggregate[TIMING_CONTROL_HEATING].count == entity.timings[TIMING_CONTROL_HEATING].count
+    assert aggregate[TIMING_CALCULATE_SHEDDING].count == 1
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["timings"] == entity.timings.as_dict()
+    assert diagnostics["central_timings"][TIMING_CALCULATE_SHEDDING]["count"] == 1
+
+    # the central sensor gives the part of the time spent in the hot paths
+    sensor = CentralHotPathTimingsSensor(hass, "centralConfigUniqueId", "TheCentralConfigMockName", {CONF_NAME: "TheCentralConfigMockName"})
+    sensor.update_timings()
+    assert sensor.native_value is None
+    assert sensor.extra_state_attributes["slowest_vtherms"] == {entity.entity_id: round(entity.timings.outer_total_sec * 1000, 3)}
+
+    # only the outer paths are summed: the nested ones are already counted in them
+    assert aggregate.outer_total_sec == pytest.approx(aggregate[TIMING_CONTROL_HEATING].total_sec + aggregate[TIMING_CALCULATE_SHEDDING].total_sec)
+    assert aggregate.outer_total_sec < aggregate.total_sec
+
+    api.timings.record(TIMING_CALCULATE_SHEDDING, 0.5)
+    sensor.update_timings()
+    assert sensor.native_value > 0
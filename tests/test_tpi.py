@@ -1,4 +1,5 @@
 """ Test the TPI algorithm """
+from datetime import datetime
 
 from homeassistant.components.climate import HVACMode
 
@@ -277,3 +278,139 @@ async def test_wrong_tpi_parameters(
     except TypeError as e:
         # the normal case
         pass
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_tpi_outdoor_temperature_change(
+    hass: HomeAssistant, skip_hass_states_is_state: None
+):  # pylint: disable=unused-argument, protected-access
+    """Test that an outdoor temperature change recalculate and control only if needed"""
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data={
+            CONF_NAME: "TheOverSwitchMockName",
+            CONF_THERMOSTAT_TYPE: CONF_THERMOSTAT_SWITCH,
+            CONF_TEMP_SENSOR: "sensor.mock_temp_sensor",
+            CONF_EXTERNAL_TEMP_SENSOR: "sensor.mock_ext_temp_sensor",
+            CONF_CYCLE_MIN: 5,
+            CONF_TEMP_MIN: 15,
+            CONF_TEMP_MAX: 30,
+            CONF_USE_WINDOW_FEATURE: False,
+            CONF_USE_MOTION_FEATURE: False,
+            CONF_USE_POWER_FEATURE: False,
+            CONF_USE_PRESENCE_FEATURE: False,
+            CONF_HEATER: "switch.mock_switch",
+            CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+            CONF_TPI_COEF_INT: 0.3,
+            CONF_TPI_COEF_EXT: 0.01,
+            CONF_MINIMAL_ACTIVATION_DELAY: 30,
+            CONF_SAFETY_DELAY_MIN: 5,
+            CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+        },
+    )
+
+    entity: BaseThermostat = await create_thermostat(
+        hass, entry, "climate.theoverswitchmockname"
+    )
+    assert entity
+    # simulate the outdoor_temp_params global configuration
+    entity._outdoor_temp_min_dtemp = 0.5
+    entity._outdoor_temp_min_don_percent = 0.1
+
+    now = datetime.now(get_tz(hass))
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    await entity.async_set_temperature(temperature=15)
+    await send_temperature_change_event(entity, 14, now)
+    await send_ext_temperature_change_event(entity, 5, now)
+    assert entity.proportional_algorithm.on_percent == 0.4
+
+    # 1. the change is not significant -> no recalculation
+    with patch(
+        "custom_components.versatile_thermostat.thermostat_switch.ThermostatOverSwitch.recalculate"
+    ) as mock_recalculate, patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_control_heating"
+    ) as mock_control_heating:
+        await send_ext_temperature_change_event(entity, 4.8, now)
+        assert entity.current_outdoor_temperature == 4.8
+        assert mock_recalculate.call_count == 0
+        assert mock_control_heating.call_count == 0
+
+    # 2. the change is significant but on_percent don't change enough -> recalculation but no control
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_control_heating"
+    ) as mock_control_heating:
+        await send_ext_temperature_change_event(entity, 4, now)
+        assert entity.proportional_algorithm.on_percent == pytest.approx(0.41)
+        assert mock_control_heating.call_count == 0
+
+    # 3. the change is significant and on_percent changes a lot -> control
+    with patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_control_heating"
+    ) as mock_control_heating:
+        await send_ext_temperature_change_event(entity, -10, now)
+        assert entity.proportional_algorithm.on_percent == pytest.approx(0.55)
+        assert mock_control_heating.call_count == 1
+
+    # 4. a calculation made for another reason takes the last outdoor temperature into account
+    await send_ext_temperature_change_event(entity, -10.4, now)
+    await send_temperature_change_event(entity, 14.1, now)
+    with patch(
+        "custom_components.versatile_thermostat.thermostat_switch.ThermostatOverSwitch.recalculate"
+    ) as mock_recalculate:
+        # -10.8 is far enough from -10 but not from -10.4
+        await send_ext_temperature_change_event(entity, -10.8, now)
+        assert mock_recalculate.call_count == 0
+
+    # 5. without tpi_coef_ext the outdoor temperature is not used at all
+    entity._tpi_coef_ext = 0
+    with patch(
+        "custom_components.versatile_thermostat.thermostat_switch.ThermostatOverSwitch.recalculate"
+    ) as mock_recalculate, patch(
+        "custom_components.versatile_thermostat.base_thermostat.BaseThermostat.async_control_heating"
+    ) as mock_control_heating:
+        await send_ext_temperature_change_event(entity, 10, now)
+        assert mock_recalculate.call_count == 0
+        assert mock_control_heating.call_count == 0
+
+    entity.remove_thermostat()
+
+
+def test_tpi_memoization():
+    """Test that the calculation is not done again if the inputs are unchanged at the target step and sensor precision"""
+    tpi_algo = PropAlgorithm(PROPORTIONAL_FUNCTION_TPI, 0.3, 0.01, 5, 0, "climate.vtherm")
+
+    assert tpi_algo.calculate(20, 19, 10, HVACMode.HEAT) is True
+    assert tpi_algo.on_percent == 0.4
+    assert tpi_algo.is_inputs_unchanged(20, 19, 10, HVACMode.HEAT) is True
+
+    # Same temperature at the sensor precision (0.01°)
+    assert tpi_algo.calculate(20, 19.001, 10, HVACMode.HEAT) is False
+    assert tpi_algo.on_percent == 0.4
+    assert tpi_algo.cache_stats == {"nb_hit": 1, "nb_miss": 1}
+
+    assert tpi_algo.calculate(20, 18.9, 10, HVACMode.HEAT) is True
+    assert tpi_algo.on_percent == 0.43
+    assert tpi_algo.calculate(20, 18.9, 10, HVACMode.COOL) is True
+    assert tpi_algo.on_percent == 0
+
+    # A coarser resolution
+    tpi_algo.set_resolution(0.5, 0.1)
+    assert tpi_algo.calculate(20, 18.9, 10, HVACMode.HEAT) is True
+    assert tpi_algo.calculate(20.1, 18.94, 10.02, HVACMode.HEAT) is False
+    assert tpi_algo.on_percent == 0.43
+
+    # A change of parameters or of the safety mode invalidates the last calculation
+    tpi_algo.update_parameters(0.6, 0.01, 0)
+    assert tpi_algo.calculate(20, 18.9, 10, HVACMode.HEAT) is True
+    assert tpi_algo.on_percent == 0.76
+    tpi_algo.set_safety(0.1)
+    assert tpi_algo.on_percent == 0.1
+    assert tpi_algo.calculate(20, 18.9, 10, HVACMode.HEAT) is True
+    assert tpi_algo.on_percent == 0.1
+    assert tpi_algo.calculated_on_percent == 0.76
+
+    assert tpi_algo.cache_stats == {"nb_hit": 2, "nb_miss": 6}
@@ -0,0 +1,203 @@
+# pylint: disable=protected-access, unused-argument, line-too-long
+""" Test the update of a VTherm configuration without reload """
+from unittest.mock import PropertyMock
+from datetime import datetime, timedelta
+
+from homeassistant.components.climate import HVACMode
+
+from custom_components.versatile_thermostat.base_thermostat import BaseThermostat
+from custom_components.versatile_thermostat.prop_algorithm import (
+    PROPORTIONAL_FUNCTION_TPI,
+)
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+BASE_DATA = {
+    CONF_NAME: "TheOverSwitchMockName",
+    CONF_THERMOSTAT_TYPE: CONF_THERMOSTAT_SWITCH,
+    CONF_TEMP_SENSOR: "sensor.mock_temp_sensor",
+    CONF_EXTERNAL_TEMP_SENSOR: "sensor.mock_ext_temp_sensor",
+    CONF_CYCLE_MIN: 5,
+    CONF_TEMP_MIN: 15,
+    CONF_TEMP_MAX: 30,
+    CONF_USE_WINDOW_FEATURE: False,
+    CONF_USE_MOTION_FEATURE: False,
+    CONF_USE_POWER_FEATURE: False,
+    CONF_USE_PRESENCE_FEATURE: False,
+    CONF_HEATER: "switch.mock_switch",
+    CONF_PROP_FUNCTION: PROPORTIONAL_FUNCTION_TPI,
+    CONF_TPI_COEF_INT: 0.3,
+    CONF_TPI_COEF_EXT: 0.01,
+    CONF_MINIMAL_ACTIVATION_DELAY: 30,
+    CONF_SAFETY_DELAY_MIN: 5,
+    CONF_SAFETY_MIN_ON_PERCENT: 0.3,
+}
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_update_tpi_in_place(hass: HomeAssistant, skip_hass_states_is_state: None):
+    """Test that a change of the TPI coefficients keeps the same VTherm"""
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data=BASE_DATA,
+    )
+
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    underlying = entity.underlying_entities[0]
+
+    assert entity.can_update_config_in_place(BASE_DATA | {CONF_TPI_COEF_INT: 0.6, CONF_TPI_COEF_EXT: 0.02})
+    # The underlyings cannot be changed in place
+    assert not entity.can_update_config_in_place(BASE_DATA | {CONF_HEATER: "switch.mock_switch2"})
+    # The power sensors are created only with a device power
+    assert not entity.can_update_config_in_place(BASE_DATA | {CONF_DEVICE_POWER: 100})
+
+    hass.config_entries.async_update_entry(entry, data=BASE_DATA | {CONF_TPI_COEF_INT: 0.6, CONF_TPI_COEF_EXT: 0.02})
+    await hass.async_block_till_done()
+
+    # The VTherm is the same and have the new coefficients
+    assert search_entity(hass, "climate.theoverswitchmockname", CLIMATE_DOMAIN) is entity
+    assert entity.underlying_entities[0] is underlying
+    assert entity.hvac_mode == HVACMode.HEAT
+    assert entity._tpi_coef_int == 0.6
+    assert entity._tpi_coef_ext == 0.02
+    assert entity._prop_algorithm._tpi_coef_int == 0.6
+    assert entity._prop_algorithm._tpi_coef_ext == 0.02
+
+    # A structural change recreates the VTherm
+    hass.config_entries.async_update_entry(entry, data=BASE_DATA | {CONF_HEATER: "switch.mock_switch2"})
+    await hass.async_block_till_done()
+
+    new_entity = search_entity(hass, "climate.theoverswitchmockname", CLIMATE_DOMAIN)
+    assert new_entity is not None
+    assert new_entity is not entity
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_central_change_does_not_restart_in_place_vtherms(hass: HomeAssistant, skip_hass_states_is_state: None):
+    """Test that a change of the central configuration does not start again the VTherms updated in place"""
+
+    central_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheCentralConfigMockName",
+        unique_id="centralConfigUniqueId",
+        data=FULL_CENTRAL_CONFIG,
+    )
+    central_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(central_entry.entry_id)
+    assert central_entry.state is ConfigEntryState.LOADED
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverSwitchMockName",
+        unique_id="uniqueId",
+        data=BASE_DATA,
+    )
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    with patch.object(BaseThermostat, "async_startup", autospec=True) as mock_startup, patch.object(
+        api.central_power_manager, "start_listening"
+    ) as mock_start_listening:
+        hass.config_entries.async_update_entry(central_entry, data=FULL_CENTRAL_CONFIG | {CONF_TPI_COEF_INT: 0.5})
+        await hass.async_block_till_done()
+
+    # The VTherm is updated in place and is not started again
+    assert search_entity(hass, "climate.theoverswitchmockname", CLIMATE_DOMAIN) is entity
+    assert entity.hvac_mode == HVACMode.HEAT
+    assert all(call.args[0] is not entity for call in mock_startup.call_args_list)
+    # The central power manager still listens
+    assert mock_start_listening.called
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_update_in_place_with_auto_window_open(hass: HomeAssistant, skip_hass_states_is_state: None):
+    """Test that an in place update keeps an auto detected open window and that the VTherm is restored when it is closed"""
+    data = BASE_DATA | {
+        "boost_temp": 21,
+        CONF_USE_WINDOW_FEATURE: True,
+        CONF_WINDOW_AUTO_OPEN_THRESHOLD: 0.1,
+        CONF_WINDOW_AUTO_CLOSE_THRESHOLD: 0.1,
+        CONF_WINDOW_AUTO_MAX_DURATION: 10,
+    }
+    entry = MockConfigEntry(domain=DOMAIN, title="TheOverSwitchMockName", unique_id="uniqueId", data=data)
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+    now = datetime.now(get_tz(hass))
+
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    await entity.async_set_preset_mode(PRESET_BOOST)
+
+    with patch("custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.turn_on"), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.turn_off"
+    ), patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingSwitch.is_device_active",
+        new_callable=PropertyMock,
+        return_value=True,
+    ):
+        for minute, temperature in enumerate([19, 19, 19, 19, 18]):
+            await send_temperature_change_event(entity, temperature, now + timedelta(minutes=minute + 1))
+        assert entity.window_auto_state == STATE_ON
+        assert entity.hvac_mode == HVACMode.OFF
+        assert entity.hvac_off_reason == HVAC_OFF_REASON_WINDOW_DETECTION
+
+        # 1. the in place update keeps the open window
+        hass.config_entries.async_update_entry(entry, data=data | {CONF_TPI_COEF_INT: 0.6})
+        await hass.async_block_till_done()
+        assert search_entity(hass, "climate.theoverswitchmockname", CLIMATE_DOMAIN) is entity
+        assert entity.window_auto_state == STATE_ON
+        assert entity.hvac_mode == HVACMode.OFF
+        # the max duration of the open window is still watched
+        assert entity.window_manager._window_call_cancel is not None
+
+        # 2. the temperature goes up: the window is closed and the VTherm is restored
+        await send_temperature_change_event(entity, 19, now + timedelta(minutes=6))
+        assert entity.window_auto_state == STATE_OFF
+        assert entity.hvac_mode == HVACMode.HEAT
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_update_in_place_with_sensor_window_open(hass: HomeAssistant, skip_hass_states_is_state: None):
+    """Test that an in place update keeps an open window with the eco action and that the preset temperature is restored"""
+    data = BASE_DATA | {
+        "eco_temp": 17,
+        "boost_temp": 21,
+        CONF_USE_WINDOW_FEATURE: True,
+        CONF_WINDOW_SENSOR: "binary_sensor.mock_window_sensor",
+        CONF_WINDOW_DELAY: 0,
+        CONF_WINDOW_ACTION: CONF_WINDOW_ECO_TEMP,
+    }
+    entry = MockConfigEntry(domain=DOMAIN, title="TheOverSwitchMockName", unique_id="uniqueId", data=data)
+    entity: BaseThermostat = await create_thermostat(hass, entry, "climate.theoverswitchmockname")
+    assert entity
+
+    await entity.async_set_hvac_mode(HVACMode.HEAT)
+    await entity.async_set_preset_mode(PRESET_BOOST)
+    assert entity.target_temperature == 21
+
+    hass.states.async_set("binary_sensor.mock_window_sensor", STATE_ON)
+    await entity.window_manager.update_window_state(STATE_ON)
+    assert entity.window_state == STATE_ON
+    assert entity.target_temperature == 17
+
+    # 1. the in place update keeps the open window and does not save the eco temperature
+    hass.config_entries.async_update_entry(entry, data=data | {CONF_TPI_COEF_INT: 0.6})
+    await hass.async_block_till_done()
+    assert search_entity(hass, "climate.theoverswitchmockname", CLIMATE_DOMAIN) is entity
+    assert entity.window_state == STATE_ON
+    assert entity.target_temperature == 17
+
+    # 2. the window is closed: the boost temperature is restored
+    hass.states.async_set("binary_sensor.mock_window_sensor", STATE_OFF)
+    await entity.window_manager.update_window_state(STATE_OFF)
+    assert entity.window_state == STATE_OFF
+    assert entity.target_temperature == 21
@@ -0,0 +1,102 @@
+# pylint: disable=unused-argument, line-too-long, protected-access
+""" Test the warm start from the recorder history """
+import asyncio
+from unittest.mock import patch, AsyncMock
+from datetime import datetime, timedelta
+
+from homeassistant.core import State
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.versatile_thermostat.thermostat_climate import ThermostatOverClimate
+from custom_components.versatile_thermostat.warm_start import RecorderWarmStart
+
+from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
+
+
+def create_history(entity_id: str, now: datetime, nb_samples: int) -> list[State]:
+    """A decreasing temperature measured every 2 min until now, with an unavailable state"""
+    states = [State(entity_id, str(round(19 - 0.05 * i, 2)), last_changed=now - timedelta(minutes=2 * (nb_samples - i))) for i in range(nb_samples)]
+    states.insert(2, State(entity_id, STATE_UNAVAILABLE, last_changed=now - timedelta(minutes=2 * nb_samples - 3)))
+    return states
+
+
+async def test_warm_start_shared_query(hass: HomeAssistant):
+    """The history of the sensors is read in one query and bounded"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api._set_now(now)
+    warm_start: RecorderWarmStart = api.warm_start
+
+    # 1. disabled by default
+    assert not warm_start.is_enabled
+    assert await warm_start.async_get_samples("sensor.temp1") == []
+
+    # 2. enabled with a recorder
+    api.set_global_config({CONF_WARM_START_PARAMS: {"history_min": 30, "max_samples": 5}})
+    hass.config.components.add("recorder")
+    assert warm_start.is_enabled
+
+    history = {
+        "sensor.temp1": create_history("sensor.temp1", now, 10),
+        "sensor.temp2": [State("sensor.temp2", "not a number", last_changed=now)],
+    }
+    with patch.object(RecorderWarmStart, "_async_fetch_history", AsyncMock(return_value=history)) as mock_fetch:
+        # the VTherms which start together share the query
+        await warm_start.async_prefetch(["sensor.temp1", "sensor.temp2", "sensor.temp1", None])
+        results = await asyncio.gather(warm_start.async_get_samples("sensor.temp1"), warm_start.async_get_samples("sensor.temp2"))
+
+        mock_fetch.assert_awaited_once()
+        assert mock_fetch.call_args.args == (["sensor.temp1", "sensor.temp2"], now - timedelta(minutes=30), now)
+        assert warm_start.nb_queries == 1
+
+        # only the last valid samples are kept
+        assert len(results[0]) == 5
+        assert results[0][-1] == (18.55, now - timedelta(minutes=2))
+        assert results[1] == []
+
+        # 3. the samples are released after the startup. A later VTherm reads its sensor alone
+        warm_start.clear()
+        await warm_start.async_get_samples("sensor.temp1")
+        assert mock_fetch.await_count == 2
+        assert mock_fetch.call_args.args[0] == ["sensor.temp1"]
+
+    # 4. an error of the recorder is not blocking
+    warm_start.clear()
+    with patch.object(RecorderWarmStart, "_async_fetch_history", AsyncMock(side_effect=Exception("no database"))):
+        assert await warm_start.async_get_samples("sensor.temp1") == []
+    api._set_now(None)
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_warm_start_vtherm(hass: HomeAssistant, skip_hass_states_is_state):
+    """The history is replayed in the filters and the slope estimator at startup"""
+    now: datetime = datetime.now(tz=get_tz(hass))
+    api = VersatileThermostatAPI.get_vtherm_api(hass)
+    api.set_global_config({CONF_WARM_START_PARAMS: {"history_min": 30}})
+    hass.config.components.add("recorder")
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="TheOverClimateMockName",
+        unique_id="uniqueId",
+        data=PARTIAL_CLIMATE_CONFIG,
+    )
+    fake_underlying_climate = MockClimate(hass, "mockUniqueId", "MockClimateName", {})
+    temp_sensor_entity_id = PARTIAL_CLIMATE_CONFIG[CONF_TEMP_SENSOR]
+
+    with patch.object(RecorderWarmStart, "_async_fetch_history", AsyncMock(return_value={temp_sensor_entity_id: create_history(temp_sensor_entity_id, now, 10)})) as mock_fetch, patch(
+        "custom_components.versatile_thermostat.underlyings.UnderlyingClimate.find_underlying_climate",
+        return_value=fake_underlying_climate,
+    ):
+        entity: ThermostatOverClimate = await create_thermostat(hass, entry, "climate.theoverclimatemockname")
+        assert entity
+
+    mock_fetch.assert_awaited_once()
+    # the slope is known before the first live measurement
+    assert entity._temperature_slope_estimator.is_ready
+    assert entity._temperature_slope_estimator.short_slope < 0
+    assert entity._ema_temp is not None
+    # the samples are released
+    assert api.warm_start._samples == {}
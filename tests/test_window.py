@@ -338,10 +338,10 @@ async def test_window_auto_fast(hass: HomeAssistant, skip_hass_states_is_state):
         assert entity.is_device_active is True
         assert entity.last_temperature_slope == 0.0
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.hvac_mode is HVACMode.HEAT
 
@@ -365,9 +365,9 @@ async def test_window_auto_fast(hass: HomeAssistant, skip_hass_states_is_state):
         assert mock_heater_on.call_count == 0
         assert mock_heater_off.call_count >= 1
         assert entity.last_temperature_slope == -6.24
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.window_auto_state == STATE_ON
         assert entity.hvac_mode is HVACMode.OFF
@@ -403,9 +403,9 @@ async def test_window_auto_fast(hass: HomeAssistant, skip_hass_states_is_state):
         assert mock_heater_on.call_count == 0
         assert mock_heater_off.call_count == 0
         assert round(entity.last_temperature_slope, 3) == -7.49
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.window_auto_state == STATE_ON
         assert entity.hvac_mode is HVACMode.OFF
@@ -447,10 +447,10 @@ async def test_window_auto_fast(hass: HomeAssistant, skip_hass_states_is_state):
         assert mock_heater_off.call_count == 0
         assert entity.last_temperature_slope == 0.42
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is True
+            entity.window_manager.is_window_auto_close_detected() is True
         )
         assert entity.window_auto_state == STATE_OFF
         assert entity.hvac_mode is HVACMode.HEAT
@@ -550,10 +550,10 @@ async def test_window_auto_fast_and_sensor(
         assert entity.is_device_active is True
         assert entity.last_temperature_slope == 0.0
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.hvac_mode is HVACMode.HEAT
 
@@ -578,9 +578,9 @@ async def test_window_auto_fast_and_sensor(
         assert entity.last_temperature_slope == -6.24
         # The window open should be detected (but not used)
         # because we need to calculate the slope anyway, we have the algorithm running
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.window_auto_state == STATE_UNAVAILABLE
         assert entity.hvac_mode is HVACMode.HEAT
@@ -669,10 +669,10 @@ async def test_window_auto_auto_stop(hass: HomeAssistant, skip_hass_states_is_st
         assert mock_set_hvac_mode.call_count == 0
         assert entity.last_temperature_slope == 0.0
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.hvac_mode is HVACMode.HEAT
 
@@ -690,9 +690,9 @@ async def test_window_auto_auto_stop(hass: HomeAssistant, skip_hass_states_is_st
         await send_temperature_change_event(entity, 18, event_timestamp, sleep=False)
 
         assert entity.last_temperature_slope == -6.24
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
 
         assert mock_send_event.call_count == 2
@@ -742,10 +742,10 @@ async def test_window_auto_auto_stop(hass: HomeAssistant, skip_hass_states_is_st
         assert mock_set_hvac_mode.call_count == 1
         assert round(entity.last_temperature_slope, 3) == -0.29
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
 
     # Clean the entity
@@ -839,10 +839,10 @@ async def test_window_auto_no_on_percent(
         assert mock_heater_on.call_count == 0
         assert entity.last_temperature_slope == 0.0
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.hvac_mode is HVACMode.HEAT
         assert entity.proportional_algorithm.on_percent == 0.0
@@ -869,9 +869,9 @@ async def test_window_auto_no_on_percent(
         assert mock_heater_off.call_count == 1
         assert entity.last_temperature_slope == -6.24
         # The algo calculate open ...
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         # But the entity is still on and window_auto is not detected
         assert entity.window_auto_state == STATE_UNKNOWN
@@ -1106,10 +1106,10 @@ async def test_window_auto_bypass(hass: HomeAssistant, skip_hass_states_is_state
         assert entity.is_device_active is True
         assert entity.last_temperature_slope == 0.0
         assert (
-            entity.window_manager._window_auto_algo.is_window_open_detected() is False
+            entity.window_manager.is_window_auto_open_detected() is False
         )
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.hvac_mode is HVACMode.HEAT
 
@@ -1137,9 +1137,9 @@ async def test_window_auto_bypass(hass: HomeAssistant, skip_hass_states_is_state
         assert mock_heater_on.call_count == 0
         assert mock_heater_off.call_count == 0
         assert entity.last_temperature_slope == -6.24
-        assert entity.window_manager._window_auto_algo.is_window_open_detected() is True
+        assert entity.window_manager.is_window_auto_open_detected() is True
         assert (
-            entity.window_manager._window_auto_algo.is_window_close_detected() is False
+            entity.window_manager.is_window_auto_close_detected() is False
         )
         assert entity.window_auto_state == STATE_UNKNOWN
         assert entity.hvac_mode is HVACMode.HEAT
@@ -9,6 +9,7 @@ from custom_components.versatile_thermostat.base_thermostat import BaseThermosta
 from custom_components.versatile_thermostat.feature_window_manager import (
     FeatureWindowManager,
 )
+from custom_components.versatile_thermostat.temperature_slope import TemperatureSlopeEstimator
 from .commons import *  # pylint: disable=wildcard-import, unused-wildcard-import
 
 logging.getLogger().setLevel(logging.DEBUG)
@@ -647,6 +648,8 @@ async def test_window_feature_manager_window_auto(
     type(fake_vtherm).hvac_mode = PropertyMock(return_value=HVACMode.HEAT)
     type(fake_vtherm).last_central_mode = PropertyMock(return_value=None)
     type(fake_vtherm).proportional_algorithm = PropertyMock(return_value=None)
+    slope_estimator = TemperatureSlopeEstimator("the name")
+    type(fake_vtherm).temperature_slope_estimator = PropertyMock(return_value=slope_estimator)
 
     # 1. creation / post_init / start listening
     window_manager = FeatureWindowManager(fake_vtherm, hass)
@@ -666,11 +669,9 @@ async def test_window_feature_manager_window_auto(
     tz = get_tz(hass)  # pylint: disable=invalid-name
     now: datetime = datetime.now(tz=tz)
 
-    # Add a fake temp point for the window_auto_algo. We need at least 4 points
+    # Add a fake temp point for the slope estimator. We need at least 4 points
     for i in range(0, 4):
-        window_manager._window_auto_algo.add_temp_measurement(
-            17 + (i * (new_temp - 17) / 4), now, True
-        )
+        slope_estimator.add_temp_measurement(17 + (i * (new_temp - 17) / 4), now)
         now = now + timedelta(minutes=5)
 
     # fmt:off
@@ -685,7 +686,12 @@ async def test_window_feature_manager_window_auto(
 
         window_manager._window_auto_state = current_state
 
-        dearm_window_auto = await window_manager.manage_window_auto(in_cycle=in_cycle)
+        # The VTherm updates the slope estimator before calling the window manager
+        if in_cycle:
+            slope_estimator.check_age_last_measurement(new_temp, now)
+        else:
+            slope_estimator.add_temp_measurement(new_temp, now)
+        dearm_window_auto = await window_manager.manage_window_auto()
         assert dearm_window_auto is not None
 
         assert mock_update_window_state.call_count == nb_call